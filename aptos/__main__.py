@@ -1,19 +1,73 @@
 import argparse
 import json
+import os
+import pathlib
 import sys
 import colorama
 
 from termcolor import colored
-from .parser import SchemaParser
-from .primitive import Object
-from .visitor import ValidationVisitor
-from .schema.visitor import AvroSchemaVisitor
+# Only the modules needed to parse the arguments and to send requests to
+# the daemon are imported up front, the other ones by the commands using
+# them, so requests sent to the daemon skip importing them.
+from .client import Client, default_path
+from .regex import PatternPolicy
+from .schema.avro import CODECS
+
+
+def parse(arguments, schema, **options):
+    from .parser import SchemaParser
+    # References are relative to the location of the schema.
+    options['uri'] = pathlib.Path(os.path.abspath(arguments.schema)).as_uri()
+    options['patterns'] = arguments.patterns
+    if arguments.cache is None:
+        return SchemaParser.parse(schema, **options)
+    from .cache import SchemaCache
+    return SchemaCache(arguments.cache).parse(schema, **options)
+
+
+def connect(arguments):
+    # Requests are sent to the daemon if one is running, unless schemas
+    # are to be cached on disk.
+    if arguments.cache is not None:
+        return None
+    path = arguments.socket or default_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        return Client(path)
+    except OSError:
+        return None
 
 
 def validate(arguments):
+    client = None if arguments.stream is not None else connect(arguments)
+    if client is not None:
+        instance = json.loads(arguments.instance)
+        with client:
+            try:
+                client.validate(arguments.schema, instance, arguments.patterns)  # noqa: E501
+            except AssertionError as e:
+                sys.exit(colored('error', 'red') + ' {!r}'.format(e.args[0]))
+            except ValueError as e:
+                sys.exit(colored('error', 'red') + ' cannot validate instance against the schema {!r}, {}'.format(arguments.schema, e))  # noqa: E501
+        print(colored('success', 'green') + ' instance {!r} is valid against the schema {!r}'.format(instance, arguments.schema))  # noqa: E501
+        return
     with open(arguments.schema) as fp:
         schema = json.load(fp)
-    component = SchemaParser.parse(schema)
+    component = parse(arguments, schema)
+    if arguments.stream is not None:
+        from .stream import StreamingValidator
+        validator = StreamingValidator(component)
+        try:
+            if arguments.stream == '-':
+                validator.validate(sys.stdin.buffer)
+            else:
+                validator.validate_path(arguments.stream)
+        except AssertionError as e:
+            sys.exit(colored('error', 'red') + ' {!r}'.format(e.args[0]))
+        print(colored('success', 'green') + ' document {!r} is valid against the schema {!r}'.format(arguments.stream, arguments.schema))  # noqa: E501
+        return
+    from .visitor import ValidationVisitor
     instance = json.loads(arguments.instance)
     try:
         component.accept(ValidationVisitor(instance))
@@ -23,17 +77,135 @@ def validate(arguments):
 
 
 def convert(arguments):
+    client = None if arguments.mapping else connect(arguments)
+    if client is not None:
+        with client:
+            try:
+                result = client.convert(
+                    arguments.schema, arguments.format,
+                    patterns=arguments.patterns)
+            except ValueError as e:
+                sys.exit(colored('error', 'red') + ' cannot convert schema {!r} into {!r} format, {}'.format(arguments.schema, arguments.format, e))  # noqa: E501
+        print(result if arguments.format == 'protobuf' else json.dumps(result, indent=2))  # noqa: E501
+        return
+    from .primitive import Object
+    from .schema import protobuf
+    from .schema.visitor import AvroSchemaVisitor, ProtobufSchemaVisitor
     with open(arguments.schema) as fp:
         schema = json.load(fp)
-    component = SchemaParser.parse(schema)
+    component = parse(arguments, schema)
     if not isinstance(component, Object):
         sys.exit(colored('error', 'red') + ' cannot convert schema {!r} into {!r} format, schema must be of type "object"'.format(arguments.schema, arguments.format))  # noqa: E501
+    if arguments.format == 'protobuf':
+        mapping = None
+        if arguments.mapping and os.path.exists(arguments.mapping):
+            with open(arguments.mapping) as fp:
+                mapping = json.load(fp)
+        visitor = ProtobufSchemaVisitor(mapping)
+        component.accept(visitor)
+        if arguments.mapping:
+            with open(arguments.mapping, 'w') as fp:
+                json.dump(visitor.mapping, fp, indent=2, sort_keys=True)
+        print(protobuf.dumps(visitor.definitions))
+        return
     Visitor = {
         'avro': AvroSchemaVisitor,
     }[arguments.format]
     print(json.dumps(component.accept(Visitor()), indent=2))
 
 
+def encode(arguments):
+    from .primitive import Object
+    from .schema.avro import DataFileWriter
+    from .schema.visitor import AvroSchemaVisitor
+    with open(arguments.schema) as fp:
+        schema = json.load(fp)
+    component = parse(arguments, schema)
+    if not isinstance(component, Object):
+        sys.exit(colored('error', 'red') + ' cannot encode records using schema {!r}, schema must be of type "object"'.format(arguments.schema))  # noqa: E501
+    record = component.accept(AvroSchemaVisitor())
+    source = sys.stdin if arguments.input == '-' else open(arguments.input)
+    target = sys.stdout.buffer if arguments.output == '-' else open(arguments.output, 'wb')  # noqa: E501
+    with source, target:
+        writer = DataFileWriter(
+            target, record, codec=arguments.codec,
+            block_size=arguments.block_size)
+        with writer:
+            for number, line in enumerate(source, 1):
+                if not line.strip():
+                    continue
+                try:
+                    writer.append(json.loads(line))
+                except ValueError as e:
+                    sys.exit(colored('error', 'red') + ' line {}: {}'.format(number, e))  # noqa: E501
+
+
+def shred(arguments):
+    from .primitive import Object
+    from .shred import ColumnWriter
+    if arguments.format not in ColumnWriter.formats:
+        sys.exit(colored('error', 'red') + ' format {!r} is not one of {!r}'.format(arguments.format, ColumnWriter.formats))  # noqa: E501
+    with open(arguments.schema) as fp:
+        schema = json.load(fp)
+    component = parse(arguments, schema)
+    if not isinstance(component, Object):
+        sys.exit(colored('error', 'red') + ' cannot shred records using schema {!r}, schema must be of type "object"'.format(arguments.schema))  # noqa: E501
+    source = sys.stdin if arguments.input == '-' else open(arguments.input)
+    with source, ColumnWriter(component, arguments.output, format=arguments.format) as writer:  # noqa: E501
+        for number, line in enumerate(source, 1):
+            if not line.strip():
+                continue
+            try:
+                writer.append(json.loads(line))
+            except (AssertionError, ValueError) as e:
+                sys.exit(colored('error', 'red') + ' line {}: {}'.format(number, e))  # noqa: E501
+    print(colored('success', 'green') + ' {} records shredded into {!r}'.format(writer.records, arguments.output))  # noqa: E501
+
+
+def codegen(arguments):
+    from .codegen import CodeGenerationVisitor
+    with open(arguments.schema) as fp:
+        schema = json.load(fp)
+    component = parse(arguments, schema, optimize=True)
+    source = CodeGenerationVisitor().generate(component)
+    if arguments.output == '-':
+        sys.stdout.write(source)
+        return
+    with open(arguments.output, 'w') as fp:
+        fp.write(source)
+
+
+def stats(arguments):
+    from .stats import SchemaStatistics
+    with open(arguments.schema) as fp:
+        schema = json.load(fp)
+    # The schema is parsed again, rather than loaded from the cache, to
+    # measure the memory it retains.
+    statistics = SchemaStatistics.measure(
+        schema, uri=pathlib.Path(os.path.abspath(arguments.schema)).as_uri(),
+        patterns=arguments.patterns)
+    if arguments.json:
+        print(json.dumps(statistics.report(), indent=2, sort_keys=True))
+        return
+    print(statistics.explain())
+
+
+def serve(arguments):
+    from .daemon import ValidationServer
+    path = arguments.socket or default_path()
+    try:
+        server = ValidationServer(path, [arguments.schema], arguments.patterns)  # noqa: E501
+    except OSError as e:
+        sys.exit(colored('error', 'red') + ' cannot listen on {!r}, {}'.format(path, e.strerror or e))  # noqa: E501
+    print(colored('listening', 'green') + ' on {!r}'.format(path))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
 def main():
     # colorama works cross-platform to color text output in CLI
     colorama.init()
@@ -51,15 +223,96 @@ def main():
     validation.add_argument(
         '-instance', type=str, default=json.dumps({}),
         help='JSON document being validated')
+    validation.add_argument(
+        '-stream', type=str,
+        help='''
+        file containing the JSON document being validated ("-" for stdin),
+        validated incrementally while it is being read''')
     validation.set_defaults(func=validate)
 
     conversion = subparsers.add_parser(
         'convert', help='''
         Convert a JSON Schema into a different data-interchange format''')
     conversion.add_argument(
-        '-format', type=str, choices=['avro'], help='data-interchange format')
+        '-format', type=str, choices=['avro', 'protobuf'],
+        help='data-interchange format')
+    conversion.add_argument(
+        '-mapping', type=str,
+        help='''
+        JSON document recording the Protocol Buffers field numbers, updated
+        with the numbers assigned to new fields''')
     conversion.set_defaults(func=convert)
 
+    encoding = subparsers.add_parser(
+        'encode', help='''
+        Encode NDJSON records into an Avro object container file''')
+    encoding.add_argument(
+        '-input', type=str, default='-',
+        help='NDJSON document containing the records (default: stdin)')
+    encoding.add_argument(
+        '-output', type=str, default='-',
+        help='Avro object container file (default: stdout)')
+    encoding.add_argument(
+        '-codec', type=str, choices=CODECS, default='null',
+        help='compression codec applied to each block')
+    encoding.add_argument(
+        '-block-size', type=int, default=64 * 1024, dest='block_size',
+        help='size in bytes of the uncompressed blocks')
+    encoding.set_defaults(func=encode)
+
+    shredding = subparsers.add_parser(
+        'shred', help='''
+        Shred NDJSON records into a memory-mappable column per leaf of the
+        schema''')
+    shredding.add_argument(
+        '-input', type=str, default='-',
+        help='NDJSON document containing the records (default: stdin)')
+    shredding.add_argument(
+        '-output', type=str, required=True,
+        help='directory the columns and their manifest are written to')
+    shredding.add_argument(
+        '-format', type=str, default='npy',
+        help='format of the column files, "npy" or "raw" (default: npy)')
+    shredding.set_defaults(func=shred)
+
+    generation = subparsers.add_parser(
+        'codegen', help='''
+        Generate a standalone Python module validating JSON instances''')
+    generation.add_argument(
+        '-output', '-o', type=str, default='-',
+        help='Python module being generated (default: stdout)')
+    generation.set_defaults(func=codegen)
+
+    statistics = subparsers.add_parser(
+        'stats', help='''
+        Report the size, memory and worst-case validation cost of a
+        schema''')
+    statistics.add_argument(
+        '-json', action='store_true',
+        help='print the statistics as a JSON document')
+    statistics.set_defaults(func=stats)
+
+    serving = subparsers.add_parser(
+        'serve', help='''
+        Keep schemas in memory and serve validation and conversion
+        requests over a Unix domain socket''')
+    serving.set_defaults(func=serve)
+
+    parser.add_argument(
+        '-cache', type=str,
+        help='''
+        directory caching parsed schemas between invocations''')
+    parser.add_argument(
+        '-patterns', choices=PatternPolicy.actions, default='warn',
+        help='''
+        how to evaluate patterns which may backtrack in super-linear time
+        (default: warn)''')
+    parser.add_argument(
+        '-socket', type=str,
+        help='''
+        Unix domain socket of the daemon, used by "validate" and "convert"
+        when a daemon is running (default: $APTOS_SOCKET or a file in the
+        temporary directory)''')
     parser.add_argument(
         'schema', type=str, help='JSON document containing the description')
 
@@ -0,0 +1,284 @@
+import math
+import operator
+import re
+
+from . import vectorized
+from .primitive import (
+    Boolean, EmptySchema, Enumeration, Integer, Null, Number, Object,
+    Reference, String)
+from .visitor import ValidationVisitor
+
+# The schemas whose keywords are checked on a whole column at once.
+SCALARS = (Boolean, Enumeration, Integer, Null, Number, String)
+
+# The bounds of numbers and the comparisons valid numbers satisfy.
+BOUNDS = (
+    ('maximum', operator.le),
+    ('exclusiveMaximum', operator.lt),
+    ('minimum', operator.ge),
+    ('exclusiveMinimum', operator.gt),
+)
+
+
+class BatchReport:
+
+    """Summarize the violations of a batch of ``records`` records.
+
+    ``violations`` lists a ``(index, name, message)`` tuple for each
+    violation, ordered by the index of the record, ``name`` being the
+    name of the offending property or ``None`` if the violation concerns
+    the record as a whole. A record may violate several properties.
+    """
+
+    def __init__(self, records):
+        self.records = records
+        self.violations = []
+
+    @property
+    def valid(self):
+        return not self.violations
+
+    @property
+    def invalid(self):
+        """The indices of the invalid records."""
+        return sorted(set(index for index, name, message in self.violations))  # noqa: E501
+
+
+class BatchValidator:
+
+    """Validate batches of records against an object schema column by
+    column instead of record by record.
+
+    The records are transposed into a column of values per property.
+    Scalar properties, whose schemas are booleans, nulls, numbers,
+    integers, strings or enumerations without "allOf", "anyOf" and
+    "oneOf", are checked a keyword at a time on the whole column: "type",
+    "enum", "const", the bounds of numbers, with NumPy if it is installed,
+    and the lengths, patterns and formats of strings. Only the values
+    failing these checks are validated again, by ``visitor``, to report
+    the same messages as record by record validation. The values of
+    other properties are validated one at a time, and "required",
+    "minProperties" and "maxProperties" are checked from the presence of
+    the names in each record.
+
+    Objects with keywords relating their members to each other, e.g.
+    "dependencies" or "patternProperties", and records which are not
+    objects are validated record by record. A record is valid if and only
+    if ``visitor`` deems it valid, but every violation of a record is
+    reported instead of the first one.
+
+    ``options`` are passed to ``visitor``, e.g. a ``ValidationCache``; a
+    ``Budget`` limits the validation of each value.
+    """
+
+    def __init__(self, component, visitor=ValidationVisitor, **options):
+        while isinstance(component, Reference):
+            component = component.value
+        if not isinstance(component, Object):
+            raise ValueError('component MUST be an object schema to validate records')  # noqa: E501
+        self.component = component
+        self.visitor = visitor
+        self.options = options
+        # Whether the records are validated column by column.
+        self.columnar = not (
+            component.const is not None or component.enum or
+            component.allOf or component.anyOf or component.oneOf or
+            component.patternProperties or component.dependencies or
+            not isinstance(component.propertyNames, EmptySchema))
+
+    def validate(self, records):
+        """Return the ``BatchReport`` of ``records``, a sequence of
+        instances.
+        """
+        report = BatchReport(len(records))
+        violations = report.violations
+        component = self.component
+        if not self.columnar:
+            for index, record in enumerate(records):
+                message = self.error(component, record)
+                if message is not None:
+                    violations.append((index, None, message))
+            return report
+
+        # Transpose the records into a column per name, holding the indices
+        # of the records having the name and the values of the members.
+        indices = []
+        objects = []
+        for index, record in enumerate(records):
+            if record.__class__ is dict:
+                indices.append(index)
+                objects.append(record)
+                continue
+            message = self.error(component, record)
+            if message is not None:
+                violations.append((index, None, message))
+        properties = component.properties
+        additionalProperties = component.additionalProperties
+        names = list(properties) + sorted(component.required.difference(properties))  # noqa: E501
+        known = frozenset(names)
+        columns = {name: ([], []) for name in names}
+        if names:
+            # Records having every name are transposed at once.
+            getter = operator.itemgetter(*names)
+            complete = []
+            rows = []
+            for index, record in zip(indices, objects):
+                try:
+                    rows.append(getter(record))
+                except KeyError:
+                    for name in names:
+                        if name in record:
+                            column = columns[name]
+                            column[0].append(index)
+                            column[1].append(record[name])
+                    continue
+                complete.append(index)
+            if len(names) == 1:
+                rows = [(row,) for row in rows]
+            for name, values in zip(names, zip(*rows)):
+                column = columns[name]
+                column[0].extend(complete)
+                column[1].extend(values)
+        prune = self.visitor.prune
+        if not (prune and isinstance(additionalProperties, EmptySchema)):
+            for index, record in zip(indices, objects):
+                if record.keys() <= known:
+                    continue
+                for name in record.keys() - known:
+                    column = columns.setdefault(name, ([], []))
+                    column[0].append(index)
+                    column[1].append(record[name])
+
+        if component.maxProperties or component.minProperties:
+            for index in indices:
+                self.count(index, records[index], violations)
+        for name in sorted(component.required):
+            if name in columns and len(columns[name][0]) == len(indices):
+                continue
+            present = set(columns[name][0]) if name in columns else ()
+            violations.extend(
+                (index, name, 'instance %r is missing required property %r' % (records[index], name))  # noqa: E501
+                for index in indices if index not in present)
+
+        for name, (positions, values) in columns.items():
+            if not values:
+                continue
+            schema = properties.get(name, additionalProperties)
+            if name not in properties and prune and isinstance(schema, EmptySchema):  # noqa: E501
+                continue
+            if isinstance(schema, SCALARS) and not (
+                    schema.allOf or schema.anyOf or schema.oneOf):
+                suspects = sorted(self.suspects(schema, values))
+            else:
+                suspects = range(len(values))
+            for position in suspects:
+                message = self.error(schema, values[position])
+                if message is not None:
+                    violations.append((positions[position], name, message))
+
+        violations.sort(key=lambda violation: violation[0])
+        return report
+
+    def error(self, schema, instance):
+        try:
+            schema.accept(self.visitor(instance, **self.options))
+        except AssertionError as e:
+            return e.args[0]
+
+    def count(self, index, record, violations):
+        component = self.component
+        if component.maxProperties and len(record) > component.maxProperties:  # noqa: E501
+            violations.append((index, None, 'instance %r number of properties is not less than, or equal to %r' % (record, component.maxProperties)))  # noqa: E501
+        elif len(record) < component.minProperties:
+            violations.append((index, None, 'instance %r number of properties is not greater than, or equal to %r' % (record, component.minProperties)))  # noqa: E501
+
+    def suspects(self, schema, values):
+        """Return the positions of the ``values`` which may be invalid
+        against ``schema``, checking each keyword on every value at once.
+        Each check first tells whether every value passes, which is the
+        common case, and only then looks for the values which do not.
+        """
+        suspects = set()
+        if schema.const is not None:
+            const = schema.const
+            if values.count(const) < len(values):
+                suspects.update(
+                    position for position, value in enumerate(values)
+                    if value != const)
+        if schema.enum:
+            try:
+                enum = frozenset(schema.enum)
+                if not enum.issuperset(values):
+                    suspects.update(
+                        position for position, value in enumerate(values)
+                        if value not in enum)
+            except TypeError:
+                # Unhashable elements or values.
+                enum = schema.enum
+                suspects.update(
+                    position for position, value in enumerate(values)
+                    if value not in enum)
+        if schema.type is None:
+            return suspects
+
+        numeric = isinstance(schema, (Integer, Number)) and not (
+            schema.multipleOf is None and schema.maximum is None and
+            schema.exclusiveMaximum is None and schema.minimum is None and
+            schema.exclusiveMinimum is None)
+        positions = range(len(values))
+        elements = None
+        if numeric and vectorized.load() is not None:
+            # Converting the values checks their types too.
+            elements = vectorized.values(schema, values)
+        if elements is None:
+            # The positions and the values of the values of the right type.
+            types = schema.types
+            if not types.issuperset(map(type, values)):
+                positions = [
+                    position for position, value in enumerate(values)
+                    if value.__class__ in types]
+                suspects.update(set(range(len(values))).difference(positions))  # noqa: E501
+                values = [values[position] for position in positions]
+                if numeric and vectorized.load() is not None:
+                    elements = vectorized.values(schema, values)
+        if numeric:
+            if elements is None:
+                # Without NumPy, the bounds are compared in Python and the
+                # numbers constrained by "multipleOf" are validated one at
+                # a time.
+                if schema.multipleOf is not None:
+                    suspects.update(positions)
+                for keyword, compare in BOUNDS:
+                    bound = getattr(schema, keyword)
+                    if bound is not None:
+                        suspects.update(
+                            position for position, value in zip(positions, values)  # noqa: E501
+                            if not compare(value, bound))
+            else:
+                valid = vectorized.mask(schema, elements)
+                if not valid.all():
+                    suspects.update(
+                        positions[i]
+                        for i in vectorized.load().flatnonzero(~valid))
+        elif isinstance(schema, String) and values:
+            minLength = schema.minLength
+            maxLength = schema.maxLength or math.inf
+            budget = self.options.get('budget')
+            if budget is not None and budget.length is not None:
+                maxLength = min(maxLength, budget.length)
+            lengths = list(map(len, values))
+            if min(lengths) < minLength or max(lengths) > maxLength:
+                suspects.update(
+                    position for position, value in zip(positions, values)
+                    if not minLength <= len(value) <= maxLength)
+            if schema.pattern:
+                match = (schema.matcher or re.compile(schema.pattern)).match
+                suspects.update(
+                    position for position, value in zip(positions, values)
+                    if match(value) is None)
+            if schema.checker is not None:
+                checker = schema.checker
+                suspects.update(
+                    position for position, value in zip(positions, values)
+                    if not checker(value))
+        return suspects
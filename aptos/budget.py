@@ -0,0 +1,107 @@
+import math
+import time
+
+
+class BudgetExceededError(Exception):
+
+    """Validation was aborted since the instance exceeded a limit of a
+    ``Budget``. The instance is neither valid nor invalid, so this is not
+    an ``AssertionError``.
+    """
+
+    def __init__(self, limit, value):
+        super().__init__('validation exceeded the %s limit of %r' % (limit, value))  # noqa: E501
+        self.limit = limit
+        self.value = value
+
+
+class Budget:
+
+    """Limit the resources spent validating a single instance, so hostile
+    or malformed instances cannot pin a worker.
+
+    - ``depth`` limits the nesting of arrays and objects
+    - ``nodes`` limits the number of values visited, a value validated
+      against several subschemas being visited several times
+    - ``length`` limits the length of the strings validated
+    - ``timeout`` limits the time spent validating, in seconds
+
+    ``None`` disables a limit.
+    """
+
+    # The number of values and the clock are checked once every
+    # ``interval`` values.
+    interval = 256
+
+    def __init__(self, depth=None, nodes=None, length=None, timeout=None):
+        self.depth = depth
+        self.nodes = nodes
+        self.length = length
+        self.timeout = timeout
+
+    def meter(self):
+        return Meter(self)
+
+
+class Meter:
+
+    """Measure the resources spent validating a single instance against
+    ``budget``.
+
+    Visitors count down ``count`` and compare the depth of each value
+    with ``depth`` themselves, calling ``check`` only once the countdown
+    ends or the depth is exceeded, so the limits cost next to nothing.
+    """
+
+    __slots__ = ('budget', 'depth', 'length', 'count', 'visited', 'deadline')  # noqa: E501
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.depth = math.inf if budget.depth is None else budget.depth
+        self.length = math.inf if budget.length is None else budget.length
+        self.count = self.visited = 0
+        self.deadline = None
+        if budget.timeout is not None:
+            self.deadline = time.monotonic() + budget.timeout
+        self.schedule()
+
+    def schedule(self):
+        # Check the limits again after the next ``count`` values, and as
+        # soon as the number of values exceeds the limit.
+        budget = self.budget
+        count = budget.interval
+        if budget.nodes is not None:
+            count = max(1, min(count, budget.nodes + 1 - self.visited))
+        self.count = count
+        self.visited += count
+
+    def visit(self, depth):
+        """Count a value nested at ``depth``."""
+        self.count -= 1
+        if self.count <= 0 or depth > self.depth:
+            self.check(depth)
+
+    def advance(self, number, depth):
+        """Count ``number`` values nested at ``depth`` at once."""
+        if number and depth > self.depth:
+            self.check(depth)
+        while number >= self.count:
+            number -= self.count
+            self.count = 0
+            self.check(depth)
+        self.count -= number
+
+    def check(self, depth):
+        budget = self.budget
+        if depth > self.depth:
+            raise BudgetExceededError('depth', budget.depth)
+        if self.count <= 0:
+            if budget.nodes is not None and self.visited > budget.nodes:
+                raise BudgetExceededError('nodes', budget.nodes)
+            if self.deadline is not None and time.monotonic() >= self.deadline:  # noqa: E501
+                raise BudgetExceededError('timeout', budget.timeout)
+            self.schedule()
+
+    def examine(self, string):
+        if len(string) > self.length:
+            raise BudgetExceededError('length', self.budget.length)
@@ -0,0 +1,285 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from urllib.request import url2pathname
+
+from . import __version__
+from .formats import FORMATS
+from .parser import SchemaParser
+from .store import DocumentStore
+
+
+class SchemaCache:
+
+    """Store resolved component trees in ``directory`` to skip parsing
+    schemas which have already been parsed.
+
+    Entries are keyed by the content of the schema, the parser, the
+    parsing options and the version of aptos, so an entry becomes stale
+    as soon as any of them changes. Entries also record the digest of
+    every document the schema references, and are parsed again as soon
+    as one of them changes. Stale entries are never loaded and entries
+    written by other versions are removed by ``prune``.
+    """
+
+    suffix = '.pickle'
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(schema, parser=SchemaParser, **options):
+        """Return the key of the entry of ``schema``, or ``None`` if it
+        cannot be cached. Options are keyed by value if they are strings,
+        numbers, booleans or ``None``, or by the value of their ``key``
+        method, e.g. a ``PatternPolicy``. Other options, e.g. a
+        ``DocumentStore``, have no well-defined key.
+        """
+        values = []
+        for name, value in sorted(options.items()):
+            if value is not None and not isinstance(value, (bool, int, float, str)):  # noqa: E501
+                value = value.key() if hasattr(value, 'key') else None
+                if value is None:
+                    return None
+            values.append([name, value])
+        # Parsing without a registry uses the built-in formats, to which
+        # checkers may be registered.
+        formats = FORMATS.key()
+        if formats is None:
+            return None
+        digest = hashlib.sha256()
+        digest.update(json.dumps([
+            __version__,
+            '{}.{}'.format(parser.__module__, parser.__name__),
+            values,
+            formats,
+            schema,
+        ], sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def parse(self, schema, parser=SchemaParser, **options):
+        """Return the component tree of ``schema``, loading it from the
+        cache if possible, otherwise parsing it with ``parser`` and storing
+        the result. Schemas parsed with options without a well-defined
+        key are not cached, see ``key``.
+        """
+        key = self.key(schema, parser, **options)
+        if key is None:
+            return parser.parse(schema, **options)
+        component = self.load(key)
+        if component is None:
+            # A private store records the documents loaded by this parse
+            # only, rather than sharing them with earlier parses.
+            store = DocumentStore()
+            component = parser.parse(schema, **dict(options, store=store))
+            self.store(key, component, self.dependencies(store))
+        return component
+
+    @staticmethod
+    def digest(path):
+        try:
+            with open(path, 'rb') as fp:
+                return hashlib.sha256(fp.read()).hexdigest()
+        except OSError:
+            return None
+
+    @classmethod
+    def dependencies(cls, store):
+        """Return the path and digest of every document of ``store``."""
+        paths = []
+        for uri in store.documents:
+            path = os.path.abspath(url2pathname(urlsplit(uri).path))
+            if path not in paths:
+                paths.append(path)
+        return [[path, cls.digest(path)] for path in paths]
+
+    def load(self, key):
+        try:
+            with open(self.path(key), 'rb') as fp:
+                # The version and the referenced documents are stored
+                # first, so stale entries are detected without loading
+                # their component tree.
+                if pickle.load(fp) != __version__:
+                    return None
+                for path, digest in pickle.load(fp):
+                    if self.digest(path) != digest:
+                        return None
+                return pickle.load(fp)
+        except Exception:
+            # Missing entries and entries which cannot be read, e.g. a
+            # truncated file, are parsed again.
+            return None
+
+    def store(self, key, component, dependencies=()):
+        """Store ``component`` under ``key``, along with the path and
+        digest of the documents it references, and return whether it was
+        stored. Component trees which cannot be pickled, e.g. holding a
+        format checker defined in a function, are not stored.
+        """
+        # Write to a temporary file first so concurrent readers never
+        # observe a partially written entry.
+        fd, path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                pickle.dump(__version__, fp, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(list(dependencies), fp, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(component, fp, pickle.HIGHEST_PROTOCOL)
+            os.replace(path, self.path(key))
+        except (pickle.PicklingError, AttributeError, TypeError):
+            os.unlink(path)
+            return False
+        except BaseException:
+            os.unlink(path)
+            raise
+        return True
+
+    def prune(self):
+        """Remove the entries written by other versions of aptos and return
+        their number.
+        """
+        removed = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.suffix):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, 'rb') as fp:
+                    version = pickle.load(fp)
+            except Exception:
+                version = None
+            if version != __version__:
+                os.unlink(path)
+                removed += 1
+        return removed
+
+
+def canonical(instance):
+    """Return a hashable value equal for every instance equal to
+    ``instance`` and of the same types, e.g. ``1`` and ``1.0`` differ.
+    Object members are compared regardless of their order.
+    """
+    cls = instance.__class__
+    if cls is dict:
+        return dict, frozenset(
+            (name, canonical(value)) for name, value in instance.items())
+    if cls is list:
+        return list, tuple(canonical(element) for element in instance)
+    return cls, instance
+
+
+class ValidationCache:
+
+    """Remember the result of validating instances against schemas, so
+    identical sub-documents, e.g. the same address repeated across a
+    batch of records, are validated once.
+
+    Results are memoized at the values of references, or only at the
+    components listed in ``nodes`` if given. At most ``size`` results are
+    kept, the least recently used result being evicted first. Instances
+    which are cheaper to validate than to hash, i.e. scalars and arrays
+    or objects with fewer than ``threshold`` values, are validated
+    directly. A cache can be shared by threads validating instances.
+    """
+
+    def __init__(self, size=4096, threshold=2, nodes=None):
+        if size < 1:
+            raise ValueError('size MUST be greater than 0')
+        self.size = size
+        self.threshold = threshold
+        # The components are kept, so their ids are never reused.
+        self.nodes = None if nodes is None else {id(node): node for node in nodes}  # noqa: E501
+        self.results = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.skipped = 0
+
+    def memoizes(self, node, referenced=False):
+        """Whether results are memoized at ``node``, ``referenced`` telling
+        whether ``node`` is the value of a reference.
+        """
+        if self.nodes is None:
+            return referenced
+        return id(node) in self.nodes
+
+    def lookup(self, node, instance):
+        """Return the key of the result of validating ``instance`` against
+        ``node`` along with the memoized result, ``None`` if there is none
+        yet. The key is ``None`` if the result is not memoized.
+        """
+        if instance.__class__ not in (dict, list) or len(instance) < self.threshold:  # noqa: E501
+            self.skipped += 1
+            return None, None
+        try:
+            key = id(node), canonical(instance)
+            hash(key)
+        except TypeError:
+            # Values which are not JSON, e.g. sets, cannot be hashed.
+            self.skipped += 1
+            return None, None
+        with self.lock:
+            result = self.results.get(key)
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.results.move_to_end(key)
+        return key, result
+
+    def validate(self, node, visitor, *args):
+        """Validate the instance of ``visitor`` against ``node``, raising
+        an ``AssertionError`` if it is invalid.
+        """
+        key, result = self.lookup(node, visitor.instance)
+        if result is not None:
+            assert result[1] is None, result[1]
+            return
+        if key is None:
+            node.accept(visitor, *args)
+            return
+        report = visitor.report
+        skipped = 0 if report is None else report.skipped
+        try:
+            node.accept(visitor, *args)
+        except AssertionError as e:
+            self.store(key, node, e.args[0])
+            raise
+        # An instance is only known to be valid if every element of its
+        # arrays was validated, see ``aptos.sampling``.
+        if report is None or report.skipped == skipped:
+            self.store(key, node, None)
+
+    def store(self, key, node, error):
+        with self.lock:
+            # The component is kept, so its id is never reused.
+            self.results[key] = (node, error)
+            self.results.move_to_end(key)
+            while len(self.results) > self.size:
+                self.results.popitem(last=False)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def statistics(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'skipped': self.skipped,
+            'size': len(self.results),
+            'hit_rate': self.hit_rate,
+        }
+
+    def clear(self):
+        with self.lock:
+            self.results.clear()
+            self.hits = self.misses = self.skipped = 0
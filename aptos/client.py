@@ -0,0 +1,99 @@
+import json
+import os
+import socket
+import struct
+import tempfile
+
+# Each message is a JSON document preceded by its size in bytes, as an
+# unsigned 32-bit big-endian integer.
+HEADER = struct.Struct('>I')
+
+
+def default_path():
+    """Return the path of the socket the daemon listens on by default, the
+    value of ``APTOS_SOCKET`` if set.
+    """
+    return os.environ.get('APTOS_SOCKET') or os.path.join(
+        tempfile.gettempdir(), 'aptos-{}.sock'.format(os.getuid()))
+
+
+def send(fp, message):
+    data = json.dumps(message, separators=(',', ':')).encode('utf-8')
+    fp.write(HEADER.pack(len(data)) + data)
+    fp.flush()
+
+
+def receive(fp):
+    """Read the next message from ``fp``, or return ``None`` if the peer
+    closed the connection.
+    """
+    header = fp.read(HEADER.size)
+    if not header:
+        return None
+    if len(header) < HEADER.size:
+        raise ValueError('Connection closed in the middle of a message')
+    size, = HEADER.unpack(header)
+    data = fp.read(size)
+    if len(data) < size:
+        raise ValueError('Connection closed in the middle of a message')
+    return json.loads(data.decode('utf-8'))
+
+
+class Client:
+
+    """Send requests to a running ``ValidationServer``. Schemas are
+    identified by path, which is made absolute since the daemon may run in
+    another directory.
+    """
+
+    def __init__(self, path=None, timeout=None):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.settimeout(timeout)
+        try:
+            self.socket.connect(default_path() if path is None else path)
+        except OSError:
+            self.socket.close()
+            raise
+        self.fp = self.socket.makefile('rwb')
+
+    def request(self, message):
+        send(self.fp, message)
+        response = receive(self.fp)
+        if response is None:
+            raise ConnectionError('The daemon closed the connection')
+        if 'error' in response:
+            raise ValueError(response['error'])
+        return response
+
+    def validate(self, schema, instance, patterns=None):
+        """Validate ``instance`` against the schema at path ``schema``,
+        raising an ``AssertionError`` if it is invalid. ``patterns`` is the
+        name of the action of the ``PatternPolicy`` the schema is parsed
+        with.
+        """
+        response = self.request({
+            'command': 'validate',
+            'schema': os.path.abspath(schema),
+            'instance': instance,
+            'patterns': patterns,
+        })
+        assert response['valid'], response.get('message')
+
+    def convert(self, schema, format, mapping=None, patterns=None):
+        return self.request({
+            'command': 'convert',
+            'schema': os.path.abspath(schema),
+            'format': format,
+            'mapping': mapping,
+            'patterns': patterns,
+        })['result']
+
+    def close(self):
+        self.fp.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,374 @@
+from .primitive import EmptySchema, Translator
+from .regex import Program
+
+HEADER = '''"""Validate instances against a JSON Schema.
+
+Generated by aptos, do not edit. ``validate(instance)`` raises an
+``AssertionError`` describing the first violation, exactly like
+``component.accept(ValidationVisitor(instance))``.
+"""
+import re
+
+NoneType = type(None)
+
+
+def _accept(instance):
+    return
+
+
+def _any_of(instance, members):
+    errors = []
+    for member in members:
+        try:
+            member(instance)
+        except AssertionError as e:
+            errors.append(e.args[0])
+        else:
+            return
+    raise AssertionError(', '.join(errors))
+
+
+def _one_of(instance, members):
+    errors = []
+    matched = False
+    for member in members:
+        try:
+            member(instance)
+        except AssertionError as e:
+            errors.append(e.args[0])
+            continue
+        if matched:
+            raise AssertionError('instance %r is valid against more than one schema' % (instance,))  # noqa: E501
+        matched = True
+    if not matched:
+        raise AssertionError(', '.join(errors))
+
+
+def _contains(instance, member):
+    for element in instance:
+        try:
+            member(element)
+        except AssertionError:
+            continue
+        return
+    raise AssertionError('instance %r does not contain any element valid against "contains"' % (instance,))  # noqa: E501
+
+
+def _members(instance, properties, patterns, additional, names):
+    for name, member in instance.items():
+        names(name)
+        schema = properties.get(name)
+        matched = schema is not None
+        if matched:
+            schema(member)
+        for expression, schema in patterns:
+            if expression.match(name) is not None:
+                schema(member)
+                matched = True
+        if not matched:
+            additional(member)
+
+
+def _candidates(instance, name, mapping, exhaustive, members):
+    # Select the members of a tagged union from the value of a property.
+    if instance.__class__ is not dict or name not in instance:
+        return members
+    value = instance[name]
+    if value.__class__ is str and value in mapping:
+        members = mapping[value]
+    elif exhaustive:
+        members = ()
+    if not members:
+        raise AssertionError('instance %r property %r is not equal to one of the elements %r' % (instance, name, sorted(mapping)))  # noqa: E501
+    return members
+'''
+
+# NumPy is optional in generated modules too.
+NDARRAY = '''
+try:
+    from numpy import ndarray
+except ImportError:
+    ndarray = None
+'''
+
+
+class CodeGenerationVisitor:
+
+    """Generate the source code of a standalone Python module validating
+    instances against a resolved component tree.
+
+    Each schema becomes a function performing the checks of the
+    ``ValidationVisitor`` in the same order, with constants inlined and
+    regular expressions compiled once when the module is imported.
+    Visiting a schema returns the name of its function; recursive
+    references call the function of their value.
+
+    Patterns evaluated by the linear matcher, see ``PatternPolicy``, are
+    evaluated by the linear matcher of aptos in the generated module too,
+    which then depends on aptos. Formats are checked by the checkers
+    selected at parse time, imported from the modules defining them.
+    """
+
+    # Names of the Python classes in the generated module.
+    classes = {cls: cls.__name__ for cls in Translator.mapping()}
+
+    def __init__(self):
+        self.names = {}
+        self.functions = []
+        self.constants = []
+        self.values = {}
+        self.imports = []
+        self.checkers = {}
+
+    def generate(self, component):
+        """Return the source code of the module validating instances
+        against ``component``.
+        """
+        name = component.accept(self)
+        lines = [HEADER.replace('import re\n', 'import re\n' + ''.join(self.imports), 1)]  # noqa: E501
+        for function in self.functions:
+            if len(function) == 1:
+                function.append('    return')
+            lines.append('\n' + '\n'.join(function) + '\n')
+        lines.append('\n' + '\n'.join(self.constants))
+        lines.append('\nvalidate = {}\n'.format(name))
+        return '\n'.join(lines)
+
+    def require(self, statement):
+        if statement not in self.imports:
+            self.imports.append(statement)
+
+    def constant(self, prefix, value):
+        # Identical constants are shared by the functions using them.
+        if value not in self.values:
+            name = '{}_{}'.format(prefix, len(self.constants))
+            self.constants.append('{} = {}'.format(name, value))
+            self.values[value] = name
+        return self.values[value]
+
+    def expression(self, pattern, matcher):
+        # The constant compiling ``pattern`` like the resolved ``matcher``.
+        if isinstance(matcher, Program):
+            self.require('from aptos.regex import Program\n')
+            return self.constant('PATTERN', 'Program({!r}, {!r})'.format(pattern, matcher.steps))  # noqa: E501
+        return self.constant('PATTERN', 're.compile({!r})'.format(pattern))
+
+    def function(self, schema):
+        """Return the name and body of the function of ``schema``, the
+        body being ``None`` if the function has already been generated.
+        """
+        if id(schema) in self.names:
+            return self.names[id(schema)], None
+        name = '_schema_{}'.format(len(self.names))
+        self.names[id(schema)] = name
+        body = ['def {}(instance):'.format(name)]
+        self.functions.append(body)
+        return name, body
+
+    @staticmethod
+    def check(body, condition, message, *values):
+        body.append('    if not ({}):'.format(condition))
+        body.append('        raise AssertionError({!r} % ({},))  # noqa: E501'.format(  # noqa: E501
+            message, ', '.join(values)))
+
+    def visit_empty_schema(self, schema, *args):
+        return '_accept'
+
+    def visit_enumeration(self, enumeration, *args):
+        return self.visit_primitive(enumeration, *args)[0]
+
+    def visit_all_of(self, all_of, *args):
+        return [element.accept(self, *args) for element in all_of]
+
+    visit_any_of = visit_one_of = visit_array_list = visit_all_of
+
+    def visit_primitive(self, primitive, *args):
+        name, body = self.function(primitive)
+        if body is None:
+            return name, body
+        if primitive.const is not None:
+            const = self.constant('CONST', repr(primitive.const))
+            self.check(body, 'instance == {}'.format(const), 'instance %r is not equal to %r', 'instance', const)  # noqa: E501
+        if primitive.enum:
+            enum = self.constant('ENUM', repr(primitive.enum))
+            self.check(body, 'instance in {}'.format(enum), 'instance %r is not equal to one of the elements %r', 'instance', enum)  # noqa: E501
+        if primitive.type is not None:
+            classes = sorted(self.classes[cls] for cls in primitive.types)
+            if list in primitive.types:
+                # NumPy arrays are arrays too, if NumPy is installed.
+                classes = sorted(classes + ['ndarray'])
+            if 'array' in classes:
+                self.require('from array import array\n')
+            if 'ndarray' in classes:
+                self.require(NDARRAY)
+            if len(classes) == 1:
+                condition = 'instance.__class__ is {}'.format(classes[0])
+            else:
+                condition = 'instance.__class__ in {}'.format(self.constant(
+                    'TYPES', 'frozenset([{}])'.format(', '.join(classes))))
+            self.check(body, condition, 'instance %r is not in any of the sets listed %r', 'instance', repr(primitive.type))  # noqa: E501
+        for member in primitive.allOf.accept(self, *args):
+            if member != '_accept':
+                body.append('    {}(instance)'.format(member))
+        for sequence, helper in ((primitive.anyOf, '_any_of'),
+                                 (primitive.oneOf, '_one_of')):
+            if not sequence:
+                continue
+            members = self.constant('MEMBERS', '({})'.format(''.join(
+                member + ', ' for member in sequence.accept(self, *args))))
+            discriminator = sequence.discriminator
+            if discriminator is None:
+                body.append('    {}(instance, {})'.format(helper, members))
+                continue
+            mapping = self.constant('MAPPING', '{{{}}}'.format(', '.join(
+                '{!r}: ({})'.format(value, ''.join(
+                    '{}[{}], '.format(members, index) for index in indices))
+                for value, indices in sorted(discriminator.mapping.items()))))  # noqa: E501
+            body.append('    {}(instance, _candidates(instance, {!r}, {}, {!r}, {}))'.format(  # noqa: E501
+                helper, discriminator.propertyName, mapping,
+                discriminator.exhaustive, members))
+        return name, body
+
+    def visit_boolean(self, boolean, *args):
+        return self.visit_primitive(boolean, *args)[0]
+
+    def visit_null(self, null, *args):
+        return self.visit_primitive(null, *args)[0]
+
+    def visit_numeric(self, numeric, *args):
+        name, body = self.visit_primitive(numeric, *args)
+        if body is None:
+            return name
+        limits = (
+            numeric.multipleOf, numeric.maximum, numeric.exclusiveMaximum,
+            numeric.minimum, numeric.exclusiveMinimum)
+        if any(limit is not None for limit in limits):
+            body.append('    value = {}(instance)'.format(args[0]))
+        if numeric.multipleOf is not None:
+            self.check(body, 'float(value / {!r}).is_integer()'.format(numeric.multipleOf), 'instance %r division by %r is not an integer', 'value', repr(numeric.multipleOf))  # noqa: E501
+        if numeric.maximum is not None:
+            self.check(body, 'value <= {!r}'.format(numeric.maximum), 'instance %r is not less than or exactly equal to %r', 'value', repr(numeric.maximum))  # noqa: E501
+        if numeric.exclusiveMaximum is not None:
+            self.check(body, 'value < {!r}'.format(numeric.exclusiveMaximum), 'instance %r is not strictly less than (not equal to) %r', 'value', repr(numeric.exclusiveMaximum))  # noqa: E501
+        if numeric.minimum is not None:
+            self.check(body, 'value >= {!r}'.format(numeric.minimum), 'instance %r is not greater than or exactly equal to %r', 'value', repr(numeric.minimum))  # noqa: E501
+        if numeric.exclusiveMinimum is not None:
+            self.check(body, 'value > {!r}'.format(numeric.exclusiveMinimum), 'instance %r is not strictly greater than (not equal to) %r', 'value', repr(numeric.exclusiveMinimum))  # noqa: E501
+        return name
+
+    def visit_number(self, number, *args):
+        return self.visit_numeric(number, 'float')
+
+    def visit_integer(self, integer, *args):
+        return self.visit_numeric(integer, 'int')
+
+    def visit_string(self, string, *args):
+        name, body = self.visit_primitive(string, *args)
+        if body is None:
+            return name
+        if string.maxLength:
+            self.check(body, 'len(instance) <= {!r}'.format(string.maxLength), 'instance %r is not less than, or equal to to %r', 'instance', repr(string.maxLength))  # noqa: E501
+        if string.minLength:
+            self.check(body, 'len(instance) >= {!r}'.format(string.minLength), 'instance %r is not greater than, or equal to %r', 'instance', repr(string.minLength))  # noqa: E501
+        if string.pattern:
+            pattern = self.expression(string.pattern, string.matcher)
+            self.check(body, '{}.match(instance) is not None'.format(pattern), 'instance %r does not match the regular expression %r', 'instance', repr(string.pattern))  # noqa: E501
+        if string.checker is not None:
+            module = string.checker.__module__
+            qualname = string.checker.__qualname__
+            if '<' in qualname or '.' in qualname:
+                raise ValueError('cannot import the checker %r of the format %r, checkers must be module-level functions' % (string.checker, string.format))  # noqa: E501
+            key = (module, qualname)
+            if key not in self.checkers:
+                self.checkers[key] = 'FORMAT_{}'.format(len(self.checkers))
+                self.require('from {} import {} as {}\n'.format(module, qualname, self.checkers[key]))  # noqa: E501
+            self.check(body, '{}(instance)'.format(self.checkers[key]), 'instance %r is not a valid %r', 'instance', repr(string.format))  # noqa: E501
+        return name
+
+    def visit_array(self, array, *args):
+        name, body = self.visit_primitive(array, *args)
+        if body is None:
+            return name
+        if array.types - {list}:
+            # Arrays of numbers are validated as lists of Python numbers.
+            body.append('    if instance.__class__ is not list:')
+            body.append('        instance = instance.tolist()')
+        if isinstance(array.items, array.ArrayList):
+            items = self.constant('ITEMS', '({})'.format(''.join(
+                member + ', ' for member in array.items.accept(self, *args))))
+            additional = array.additionalItems.accept(self, *args)
+            body.append('    for index, element in enumerate(instance):')
+            body.append('        if index < {}:'.format(len(array.items)))
+            body.append('            {}[index](element)'.format(items))
+            body.append('        else:')
+            body.append('            {}(element)'.format(additional))
+        elif not isinstance(array.items, EmptySchema):
+            body.append('    for element in instance:')
+            body.append('        {}(element)'.format(
+                array.items.accept(self, *args)))
+        if array.maxItems:
+            self.check(body, 'len(instance) <= {!r}'.format(array.maxItems), 'instance %r is not less than, or equal to %r', 'instance', repr(array.maxItems))  # noqa: E501
+        if array.minItems:
+            self.check(body, 'len(instance) >= {!r}'.format(array.minItems), 'instance %r is not greater than, or equal to %r', 'instance', repr(array.minItems))  # noqa: E501
+        if array.uniqueItems:
+            self.check(body, 'len(set(instance)) == len(instance)', 'instance %r contains duplicate elements', 'instance')  # noqa: E501
+        if not isinstance(array.contains, EmptySchema):
+            body.append('    _contains(instance, {})'.format(
+                array.contains.accept(self, *args)))
+        return name
+
+    def visit_properties(self, properties, *args):
+        return {
+            name: member.accept(self, *args)
+            for name, member in properties.items()}
+
+    visit_pattern_properties = visit_properties
+
+    def visit_object(self, obj, *args):
+        name, body = self.visit_primitive(obj, *args)
+        if body is None:
+            return name
+        if obj.maxProperties:
+            self.check(body, 'len(instance) <= {!r}'.format(obj.maxProperties), 'instance %r number of properties is not less than, or equal to %r', 'instance', repr(obj.maxProperties))  # noqa: E501
+        if obj.minProperties:
+            self.check(body, 'len(instance) >= {!r}'.format(obj.minProperties), 'instance %r number of properties is not greater than, or equal to %r', 'instance', repr(obj.minProperties))  # noqa: E501
+        if obj.required:
+            required = self.constant('REQUIRED', 'frozenset({!r})'.format(sorted(obj.required)))  # noqa: E501
+            self.check(body, 'instance.keys() >= {}'.format(required), 'instance %r is missing required property %r', 'instance', 'min({}.difference(instance))'.format(required))  # noqa: E501
+        for key, dependency in obj.dependencies.items():
+            if dependency.__class__ is frozenset:
+                dependency = self.constant('REQUIRED', 'frozenset({!r})'.format(sorted(dependency)))  # noqa: E501
+                self.check(body, '{!r} not in instance or instance.keys() >= {}'.format(key, dependency), 'instance %r property %r depends on missing property %r', 'instance', repr(key), 'min({}.difference(instance))'.format(dependency))  # noqa: E501
+            else:
+                body.append('    if {!r} in instance:'.format(key))
+                body.append('        {}(instance)'.format(
+                    dependency.accept(self, *args)))
+        additional = obj.additionalProperties.accept(self, *args)
+        names = obj.propertyNames.accept(self, *args)
+        if obj.patternProperties or names != '_accept':
+            properties = obj.properties.accept(self, *args)
+            patterns = obj.patternProperties.accept(self, *args)
+            body.append('    _members(instance, {}, {}, {}, {})'.format(
+                self.constant('PROPERTIES', '{{{}}}'.format(', '.join(
+                    '{!r}: {}'.format(key, value)
+                    for key, value in sorted(properties.items())))),
+                self.constant('PATTERNS', '({})'.format(''.join(
+                    '({}, {}), '.format(self.expression(pattern, matcher), patterns[pattern])  # noqa: E501
+                    for matcher, pattern in obj.patternProperties.matchers))),
+                additional, names))
+        elif obj.properties or additional != '_accept':
+            properties = self.constant('PROPERTIES', '{{{}}}'.format(', '.join(
+                '{!r}: {}'.format(key, value) for key, value in sorted(
+                    obj.properties.accept(self, *args).items()))))
+            body.append('    for name, member in instance.items():')
+            body.append('        {}.get(name, {})(member)'.format(
+                properties, additional))
+        return name
+
+    def visit_reference(self, reference, *args):
+        if not reference.resolved:  # pragma: no cover
+            return '_accept'
+        return reference.value.accept(self, *args)
+
+    def visit_union(self, union, *args):
+        return self.visit_primitive(union, *args)[0]
@@ -0,0 +1,146 @@
+import errno
+import json
+import os
+import pathlib
+import socketserver
+import threading
+
+from urllib.parse import urlsplit
+from urllib.request import url2pathname
+
+from .client import Client, default_path, receive, send  # noqa: F401
+from .parser import SchemaParser
+from .primitive import Object
+from .schema import protobuf
+from .schema.visitor import AvroSchemaVisitor, ProtobufSchemaVisitor
+from .store import DocumentStore
+from .visitor import ValidationVisitor
+
+
+class SchemaRegistry:
+
+    """Parsed schemas keyed by path and pattern policy. Each schema is
+    parsed with a ``DocumentStore`` of its own, and parsed again once its
+    file, or a file it references, is modified.
+    """
+
+    def __init__(self):
+        self.schemas = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def modified(paths):
+        times = []
+        for path in paths:
+            try:
+                times.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                times.append(None)
+        return times
+
+    def get(self, path, patterns=None):
+        path = os.path.abspath(path)
+        entry = self.schemas.get((path, patterns))
+        if entry is not None and self.modified(entry[0]) == entry[1]:
+            return entry[2]
+        store = DocumentStore()
+        with open(path) as fp:
+            component = SchemaParser.parse(
+                json.load(fp), uri=pathlib.Path(path).as_uri(), store=store,
+                patterns=patterns)
+        paths = [path]
+        for uri in store.documents:
+            parts = urlsplit(uri)
+            if parts.scheme == 'file' and url2pathname(parts.path) not in paths:  # noqa: E501
+                paths.append(url2pathname(parts.path))
+        with self.lock:
+            self.schemas[path, patterns] = (paths, self.modified(paths), component)  # noqa: E501
+        return component
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        # A connection carries any number of requests.
+        while True:
+            try:
+                message = receive(self.rfile)
+            except ValueError:
+                return
+            if message is None:
+                return
+            send(self.wfile, self.server.dispatch(message))
+
+
+class ValidationServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):  # noqa: E501
+
+    """Serve validation and conversion requests over a Unix domain socket,
+    keeping parsed schemas in memory between requests.
+
+    Requests and responses are length-prefixed JSON objects:
+
+    - ``{"command": "validate", "schema": PATH, "instance": INSTANCE}``
+      returns ``{"valid": true}`` or ``{"valid": false, "message": ...}``
+    - ``{"command": "convert", "schema": PATH, "format": "avro"}`` returns
+      ``{"result": ...}``
+    - ``{"command": "ping"}`` returns ``{"result": "pong"}``
+
+    "validate" and "convert" requests may name the action of the
+    ``PatternPolicy`` the schema is parsed with as ``"patterns"``.
+    Malformed requests return ``{"error": ...}``. A server refuses to
+    start while another daemon is listening on ``path``.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path, schemas=(), patterns=None):
+        if os.path.exists(path):
+            try:
+                Client(path).close()
+            except OSError:
+                # Remove the socket left behind by a daemon which is no
+                # longer running.
+                os.unlink(path)
+            else:
+                raise OSError(errno.EADDRINUSE, 'A daemon is already listening on {!r}'.format(path))  # noqa: E501
+        super().__init__(path, RequestHandler)
+        self.path = path
+        self.registry = SchemaRegistry()
+        for schema in schemas:
+            self.registry.get(schema, patterns)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def dispatch(self, message):
+        try:
+            command = message['command']
+            if command == 'ping':
+                return {'result': 'pong'}
+            if command not in ('validate', 'convert'):
+                raise ValueError('unknown command {!r}'.format(command))
+            component = self.registry.get(
+                message['schema'], message.get('patterns'))
+            return getattr(self, command)(component, message)
+        except (KeyError, TypeError, OSError, ValueError) as e:
+            return {'error': '{}: {}'.format(e.__class__.__name__, e)}
+
+    def validate(self, component, message):
+        try:
+            component.accept(ValidationVisitor(message['instance']))
+        except AssertionError as e:
+            return {'valid': False, 'message': e.args[0]}
+        return {'valid': True}
+
+    def convert(self, component, message):
+        if not isinstance(component, Object):
+            raise ValueError('schema must be of type "object"')
+        if message['format'] == 'avro':
+            return {'result': component.accept(AvroSchemaVisitor())}
+        if message['format'] == 'protobuf':
+            visitor = ProtobufSchemaVisitor(message.get('mapping'))
+            component.accept(visitor)
+            return {'result': protobuf.dumps(visitor.definitions)}
+        raise ValueError('unknown format {!r}'.format(message['format']))
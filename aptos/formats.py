@@ -0,0 +1,209 @@
+import re
+
+# The syntax of each format is checked by a regular expression matched with
+# ``fullmatch``, which unlike "$" rejects a trailing newline, and without
+# capturing groups. Checks which regular expressions cannot express, e.g.
+# the number of days of a month, are performed in Python afterwards.
+
+# https://tools.ietf.org/html/rfc3339#section-5.6
+FULL_DATE = '[0-9]{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12][0-9]|3[01])'
+FULL_TIME = '(?:[01][0-9]|2[0-3]):[0-5][0-9]:(?:[0-5][0-9]|60)(?:\\.[0-9]+)?(?:[Zz]|[+-](?:[01][0-9]|2[0-3]):[0-5][0-9])'  # noqa: E501
+
+# https://tools.ietf.org/html/rfc1123#section-2.1
+LABEL = '[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?'
+HOSTNAME = '(?:{0}\\.)*{0}'.format(LABEL)
+
+# https://tools.ietf.org/html/rfc5322#section-3.2.3
+ATEXT = "[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+"
+
+# https://tools.ietf.org/html/rfc3986#section-3.2.2
+OCTET = '(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])'
+IPV4 = '(?:{0}\\.){{3}}{0}'.format(OCTET)
+H16 = '[0-9A-Fa-f]{1,4}'
+
+# The characters of an URI besides "#", which separates the fragment.
+# https://tools.ietf.org/html/rfc3986#appendix-A
+URI_CHARACTERS = "(?:[A-Za-z0-9._~:/?@!$&'()*+,;=\\[\\]-]|%[0-9A-Fa-f]{2})*"
+SCHEME = '[A-Za-z][A-Za-z0-9+.-]*'
+
+DATE_EXPRESSION = re.compile(FULL_DATE)
+TIME_EXPRESSION = re.compile(FULL_TIME)
+DATE_TIME_EXPRESSION = re.compile(FULL_DATE + '[Tt]' + FULL_TIME)
+HOSTNAME_EXPRESSION = re.compile(HOSTNAME + '\\.?')
+EMAIL_EXPRESSION = re.compile('{0}(?:\\.{0})*@{1}'.format(ATEXT, HOSTNAME))
+IPV4_EXPRESSION = re.compile(IPV4)
+# Eight groups, the last two of which may be an IPv4 address, or groups
+# on either side of "::".
+IPV6_EXPRESSION = re.compile('(?:{0}:){{6}}(?:{0}:{0}|{1})'.format(H16, IPV4))  # noqa: E501
+IPV6_HEAD_EXPRESSION = re.compile('(?:{0}:){{0,6}}{0}'.format(H16))
+IPV6_TAIL_EXPRESSION = re.compile('(?:{0}:){{0,6}}(?:{0}|{1})'.format(H16, IPV4))  # noqa: E501
+UUID_EXPRESSION = re.compile('-'.join(
+    '[0-9A-Fa-f]{%d}' % length for length in (8, 4, 4, 4, 12)))
+URI_REFERENCE_EXPRESSION = re.compile('{0}(?:#{0})?'.format(URI_CHARACTERS))  # noqa: E501
+URI_EXPRESSION = re.compile('{0}:{1}(?:#{1})?'.format(SCHEME, URI_CHARACTERS))  # noqa: E501
+
+# The number of days of each month of a common year.
+DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def exists(value):
+    # Whether the day of the date ``value`` exists. Every month has at least
+    # 28 days, so callers only check the last days of a month.
+    year, month, day = int(value[:4]), int(value[5:7]), int(value[8:10])
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return day <= 29
+    return day <= DAYS[month - 1]
+
+
+def date(value):
+    """Whether ``value`` is a "full-date" of RFC 3339, e.g. "2018-02-28"."""
+    return DATE_EXPRESSION.fullmatch(value) is not None and (value[8:10] <= '28' or exists(value))  # noqa: E501
+
+
+def time(value):
+    """Whether ``value`` is a "full-time" of RFC 3339, e.g.
+    "23:20:50.52Z" or "16:39:57-08:00".
+    """
+    return TIME_EXPRESSION.fullmatch(value) is not None
+
+
+def date_time(value):
+    """Whether ``value`` is a "date-time" of RFC 3339, e.g.
+    "1985-04-12T23:20:50.52Z".
+    """
+    return DATE_TIME_EXPRESSION.fullmatch(value) is not None and (value[8:10] <= '28' or exists(value))  # noqa: E501
+
+
+def hostname(value):
+    """Whether ``value`` is a host name, e.g. "www.example.com"."""
+    return (
+        len(value) <= 253 + value.endswith('.') and
+        HOSTNAME_EXPRESSION.fullmatch(value) is not None)
+
+
+def email(value):
+    """Whether ``value`` is an email address made of a dot-atom and a host
+    name, e.g. "john.doe@example.com". Quoted local parts and address
+    literals are not supported.
+    """
+    if EMAIL_EXPRESSION.fullmatch(value) is None:
+        return False
+    # The local part is at most 64 characters long, the domain 253.
+    separator = value.index('@')
+    return separator <= 64 and len(value) - separator <= 254
+
+
+def ipv4(value):
+    """Whether ``value`` is an IPv4 address in dotted-quad notation, e.g.
+    "192.168.0.1". Leading zeros are rejected since they are ambiguous.
+    """
+    return IPV4_EXPRESSION.fullmatch(value) is not None
+
+
+def ipv6(value):
+    """Whether ``value`` is an IPv6 address, e.g. "2001:db8::1". It
+    accepts the addresses of ``ipaddress.IPv6Address`` but scoped ones.
+
+    https://tools.ietf.org/html/rfc4291#section-2.2
+    """
+    head, separator, tail = value.partition('::')
+    if not separator:
+        return IPV6_EXPRESSION.fullmatch(value) is not None
+    # "::" stands for at least one group of zeros.
+    groups = 0
+    if head:
+        if IPV6_HEAD_EXPRESSION.fullmatch(head) is None:
+            return False
+        groups = head.count(':') + 1
+    if tail:
+        if IPV6_TAIL_EXPRESSION.fullmatch(tail) is None:
+            return False
+        groups += tail.count(':') + 1 + ('.' in tail)
+    return groups <= 7
+
+
+def uuid(value):
+    """Whether ``value`` is a UUID in its string representation, e.g.
+    "f81d4fae-7dec-11d0-a765-00a0c91e6bf6".
+    """
+    return UUID_EXPRESSION.fullmatch(value) is not None
+
+
+def uri_reference(value):
+    """Whether ``value`` is an URI reference, i.e. an URI or a relative
+    reference such as "../schema.json#/definitions/address".
+    """
+    return URI_REFERENCE_EXPRESSION.fullmatch(value) is not None
+
+
+def uri(value):
+    """Whether ``value`` is an absolute URI with a scheme, e.g.
+    "http://example.com/schema.json".
+    """
+    return URI_EXPRESSION.fullmatch(value) is not None
+
+
+class FormatRegistry:
+
+    """Map the names of formats, the values of the "format" keyword, to
+    the functions checking whether a string is of the format.
+
+    The checker of each "format" is selected once, when the schema is
+    parsed. Formats without a checker are not validated. Checkers are
+    module-level functions so parsed schemas can be cached and generated
+    modules can import them.
+    """
+
+    def __init__(self, formats=None):
+        self.formats = {} if formats is None else dict(formats)
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, sorted(
+            (name, '%s.%s' % (checker.__module__, checker.__qualname__))
+            for name, checker in self.formats.items()))
+
+    def register(self, name, checker=None):
+        """Register ``checker`` for the format ``name``, replacing the
+        checker of any built-in format. Without ``checker``, return a
+        decorator registering the decorated function.
+        """
+        if checker is None:
+            return lambda checker: self.register(name, checker)
+        self.formats[name] = checker
+        return checker
+
+    def key(self):
+        """Return the names of the checkers of each format, or ``None`` if
+        a checker is not a module-level function, e.g. a lambda, and so
+        cannot be identified across processes.
+        """
+        names = []
+        for name, checker in sorted(self.formats.items()):
+            qualname = getattr(checker, '__qualname__', '<unknown>')
+            if '<' in qualname:
+                return None
+            names.append([name, '%s.%s' % (checker.__module__, qualname)])
+        return names
+
+    def get(self, name):
+        return self.formats.get(name)
+
+    def copy(self):
+        return self.__class__(self.formats)
+
+
+# The formats used by every parse unless another registry is given.
+FORMATS = FormatRegistry({
+    'date': date,
+    'date-time': date_time,
+    'email': email,
+    'hostname': hostname,
+    'ipv4': ipv4,
+    'ipv6': ipv6,
+    'time': time,
+    'uri': uri,
+    'uri-reference': uri_reference,
+    'uuid': uuid,
+})
+
+register = FORMATS.register
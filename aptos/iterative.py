@@ -0,0 +1,538 @@
+import re
+
+from urllib.parse import urljoin
+
+from .primitive import Creator, EmptySchema, Reference, ndarray
+from .vectorized import residue
+from .visitor import ResolveVisitor, ValidationVisitor
+
+
+class Guard:
+
+    """Recover from the violations raised while a ``StackValidationVisitor``
+    validates an instance against the subschemas of a single keyword,
+    e.g. the members of "anyOf", one subschema at a time.
+
+    ``attempt`` pushes the work validating the instance against the next
+    subschema above a marker calling ``succeed`` once the work is done.
+    If a violation is raised instead, the work above the marker is
+    discarded and ``fail`` is called with its message.
+    """
+
+    def __init__(self, visitor, instance, depth):
+        self.visitor = visitor
+        self.instance = instance
+        self.depth = depth
+        self.height = 0
+
+    def attempt(self, action, schema, instance, depth):
+        visitor = self.visitor
+        stack = visitor.stack
+        self.height = len(stack)
+        visitor.guards.append(self)
+        stack.append((self.succeed, None, None, depth))
+        stack.append((action, schema, instance, depth))
+
+    def succeed(self, *args):
+        raise NotImplementedError()
+
+    def fail(self, message):
+        raise NotImplementedError()
+
+
+class AnyOfGuard(Guard):
+
+    def __init__(self, visitor, sequence, order, adaptive, instance, depth):
+        super().__init__(visitor, instance, depth)
+        self.sequence = sequence
+        self.order = enumerate(order)
+        self.adaptive = adaptive
+        self.position = None
+        self.errors = []
+
+    def next(self):
+        for position, index in self.order:
+            self.position = position
+            self.attempt(
+                self.visitor.enter, self.sequence[index], self.instance,
+                self.depth)
+            return
+        self.exhaust()
+
+    def exhaust(self):
+        assert False, ', '.join(self.errors)
+
+    def fail(self, message):
+        self.errors.append(message)
+        self.next()
+
+    def succeed(self, *args):
+        # Stop at the first member the instance is valid against.
+        self.visitor.guards.pop()
+        if self.adaptive:
+            self.sequence.statistics.hit(self.position)
+
+
+class OneOfGuard(AnyOfGuard):
+
+    matched = None
+
+    def exhaust(self):
+        assert self.matched is not None, ', '.join(self.errors)
+        if self.adaptive:
+            self.sequence.statistics.hit(self.matched)
+
+    def succeed(self, *args):
+        # Stop at the second member the instance is valid against.
+        self.visitor.guards.pop()
+        assert self.matched is None, 'instance %r is valid against more than one schema' % (self.instance,)  # noqa: E501
+        self.matched = self.position
+        self.next()
+
+
+class ContainsGuard(Guard):
+
+    def __init__(self, visitor, schema, instance, depth):
+        super().__init__(visitor, instance, depth)
+        self.schema = schema
+        self.elements = iter(instance)
+
+    def next(self):
+        for element in self.elements:
+            self.attempt(
+                self.visitor.child, self.schema, element, self.depth + 1)
+            return
+        assert False, 'instance %r does not contain any element valid against "contains"' % (self.instance,)  # noqa: E501
+
+    def fail(self, message):
+        self.next()
+
+    def succeed(self, *args):
+        # Validation stops at the first element valid against "contains".
+        self.visitor.guards.pop()
+
+
+class CacheGuard(Guard):
+
+    def __init__(self, visitor, cache, key, node, instance, depth):
+        super().__init__(visitor, instance, depth)
+        self.cache = cache
+        self.key = key
+        self.node = node
+        report = visitor.report
+        self.skipped = 0 if report is None else report.skipped
+
+    def fail(self, message):
+        self.cache.store(self.key, self.node, message)
+        raise AssertionError(message)
+
+    def succeed(self, *args):
+        self.visitor.guards.pop()
+        # Results of sampled validations are not memoized, see
+        # ``ValidationCache.validate``.
+        report = self.visitor.report
+        if report is None or report.skipped == self.skipped:
+            self.cache.store(self.key, self.node, None)
+
+
+class StackValidationVisitor(ValidationVisitor):
+
+    """Validate an instance without recursion, on behalf of an
+    ``IterativeValidationVisitor``.
+
+    Each entry of ``stack`` is an ``(action, schema, instance, depth)``
+    tuple calling ``action`` with the other members. Visiting a schema
+    checks the keywords of the instance itself and pushes the work
+    validating its values and subschemas, along with the work checking
+    the keywords which the recursive visitor checks after them, so
+    keywords are checked in the same order and the first violation is
+    the same. ``guards`` lists the ``Guard`` instances whose subschemas
+    are being validated, from the outermost to the innermost.
+    """
+
+    def run(self, component):
+        stack = self.stack = [(self.enter, component, self.instance, self.depth)]  # noqa: E501
+        self.guards = []
+        pop = stack.pop
+        while stack:
+            action, schema, instance, depth = pop()
+            try:
+                action(schema, instance, depth)
+            except AssertionError as e:
+                self.unwind(e)
+
+    def unwind(self, error):
+        # Discard the work of the innermost guard and let it recover,
+        # unless its keyword is violated as well.
+        guards = self.guards
+        while guards:
+            guard = guards.pop()
+            del self.stack[guard.height:]
+            try:
+                guard.fail(error.args[0])
+            except AssertionError as e:
+                error = e
+                continue
+            return
+        raise error
+
+    def enter(self, schema, instance, depth):
+        self.instance = instance
+        self.depth = depth
+        if (schema.allOf or schema.anyOf or schema.oneOf) and schema.__class__ is not Reference:  # noqa: E501
+            self.compose(schema)
+        else:
+            schema.accept(self)
+
+    def child(self, schema, instance, depth):
+        meter = self.meter
+        if meter is not None:
+            meter.count -= 1
+            if meter.count <= 0 or depth > meter.depth:
+                meter.check(depth)
+        # Same as ``enter``, saving a call per value.
+        self.instance = instance
+        self.depth = depth
+        if (schema.allOf or schema.anyOf or schema.oneOf) and schema.__class__ is not Reference:  # noqa: E501
+            self.compose(schema)
+        else:
+            schema.accept(self)
+
+    def recall(self, schema, instance, depth):
+        cache = self.cache
+        key, result = cache.lookup(schema, instance)
+        if result is not None:
+            assert result[1] is None, result[1]
+            return
+        if key is None:
+            self.enter(schema, instance, depth)
+            return
+        CacheGuard(self, cache, key, schema, instance, depth).attempt(
+            self.enter, schema, instance, depth)
+
+    def memoize(self, schema, instance, depth):
+        meter = self.meter
+        if meter is not None:
+            meter.count -= 1
+            if meter.count <= 0 or depth > meter.depth:
+                meter.check(depth)
+        self.recall(schema, instance, depth)
+
+    def compose(self, primitive):
+        instance = self.instance
+        depth = self.depth
+        if primitive.const is not None:
+            assert instance == primitive.const, 'instance %r is not equal to %r' % (instance, primitive.const)  # noqa: E501
+        if primitive.enum:
+            assert instance in primitive.enum, 'instance %r is not equal to one of the elements %r' % (instance, primitive.enum)  # noqa: E501
+        if primitive.type is not None:
+            assert instance.__class__ in primitive.types or (list in primitive.types and ndarray(instance)), 'instance %r is not in any of the sets listed %r' % (instance, primitive.type)  # noqa: E501
+        stack = self.stack
+        stack.append((self.finish, primitive, instance, depth))
+        if primitive.oneOf:
+            stack.append((self.one_of, primitive.oneOf, instance, depth))
+        if primitive.anyOf:
+            stack.append((self.any_of, primitive.anyOf, instance, depth))
+        for member in reversed(primitive.allOf):
+            stack.append((self.enter, member, instance, depth))
+
+    def finish(self, schema, instance, depth):
+        # Check the other keywords of a schema once its compositions are
+        # validated.
+        self.instance = instance
+        self.depth = depth
+        # The keywords ``visit_primitive`` checks were checked by
+        # ``compose``, so it is skipped once.
+        self.visit_primitive = self.skip
+        schema.accept(self)
+
+    def skip(self, primitive, *args):
+        del self.visit_primitive
+
+    def order(self, sequence):
+        indices = self.candidates(sequence)
+        if indices is not None:
+            return indices, False
+        if self.adaptive:
+            return sequence.statistics.order, True
+        return range(len(sequence)), False
+
+    def any_of(self, any_of, instance, depth):
+        self.instance = instance
+        order, adaptive = self.order(any_of)
+        AnyOfGuard(self, any_of, order, adaptive, instance, depth).next()
+
+    def one_of(self, one_of, instance, depth):
+        self.instance = instance
+        order, adaptive = self.order(one_of)
+        OneOfGuard(self, one_of, order, adaptive, instance, depth).next()
+
+    def visit_array(self, array, *args):
+        self.visit_primitive(array)
+
+        instance = self.instance
+        depth = self.depth
+        stack = self.stack
+        sampled = self.sampling is not None and len(instance) > self.sampling.minimum  # noqa: E501
+        remainder = None
+        if self.vectorize is not None and not sampled and (instance.__class__ is not list or len(instance) >= self.vectorize):  # noqa: E501
+            remainder = residue(array.items, instance)
+        if instance.__class__ is not list:
+            instance = self.instance = instance.tolist()
+        stack.append((self.close, array, instance, depth))
+        if isinstance(array.items, array.ArrayList):
+            stack.append((self.positions, (array, enumerate(instance)), None, depth))  # noqa: E501
+        elif not (self.prune and isinstance(array.items, EmptySchema)):
+            elements = instance
+            if sampled:
+                elements = self.sampling.sample(instance, self.report)
+            elif remainder is not None:
+                elements = remainder
+                if self.meter is not None:
+                    self.meter.advance(len(instance) - len(remainder), depth + 1)  # noqa: E501
+            action = self.child
+            if self.cache is not None and self.cache.memoizes(array.items):
+                action = self.memoize
+            stack.append((self.elements, (action, array.items, iter(elements)), None, depth))  # noqa: E501
+
+    def elements(self, state, instance, depth):
+        action, schema, elements = state
+        stack = self.stack
+        # Validate the elements in turn, until one of them pushes work; the
+        # remaining ones are validated once the work is done.
+        stack.append((self.elements, state, None, depth))
+        height = len(stack)
+        for element in elements:
+            action(schema, element, depth + 1)
+            if len(stack) > height:
+                return
+        stack.pop()
+
+    def positions(self, state, instance, depth):
+        # The elements of an array validated against an array of schemas,
+        # see ``ValidationVisitor.visit_array_list``.
+        array, elements = state
+        items = array.items
+        stack = self.stack
+        stack.append((self.positions, state, None, depth))
+        height = len(stack)
+        for i, element in elements:
+            schema = items[i] if i < len(items) else array.additionalItems
+            self.child(schema, element, depth + 1)
+            if len(stack) > height:
+                return
+        stack.pop()
+
+    def close(self, array, instance, depth):
+        if array.maxItems:
+            assert len(instance) <= array.maxItems, 'instance %r is not less than, or equal to %r' % (instance, array.maxItems)  # noqa: E501
+        assert len(instance) >= array.minItems, 'instance %r is not greater than, or equal to %r' % (instance, array.minItems)  # noqa: E501
+        if array.uniqueItems:
+            assert len(set(instance)) == len(instance), 'instance %r contains duplicate elements' % (instance,)  # noqa: E501
+        if not isinstance(array.contains, EmptySchema):
+            ContainsGuard(self, array.contains, instance, depth).next()
+
+    def visit_object(self, obj, *args):
+        self.visit_primitive(obj)
+
+        instance = self.instance
+        depth = self.depth
+        stack = self.stack
+        if obj.maxProperties:
+            assert len(instance) <= obj.maxProperties, 'instance %r number of properties is not less than, or equal to %r' % (instance, obj.maxProperties)  # noqa: E501
+        assert len(instance) >= obj.minProperties, 'instance %r number of properties is not greater than, or equal to %r' % (instance, obj.minProperties)  # noqa: E501
+        if obj.required and not instance.keys() >= obj.required:
+            assert False, 'instance %r is missing required property %r' % (instance, min(obj.required.difference(instance)))  # noqa: E501
+        if obj.patternProperties or not isinstance(obj.propertyNames, EmptySchema):  # noqa: E501
+            patternProperties = obj.patternProperties
+            matchers = patternProperties.matchers or tuple(
+                (re.compile(pattern), pattern) for pattern in patternProperties)  # noqa: E501
+            names = obj.propertyNames
+            if isinstance(names, EmptySchema):
+                names = None
+            stack.append((self.members, (obj, names, matchers, iter(instance.items())), None, depth))  # noqa: E501
+        elif obj.properties or not (self.prune and isinstance(obj.additionalProperties, EmptySchema)):  # noqa: E501
+            stack.append((self.properties, (obj, iter(instance.items())), None, depth))  # noqa: E501
+        if obj.dependencies:
+            stack.append((self.dependencies, iter(obj.dependencies.items()), instance, depth))  # noqa: E501
+
+    def dependencies(self, dependencies, instance, depth):
+        for name, dependency in dependencies:
+            if name not in instance:
+                continue
+            if dependency.__class__ is frozenset:
+                assert instance.keys() >= dependency, 'instance %r property %r depends on missing property %r' % (instance, name, min(dependency.difference(instance)))  # noqa: E501
+                continue
+            stack = self.stack
+            stack.append((self.dependencies, dependencies, instance, depth))
+            stack.append((self.enter, dependency, instance, depth))
+            return
+
+    def properties(self, state, instance, depth):
+        obj, members = state
+        properties = obj.properties
+        cache = self.cache
+        stack = self.stack
+        stack.append((self.properties, state, None, depth))
+        height = len(stack)
+        for name, member in members:
+            schema = properties.get(name)
+            if schema is None:
+                self.child(obj.additionalProperties, member, depth + 1)
+            elif cache is not None and cache.memoizes(schema):
+                self.memoize(schema, member, depth + 1)
+            else:
+                self.child(schema, member, depth + 1)
+            if len(stack) > height:
+                return
+        stack.pop()
+
+    def members(self, state, instance, depth):
+        # See ``ValidationVisitor.visit_members``.
+        obj, names, matchers, members = state
+        for name, member in members:
+            work = []
+            if names is not None:
+                work.append((self.child, names, name, depth + 1))
+            matched = False
+            schema = obj.properties.get(name)
+            if schema is not None:
+                action = self.child
+                if self.cache is not None and self.cache.memoizes(schema):
+                    action = self.memoize
+                work.append((action, schema, member, depth + 1))
+                matched = True
+            for matcher, pattern in matchers:
+                if matcher.match(name) is not None:
+                    work.append((self.child, obj.patternProperties[pattern], member, depth + 1))  # noqa: E501
+                    matched = True
+            if not matched:
+                work.append((self.child, obj.additionalProperties, member, depth + 1))  # noqa: E501
+            stack = self.stack
+            stack.append((self.members, state, None, depth))
+            stack.extend(reversed(work))
+            return
+
+    def visit_reference(self, reference, *args):
+        if reference.resolved:  # pragma: no cover
+            action = self.enter
+            if self.cache is not None and self.cache.memoizes(reference.value, True):  # noqa: E501
+                action = self.recall
+            self.stack.append((action, reference.value, self.instance, self.depth))  # noqa: E501
+
+
+class IterativeValidationVisitor(ValidationVisitor):
+
+    """Validate an instance like a ``ValidationVisitor``, with the same
+    options and the same violations, but driven by an explicit stack of
+    work instead of recursion, so instances of any depth can be validated
+    without raising a ``RecursionError``.
+
+    Visiting any schema validates the whole instance against it, e.g.
+    ``Validator(component, visitor=IterativeValidationVisitor)``. The
+    keywords are checked by a ``StackValidationVisitor``, so the visit
+    methods of subclasses are ignored.
+    """
+
+    def validate(self, component, *args):
+        visitor = object.__new__(StackValidationVisitor)
+        visitor.__dict__.update(self.__dict__)
+        visitor.prune = self.prune
+        visitor.vectorize = self.vectorize
+        visitor.run(component)
+
+    visit_empty_schema = visit_enumeration = visit_primitive = validate
+    visit_boolean = visit_null = visit_number = visit_integer = validate
+    visit_string = visit_array = visit_object = validate
+    visit_reference = visit_union = validate
+
+
+class IterativeResolveVisitor(ResolveVisitor):
+
+    """Resolve the references of a component tree like a
+    ``ResolveVisitor``, but driven by an explicit stack of work instead of
+    recursion, so schemas nested at any depth, or long chains of
+    references, can be resolved without raising a ``RecursionError``.
+
+    Visiting a component pushes the work resolving its subschemas, and
+    the work which the recursive visitor performs after them, e.g.
+    building the discriminators of "anyOf" and "oneOf", below it.
+    ``resolve`` runs the work of a component until the stack is empty.
+    """
+
+    def resolve(self, component, *args):
+        stack = self.stack = []
+        self.push(component, *args)
+        while stack:
+            function, arguments = stack.pop()
+            function(*arguments)
+        return component
+
+    def push(self, component, *args):
+        self.stack.append((component.accept, (self,) + args))
+
+    def visit_all_of(self, all_of, *args):
+        for element in reversed(all_of):
+            self.push(element, *args)
+        return all_of
+
+    visit_any_of = visit_one_of = visit_array_list = visit_all_of
+
+    def visit_subschemas(self, primitive, base):
+        self.stack.append((self.discriminate, (primitive, base)))
+        self.push(primitive.definitions, base)
+        self.push(primitive.oneOf, base)
+        self.push(primitive.anyOf, base)
+        self.push(primitive.allOf, base)
+
+    def visit_array(self, array, *args):
+        base = self.scope(array, *args)
+        self.push(array.contains, base)
+        self.push(array.additionalItems, base)
+        self.push(array.items, base)
+        self.visit_subschemas(array, base)
+        return array
+
+    def visit_properties(self, properties, *args):
+        for member in reversed(list(properties.values())):
+            self.push(member, *args)
+
+    visit_definitions = visit_properties
+
+    def visit_pattern_properties(self, properties, *args):
+        self.stack.append((self.match, (properties,)))
+        self.visit_properties(properties, *args)
+
+    def visit_dependencies(self, dependencies, *args):
+        for dependency in reversed(list(dependencies.values())):
+            if dependency.__class__ is not frozenset:
+                self.push(dependency, *args)
+
+    def visit_object(self, obj, *args):
+        base = self.scope(obj, *args)
+        self.push(obj.propertyNames, base)
+        self.push(obj.additionalProperties, base)
+        self.push(obj.dependencies, base)
+        self.push(obj.patternProperties, base)
+        self.push(obj.properties, base)
+        self.visit_subschemas(obj, base)
+        return obj
+
+    def visit_reference(self, reference, *args):
+        if reference.resolved:  # pragma: no cover
+            return reference
+        base = args[0] if args else self.document.uri
+        uri = urljoin(base, reference.address)
+        component = self.components.get(uri)
+        # The reference refers to its value once the value is resolved.
+        self.stack.append((self.bind, (reference, uri)))
+        if component is None:
+            schema, base = self.locate(uri)
+            component = Creator.create(schema.get('type')).unmarshal(schema)
+            self.components[uri] = component
+            self.push(component, base)
+        return reference
+
+    def bind(self, reference, uri):
+        reference.value = self.components[uri]
+        reference.resolved = True
@@ -0,0 +1,269 @@
+from collections import Counter
+
+from .primitive import (
+    Definitions, EmptySchema, Enumeration, Primitive, Reference)
+
+
+class CountVisitor:
+
+    """Count the schemas of a component tree by type. Each resolved
+    reference is followed once.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.seen = set()
+
+    def count(self, primitive):
+        self.counts[primitive.__class__.__name__] += 1
+
+    def visit_empty_schema(self, schema, *args):
+        self.count(schema)
+
+    def visit_enumeration(self, enumeration, *args):
+        self.visit_primitive(enumeration, *args)
+
+    def visit_all_of(self, all_of, *args):
+        for element in all_of:
+            element.accept(self, *args)
+
+    visit_any_of = visit_one_of = visit_array_list = visit_all_of
+
+    def visit_primitive(self, primitive, *args):
+        self.count(primitive)
+        primitive.allOf.accept(self, *args)
+        primitive.anyOf.accept(self, *args)
+        primitive.oneOf.accept(self, *args)
+        primitive.definitions.accept(self, *args)
+
+    visit_boolean = visit_null = visit_primitive
+    visit_number = visit_integer = visit_string = visit_union = visit_primitive  # noqa: E501
+
+    def visit_array(self, array, *args):
+        self.visit_primitive(array, *args)
+        array.items.accept(self, *args)
+        array.additionalItems.accept(self, *args)
+        array.contains.accept(self, *args)
+
+    def visit_properties(self, properties, *args):
+        for member in properties.values():
+            member.accept(self, *args)
+
+    visit_definitions = visit_pattern_properties = visit_properties
+
+    def visit_dependencies(self, dependencies, *args):
+        for dependency in dependencies.values():
+            if dependency.__class__ is not frozenset:
+                dependency.accept(self, *args)
+
+    def visit_object(self, obj, *args):
+        self.visit_primitive(obj, *args)
+        obj.properties.accept(self, *args)
+        obj.patternProperties.accept(self, *args)
+        obj.additionalProperties.accept(self, *args)
+        obj.propertyNames.accept(self, *args)
+        obj.dependencies.accept(self, *args)
+
+    def visit_reference(self, reference, *args):
+        self.count(reference)
+        if reference.resolved and id(reference.value) not in self.seen:
+            self.seen.add(id(reference.value))
+            reference.value.accept(self, *args)
+
+
+class OptimizeVisitor:
+
+    """Simplify a resolved component tree into a smaller tree accepting
+    exactly the same instances.
+
+    - resolved references are replaced by their value
+    - schemas accepting every instance, e.g. an "allOf" whose members are
+      all empty, are replaced by an ``EmptySchema``, which lets validation
+      skip the values they apply to
+    - nested "allOf" members without keywords of their own are flattened
+      and a single-member "allOf" replaces its parent
+    - type checks repeated by the members of "allOf", "anyOf" and "oneOf"
+      are performed once by the parent
+    - "definitions" are dropped since they play no role in validation
+
+    Visiting a schema returns its replacement. Schemas shared by several
+    references are never modified in place.
+    """
+
+    # Keywords which do not affect the instances a schema accepts, or which
+    # are handled by the optimizer itself.
+    ignored = frozenset([
+        'title', 'description', 'default', 'examples', 'definitions',
+        'discriminator', 'allOf', 'type', 'types', 'id'])
+
+    def __init__(self):
+        self.references = {}
+        self.shared = set()
+        self.before = self.after = None
+
+    def optimize(self, component):
+        """Return the optimized ``component`` and record the number of
+        schemas before and after optimization, see ``explain``. The
+        component is modified in place, so it must not be frozen.
+        """
+        self.before = self.measure(component)
+        component = component.accept(self)
+        self.after = self.measure(component)
+        return component
+
+    @staticmethod
+    def measure(component):
+        visitor = CountVisitor()
+        component.accept(visitor)
+        return visitor.counts
+
+    def explain(self):
+        lines = ['{:<16}{:>8}{:>8}'.format('schema', 'before', 'after')]
+        for name in sorted(self.before.keys() | self.after.keys()):
+            lines.append('{:<16}{:>8}{:>8}'.format(
+                name, self.before[name], self.after[name]))
+        lines.append('{:<16}{:>8}{:>8}'.format(
+            'total', sum(self.before.values()), sum(self.after.values())))
+        return '\n'.join(lines)
+
+    @classmethod
+    def bare(cls, primitive):
+        """Whether ``primitive`` has no keywords besides "allOf" and "type"."""
+        if isinstance(primitive, (EmptySchema, Reference)):
+            return False
+        default = vars(primitive.__class__())
+        for name, value in vars(primitive).items():
+            if name in cls.ignored:
+                continue
+            expected = default.get(name)
+            if isinstance(value, EmptySchema) and isinstance(expected, EmptySchema):  # noqa: E501
+                continue
+            if value != expected:
+                return False
+        return True
+
+    def untype(self, member, primitive):
+        # The parent validates the type before any of its subschemas.
+        if id(member) in self.shared or isinstance(member, (EmptySchema, Reference)):  # noqa: E501
+            return
+        if primitive.type is not None and member.type is not None and member.types >= primitive.types:  # noqa: E501
+            member.type = None
+            member.types = frozenset()
+
+    def visit_empty_schema(self, schema, *args):
+        return schema
+
+    def visit_enumeration(self, enumeration, *args):
+        return self.visit_primitive(enumeration, *args)
+
+    def visit_all_of(self, all_of, *args):
+        for i, element in enumerate(all_of):
+            all_of[i] = element.accept(self, *args)
+        return all_of
+
+    visit_any_of = visit_one_of = visit_array_list = visit_all_of
+
+    def visit_primitive(self, primitive, *args):
+        primitive.definitions = Definitions()
+        members = []
+        for member in primitive.allOf:
+            member = member.accept(self, *args)
+            if isinstance(member, EmptySchema):
+                continue
+            if id(member) not in self.shared and self.bare(member):
+                # Flatten the members of a nested "allOf", checking its type
+                # in the parent.
+                if member.type is not None and primitive.type is None:
+                    primitive.type = member.type
+                    primitive.types = member.types
+                if member.type is None or member.types >= primitive.types:
+                    members.extend(member.allOf)
+                    continue
+            members.append(member)
+        primitive.allOf = primitive.allOf.__class__(members)
+
+        primitive.anyOf.accept(self, *args)
+        if any(isinstance(member, EmptySchema) for member in primitive.anyOf):
+            # Every instance is valid against at least one member.
+            primitive.anyOf = primitive.anyOf.__class__()
+        primitive.oneOf.accept(self, *args)
+
+        if primitive.__class__ in (Primitive, Enumeration) and primitive.type is None and self.bare(primitive):  # noqa: E501
+            if not members:
+                return EmptySchema()
+            if len(members) == 1:
+                return members[0]
+            for member in members:
+                # Check the type required by one of the members first.
+                if not isinstance(member, (EmptySchema, Reference)) and member.type is not None:  # noqa: E501
+                    primitive.type = member.type
+                    primitive.types = member.types
+                    break
+        for member in members + primitive.anyOf + primitive.oneOf:
+            self.untype(member, primitive)
+        return primitive
+
+    def visit_boolean(self, boolean, *args):
+        return self.visit_primitive(boolean, *args)
+
+    def visit_null(self, null, *args):
+        return self.visit_primitive(null, *args)
+
+    def visit_number(self, number, *args):
+        return self.visit_primitive(number, *args)
+
+    def visit_integer(self, integer, *args):
+        return self.visit_primitive(integer, *args)
+
+    def visit_string(self, string, *args):
+        return self.visit_primitive(string, *args)
+
+    def visit_array(self, array, *args):
+        array = self.visit_primitive(array, *args)
+        array.items = array.items.accept(self, *args)
+        array.additionalItems = array.additionalItems.accept(self, *args)
+        if not isinstance(array.contains, EmptySchema):
+            # An empty "contains" still requires a non-empty array.
+            contains = array.contains.accept(self, *args)
+            if not isinstance(contains, EmptySchema):
+                array.contains = contains
+        return array
+
+    def visit_properties(self, properties, *args):
+        for name, member in properties.items():
+            properties[name] = member.accept(self, *args)
+        return properties
+
+    visit_pattern_properties = visit_properties
+
+    def visit_dependencies(self, dependencies, *args):
+        for name, dependency in dependencies.items():
+            if dependency.__class__ is not frozenset:
+                dependencies[name] = dependency.accept(self, *args)
+        return dependencies
+
+    def visit_object(self, obj, *args):
+        obj = self.visit_primitive(obj, *args)
+        obj.properties.accept(self, *args)
+        obj.patternProperties.accept(self, *args)
+        obj.dependencies.accept(self, *args)
+        obj.additionalProperties = obj.additionalProperties.accept(self, *args)  # noqa: E501
+        obj.propertyNames = obj.propertyNames.accept(self, *args)
+        return obj
+
+    def visit_reference(self, reference, *args):
+        if not reference.resolved:  # pragma: no cover
+            return reference
+        key = id(reference.value)
+        if key in self.references:
+            # A recursive reference keeps pointing to its value.
+            return self.references[key] or reference
+        self.references[key] = None
+        value = reference.value.accept(self, *args)
+        reference.value = value
+        self.shared.add(id(value))
+        self.references[key] = value
+        return value
+
+    def visit_union(self, union, *args):
+        return self.visit_primitive(union, *args)
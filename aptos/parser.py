@@ -1,5 +1,6 @@
+from .iterative import IterativeResolveVisitor
+from .optimizer import OptimizeVisitor
 from .primitive import Creator
-from .visitor import ResolveVisitor
 
 
 class Parser:
@@ -12,7 +13,34 @@ class Parser:
 class SchemaParser(Parser):
 
     @staticmethod
-    def parse(schema):
+    def parse(schema, optimize=False, uri='', store=None, freeze=True,
+              patterns=None, formats=None):
+        """Parse ``schema`` retrieved from ``uri``, the base URI of its
+        relative references. Referenced documents are loaded through
+        ``store``, by default a store shared by every parse.
+
+        The component tree is frozen unless ``freeze`` is false, so it can
+        be shared by any number of threads. ``patterns`` is the
+        ``PatternPolicy``, or the name of its action, deciding how
+        patterns which may backtrack in super-linear time are evaluated.
+        ``formats`` is the ``FormatRegistry`` of the checkers of the
+        "format" keyword, by default the built-in formats.
+        """
         component = Creator.create(schema.get('type')).unmarshal(schema)
-        component.accept(ResolveVisitor(schema))
-        return component
+        IterativeResolveVisitor(schema, uri, store, patterns, formats).resolve(component)  # noqa: E501
+        if optimize:
+            component = OptimizeVisitor().optimize(component)
+        return component.freeze() if freeze else component
+
+    @staticmethod
+    def extract(schema, pointer, uri='', store=None, freeze=True,
+                patterns=None, formats=None):
+        """Parse the subschema of ``schema`` at JSON Pointer ``pointer``,
+        e.g. "/definitions/address", to validate instances against it
+        alone.
+        """
+        visitor = IterativeResolveVisitor(schema, uri, store, patterns, formats)  # noqa: E501
+        subschema, base = visitor.document.locate(pointer)
+        component = Creator.create(subschema.get('type')).unmarshal(subschema)
+        visitor.resolve(component, base)
+        return component.freeze() if freeze else component
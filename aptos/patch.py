@@ -0,0 +1,329 @@
+import re
+
+from copy import deepcopy
+
+from .primitive import Array, EmptySchema, Object, Reference
+from .store import unescape
+from .visitor import ValidationVisitor
+
+INDEX = re.compile(r'^(0|[1-9][0-9]*)$')
+
+
+def split(pointer):
+    """Return the reference tokens of a JSON Pointer.
+
+    https://tools.ietf.org/html/rfc6901#section-3
+    """
+    if pointer == '':
+        return []
+    if not isinstance(pointer, str) or not pointer.startswith('/'):
+        raise ValueError('%r is not a JSON Pointer' % (pointer,))
+    return [unescape(token) for token in pointer[1:].split('/')]
+
+
+class Edit:
+
+    """The application of a JSON Patch to a document, in place.
+
+    ``modified`` lists the values the patch modified as pairs of the
+    reference tokens of the value, array indices being integers, and
+    whether the value itself was replaced. Removing a value modifies the
+    object or array which contained it.
+    """
+
+    def __init__(self, document):
+        # The document is held by a list, so that replacing it is like
+        # replacing any other value.
+        self.root = [document]
+        self.undo = []
+        self.modified = []
+
+    @property
+    def document(self):
+        return self.root[0]
+
+    def revert(self):
+        """Undo every operation applied so far and return the original
+        document.
+        """
+        while self.undo:
+            self.undo.pop()()
+        self.modified = []
+        return self.document
+
+    def locate(self, pointer, append=False):
+        """Return the object or array containing the value ``pointer``
+        refers to, the name or index of the value and its reference tokens.
+        """
+        tokens = split(pointer)
+        container, key, path = self.root, 0, []
+        for position, token in enumerate(tokens):
+            try:
+                container = container[key]
+            except (LookupError, TypeError):
+                raise ValueError('%r does not refer to any value' % (pointer,))  # noqa: E501
+            if isinstance(container, dict):
+                key = token
+            elif isinstance(container, list):
+                last = position == len(tokens) - 1
+                if append and last and token == '-':
+                    key = len(container)
+                elif INDEX.match(token) is None:
+                    raise ValueError('%r is not an array index of %r' % (token, pointer))  # noqa: E501
+                else:
+                    key = int(token)
+                if key > len(container) or (key == len(container) and not (append and last)):  # noqa: E501
+                    raise ValueError('%r does not refer to any value' % (pointer,))  # noqa: E501
+            else:
+                raise ValueError('%r does not refer to any value' % (pointer,))
+            path.append(key)
+        return container, key, path
+
+    def get(self, pointer):
+        container, key, path = self.locate(pointer)
+        try:
+            return container[key]
+        except KeyError:
+            raise ValueError('%r does not refer to any value' % (pointer,))
+
+    def shift(self, path, offset):
+        # Inserting or removing an array element moves the elements after
+        # it, including those modified by previous operations.
+        prefix, index = path[:-1], path[-1]
+        depth = len(prefix)
+        modified = []
+        for tokens, replaced in self.modified:
+            if len(tokens) > depth and tokens[:depth] == prefix and isinstance(tokens[depth], int) and tokens[depth] >= index:  # noqa: E501
+                if offset < 0 and tokens[depth] == index:
+                    # The removal of the element is recorded by the caller.
+                    continue
+                tokens = tokens[:depth] + [tokens[depth] + offset] + tokens[depth + 1:]  # noqa: E501
+            modified.append((tokens, replaced))
+        self.modified = modified
+
+    def add(self, pointer, value):
+        container, key, path = self.locate(pointer, append=True)
+        if isinstance(container, list) and container is not self.root:
+            container.insert(key, value)
+            self.shift(path, 1)
+            self.undo.append(lambda: container.pop(key))
+        elif isinstance(container, list) or key in container:
+            previous = container[key]
+            container[key] = value
+            self.undo.append(lambda: container.__setitem__(key, previous))
+        else:
+            container[key] = value
+            self.undo.append(lambda: container.pop(key))
+        self.modified.append((path, True))
+
+    def remove(self, pointer):
+        container, key, path = self.locate(pointer)
+        if container is self.root:
+            raise ValueError('the document itself cannot be removed')
+        try:
+            value = container.pop(key)
+        except KeyError:
+            raise ValueError('%r does not refer to any value' % (pointer,))
+        if isinstance(container, list):
+            self.undo.append(lambda: container.insert(key, value))
+            self.shift(path, -1)
+        else:
+            self.undo.append(lambda: container.__setitem__(key, value))
+        self.modified.append((path[:-1], False))
+        return value
+
+    def replace(self, pointer, value):
+        container, key, path = self.locate(pointer)
+        if isinstance(container, dict) and key not in container:
+            raise ValueError('%r does not refer to any value' % (pointer,))
+        previous = container[key]
+        container[key] = value
+        self.undo.append(lambda: container.__setitem__(key, previous))
+        self.modified.append((path, True))
+
+    def move(self, source, pointer):
+        if pointer.startswith(source + '/'):
+            raise ValueError('%r cannot be moved into one of its children %r' % (source, pointer))  # noqa: E501
+        self.add(pointer, self.remove(source))
+
+    def copy(self, source, pointer):
+        self.add(pointer, deepcopy(self.get(source)))
+
+    def test(self, pointer, value):
+        if self.get(pointer) != value:
+            raise ValueError('%r is not equal to %r' % (pointer, value))
+
+
+class Patch:
+
+    """A JSON Patch, a sequence of operations modifying a JSON document.
+
+    https://tools.ietf.org/html/rfc6902
+    """
+
+    # The members of each operation besides "op" and "path".
+    members = {
+        'add': ('value',),
+        'remove': (),
+        'replace': ('value',),
+        'move': ('from',),
+        'copy': ('from',),
+        'test': ('value',),
+    }
+
+    def __init__(self, operations):
+        self.operations = operations
+
+    def apply(self, document):
+        """Apply every operation to ``document`` in place and return the
+        resulting ``Edit``. If any operation fails, a ``ValueError`` is
+        raised and the document is left unmodified.
+        """
+        edit = Edit(document)
+        try:
+            for operation in self.operations:
+                self.perform(edit, operation)
+        except ValueError:
+            edit.revert()
+            raise
+        return edit
+
+    def perform(self, edit, operation):
+        try:
+            members = self.members[operation['op']]
+            arguments = [operation[member] for member in members]
+            pointer = operation['path']
+        except (KeyError, TypeError):
+            raise ValueError('invalid operation %r' % (operation,))
+        if members == ('from',):
+            arguments.append(pointer)
+        else:
+            arguments.insert(0, pointer)
+        getattr(edit, operation['op'])(*arguments)
+
+
+class IncrementalValidator:
+
+    """Keep a document valid against a component while it is edited with
+    JSON Patches, revalidating only the values each patch modified.
+
+    The schemas along the path of a modified value only check the
+    keywords which apply to the object or array itself, e.g. "required"
+    or "maxItems", and the modified value is validated against the
+    schema its name or index selects. Schemas whose verdict depends on
+    other values, e.g. "anyOf", "enum" or "items" listing schemas by
+    position, are validated entirely.
+
+    ``valid`` tells whether ``document`` is already known to be valid,
+    otherwise the next patch validates the whole document.
+    """
+
+    def __init__(self, component, document, valid=False,
+                 visitor=ValidationVisitor, **options):
+        self.component = component
+        self.document = document
+        self.valid = valid
+        self.visitor = visitor
+        self.options = options
+
+    def validate(self):
+        self.valid = False
+        self.component.accept(self.visitor(self.document, **self.options))
+        self.valid = True
+
+    def apply(self, patch, rollback=True):
+        """Apply ``patch``, a ``Patch`` or a list of operations, to the
+        document and revalidate it, raising an ``AssertionError`` if the
+        result is invalid. The patch is then undone, unless ``rollback``
+        is false.
+        """
+        if not isinstance(patch, Patch):
+            patch = Patch(patch)
+        edit = patch.apply(self.document)
+        self.document = edit.document
+        try:
+            if self.valid:
+                for tokens, replaced in edit.modified:
+                    self.revalidate(tokens, replaced)
+            else:
+                self.validate()
+        except AssertionError:
+            if rollback:
+                self.document = edit.revert()
+            else:
+                self.valid = False
+            raise
+        self.valid = True
+        return self.document
+
+    @staticmethod
+    def local(schema):
+        """Whether the verdict of ``schema`` on an object or array only
+        depends on the keywords applying to the container and the verdicts
+        of its values.
+        """
+        if not isinstance(schema, (Object, Array)):
+            return False
+        if schema.const is not None or schema.enum or schema.allOf or schema.anyOf or schema.oneOf:  # noqa: E501
+            return False
+        if isinstance(schema, Array):
+            return not isinstance(schema.items, Array.ArrayList) and isinstance(schema.contains, EmptySchema)  # noqa: E501
+        # Several schemas may apply to a member, and schema dependencies to
+        # the whole object.
+        return not schema.patternProperties and all(
+            dependency.__class__ is frozenset
+            for dependency in schema.dependencies.values())
+
+    def check(self, schema, instance):
+        """Validate the keywords of ``schema`` applying to the object or
+        array ``instance`` itself.
+        """
+        assert instance.__class__ in schema.types, 'instance %r is not in any of the sets listed %r' % (instance, schema.type)  # noqa: E501
+        if isinstance(schema, Object):
+            if schema.maxProperties:
+                assert len(instance) <= schema.maxProperties, 'instance %r number of properties is not less than, or equal to %r' % (instance, schema.maxProperties)  # noqa: E501
+            assert len(instance) >= schema.minProperties, 'instance %r number of properties is not greater than, or equal to %r' % (instance, schema.minProperties)  # noqa: E501
+            if schema.required and not instance.keys() >= schema.required:
+                assert False, 'instance %r is missing required property %r' % (instance, min(schema.required.difference(instance)))  # noqa: E501
+            if schema.dependencies:
+                schema.dependencies.accept(self.visitor(instance, **self.options))  # noqa: E501
+            if not isinstance(schema.propertyNames, EmptySchema):
+                # Names are only validated, not the values of the members.
+                for name in instance:
+                    schema.propertyNames.accept(
+                        self.visitor(name, **self.options))
+        else:
+            if schema.maxItems:
+                assert len(instance) <= schema.maxItems, 'instance %r is not less than, or equal to %r' % (instance, schema.maxItems)  # noqa: E501
+            assert len(instance) >= schema.minItems, 'instance %r is not greater than, or equal to %r' % (instance, schema.minItems)  # noqa: E501
+            if schema.uniqueItems:
+                assert len(set(instance)) == len(instance), 'instance %r contains duplicate elements' % (instance,)  # noqa: E501
+
+    @staticmethod
+    def child(schema, token):
+        if isinstance(schema, Object):
+            return schema.properties.get(token, schema.additionalProperties)
+        return schema.items
+
+    def revalidate(self, tokens, replaced):
+        """Revalidate the value ``tokens`` refer to, the whole value if it
+        was ``replaced`` and otherwise only its own keywords.
+        """
+        schema, value = self.component, self.document
+        for depth in range(len(tokens) + 1):
+            while isinstance(schema, Reference):
+                schema = schema.value
+            if isinstance(schema, EmptySchema):
+                return
+            if not self.local(schema) or (replaced and depth == len(tokens)):  # noqa: E501
+                schema.accept(self.visitor(value, **self.options))
+                return
+            self.check(schema, value)
+            if depth == len(tokens):
+                return
+            try:
+                value = value[tokens[depth]]
+            except (LookupError, TypeError):
+                # The value was removed by a later operation.
+                return
+            schema = self.child(schema, tokens[depth])
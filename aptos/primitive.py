@@ -1,13 +1,90 @@
+import array
 import re
 
 from copy import deepcopy
+from urllib.parse import urljoin
 
 
 class Component:
 
+    # Frozen components reject any modification, so a single tree can be
+    # shared by every thread validating instances.
+    frozen = False
+
+    def __setattr__(self, name, value):
+        if self.frozen:
+            raise AttributeError('%s is frozen' % (self.__class__.__name__,))
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name):
+        if self.frozen:
+            raise AttributeError('%s is frozen' % (self.__class__.__name__,))
+        super().__delattr__(name)
+
     def accept(self, visitor, *args):
         raise NotImplementedError()
 
+    def freeze(self):
+        """Freeze this component and every component it refers to, e.g.
+        its subschemas and the values of its references.
+        """
+        seen = set()
+        stack = [self]
+        while stack:
+            value = stack.pop()
+            if id(value) in seen:
+                continue
+            seen.add(id(value))
+            if isinstance(value, Component):
+                stack.extend(vars(value).values())
+            if isinstance(value, dict):
+                stack.extend(value.values())
+            elif isinstance(value, (list, tuple)):
+                stack.extend(value)
+            if isinstance(value, Component):
+                value.frozen = True
+        return self
+
+
+def mutator(method):
+    """Wrap a method modifying a container component so it fails once the
+    component is frozen.
+    """
+    def wrapper(self, *args, **kwargs):
+        if self.frozen:
+            raise TypeError('%s is frozen' % (self.__class__.__name__,))
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+class ComponentList(Component, list):
+
+    __setitem__ = mutator(list.__setitem__)
+    __delitem__ = mutator(list.__delitem__)
+    __iadd__ = mutator(list.__iadd__)
+    __imul__ = mutator(list.__imul__)
+    append = mutator(list.append)
+    clear = mutator(list.clear)
+    extend = mutator(list.extend)
+    insert = mutator(list.insert)
+    pop = mutator(list.pop)
+    remove = mutator(list.remove)
+    reverse = mutator(list.reverse)
+    sort = mutator(list.sort)
+
+
+class ComponentDict(Component, dict):
+
+    __setitem__ = mutator(dict.__setitem__)
+    __delitem__ = mutator(dict.__delitem__)
+    clear = mutator(dict.clear)
+    pop = mutator(dict.pop)
+    popitem = mutator(dict.popitem)
+    setdefault = mutator(dict.setdefault)
+    update = mutator(dict.update)
+    if hasattr(dict, '__ior__'):
+        __ior__ = mutator(dict.__ior__)
+
 
 class Creator:
 
@@ -28,22 +105,195 @@ class Creator:
         }[identifier.__class__](identifier)
 
 
+def ndarray(instance):
+    """Whether ``instance`` is a NumPy array, an array of numbers like
+    an ``array.array``. Arrays are recognized by the name of their class,
+    so importing aptos does not import NumPy, which is optional.
+    """
+    cls = instance.__class__
+    return cls.__name__ == 'ndarray' and cls.__module__ == 'numpy'
+
+
 class Translator:
 
     @staticmethod
     def translate(instance):
-        return {
+        if ndarray(instance):
+            return Array
+        return Translator.mapping()[instance.__class__]
+
+    @staticmethod
+    def mapping():
+        mapping = {
             bool: Boolean,
             type(None): Null,
             int: Integer,
             float: Number,
             str: String,
             list: Array,
+            # Arrays of numbers, see ``aptos.vectorized``.
+            array.array: Array,
             dict: Object,
-        }[instance.__class__]
+        }
+        return mapping
 
+    @staticmethod
+    def classes(identifier):
+        """Return the set of Python classes whose instances are of the JSON
+        Schema type(s) ``identifier``.
+        """
+        identifiers = [identifier] if isinstance(identifier, str) else identifier  # noqa: E501
+        return frozenset(
+            cls for cls, primitive in Translator.mapping().items()
+            if primitive.__name__.lower() in identifiers)
 
-class SchemaArray(Component, list):
+
+class BranchStatistics:
+
+    """Count the instances validated by each member of a ``SchemaArray``.
+
+    ``order`` lists the member indices from the most to the least
+    successful member. It is replaced rather than modified, so a
+    concurrent reader always observes a consistent permutation.
+    """
+
+    def __init__(self, size):
+        self.hits = [0] * size
+        self.order = tuple(range(size))
+
+    def hit(self, position):
+        order = self.order
+        index = order[position]
+        hits = self.hits
+        hits[index] += 1
+        if position and hits[order[position - 1]] < hits[index]:
+            # Move the member one position closer to the front.
+            order = list(order)
+            order[position - 1], order[position] = index, order[position - 1]
+            self.order = tuple(order)
+
+
+class Discriminator:
+
+    """Select the members of "anyOf" or "oneOf" an object instance may be
+    valid against from the value of a single property, e.g. a tagged union
+    whose members each declare a "const" value for the property
+    "eventType".
+
+    ``mapping`` maps each property value to the indices of the candidate
+    members. If ``exhaustive`` is true, the instance is invalid against
+    every member absent from the mapping; otherwise every member is
+    evaluated.
+    """
+
+    def __init__(self, propertyName, mapping, exhaustive=True):
+        self.propertyName = propertyName
+        self.mapping = mapping
+        self.exhaustive = exhaustive
+
+    def candidates(self, instance):
+        """Return the indices of the members the instance may be valid
+        against, or ``None`` if every member must be evaluated.
+        """
+        if instance.__class__ is not dict or self.propertyName not in instance:  # noqa: E501
+            return None
+        value = instance[self.propertyName]
+        if value.__class__ is str and value in self.mapping:
+            return self.mapping[value]
+        return () if self.exhaustive else None
+
+    @staticmethod
+    def dereference(component):
+        while isinstance(component, Reference):
+            component = component.value
+        return component
+
+    @classmethod
+    def constants(cls, component):
+        """Return the string values a schema restricts an instance to, or
+        ``None`` if it is not restricted to strings.
+        """
+        component = cls.dereference(component)
+        if isinstance(component.const, str):
+            return [component.const]
+        if component.enum and all(isinstance(value, str) for value in component.enum):  # noqa: E501
+            return component.enum
+        return None
+
+    @classmethod
+    def infer(cls, sequence):
+        """Detect the property whose "const" or "enum" keyword tells the
+        members of ``sequence`` apart.
+        """
+        candidates = {}
+        for index, member in enumerate(sequence):
+            member = cls.dereference(member)
+            if not isinstance(member, Object):
+                continue
+            for name, schema in member.properties.items():
+                values = cls.constants(schema)
+                if values is not None:
+                    candidates.setdefault(name, []).append((index, values))
+        if not candidates:
+            return None
+        # Prefer the property telling the most members apart.
+        propertyName = max(
+            sorted(candidates), key=lambda name: len(candidates[name]))
+        members = candidates[propertyName]
+        if len(members) < 2:
+            return None
+        constrained = {index for index, values in members}
+        # Members which do not constrain the property are always evaluated.
+        unconstrained = [
+            index for index in range(len(sequence))
+            if index not in constrained]
+        mapping = {}
+        for index, values in members:
+            for value in values:
+                mapping.setdefault(value, set()).add(index)
+        return cls(propertyName, {
+            value: tuple(sorted(indices | set(unconstrained)))
+            for value, indices in mapping.items()
+        }, exhaustive=not unconstrained)
+
+    @classmethod
+    def unmarshal(cls, schema, sequence, base=''):
+        """Build the lookup table of an OpenAPI discriminator object, whose
+        mapping values are either schema names or references, relative to
+        the base URI ``base`` of the members of ``sequence``.
+
+        https://swagger.io/specification/#discriminatorObject
+        """
+        names = [
+            member.address.split('/')[-1] if isinstance(member, Reference) else None  # noqa: E501
+            for member in sequence]
+        mapping = {}
+        for value, address in schema.get('mapping', {}).items():
+            if '/' in address or '#' in address:
+                uri = urljoin(base, address)
+                indices = tuple(
+                    index for index, member in enumerate(sequence)
+                    if isinstance(member, Reference) and urljoin(base, member.address) == uri)  # noqa: E501
+            else:
+                indices = tuple(
+                    index for index, name in enumerate(names)
+                    if name == address)
+            # Every member is evaluated if the mapping value refers to none
+            # of them.
+            mapping[value] = indices or tuple(range(len(sequence)))
+        for index, name in enumerate(names):
+            # When no mapping is given, the value is the schema name.
+            if name is not None:
+                mapping.setdefault(name, (index,))
+        return cls(schema['propertyName'], mapping, exhaustive=False)
+
+
+class SchemaArray(ComponentList):
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.statistics = BranchStatistics(len(self))
+        self.discriminator = None
 
     @classmethod
     def unmarshal(cls, schema):
@@ -74,10 +324,12 @@ class Primitive(Component):
 
     def __init__(self, enum=None, const=None, type=None, allOf=None,
                  anyOf=None, oneOf=None, definitions=None, title='',
-                 description='', default=None, examples=None, **kwargs):
+                 description='', default=None, examples=None,
+                 discriminator=None, **kwargs):
         self.enum = [] if enum is None else list(set(enum))
         self.const = const
         self.type = type
+        self.types = frozenset() if type is None else Translator.classes(type)
         self.allOf = AllOf() if allOf is None else allOf
         self.anyOf = AnyOf() if anyOf is None else anyOf
         self.oneOf = OneOf() if oneOf is None else oneOf
@@ -86,6 +338,9 @@ class Primitive(Component):
         self.description = description
         self.default = default
         self.examples = [] if examples is None else list(examples)
+        self.discriminator = discriminator
+        # The base URI of the references of the subschemas.
+        self.id = kwargs.get('$id')
 
     @classmethod
     def unmarshal(cls, schema):
@@ -131,9 +386,9 @@ class Null(Primitive):
 
 class NumericType(Primitive):
 
-    def __init__(self, multipleOf=1, maximum=None, exclusiveMaximum=None,
+    def __init__(self, multipleOf=None, maximum=None, exclusiveMaximum=None,
                  minimum=None, exclusiveMinimum=None, **kwargs):
-        if multipleOf < 1:
+        if multipleOf is not None and multipleOf <= 0:
             raise ValueError('The value of "multipleOf" MUST be a number, strictly greater than 0.')  # noqa: E501
         super().__init__(**kwargs)
         self.multipleOf = multipleOf
@@ -157,11 +412,17 @@ class Number(NumericType):
 
 class String(Primitive):
 
-    def __init__(self, maxLength=0, minLength=0, pattern='', **kwargs):
+    def __init__(self, maxLength=0, minLength=0, pattern='', format='',
+                 **kwargs):
         super().__init__(**kwargs)
         self.maxLength = maxLength
         self.minLength = minLength
         self.pattern = pattern
+        self.format = format
+        # The compiled pattern, see ``aptos.regex.PatternPolicy``.
+        self.matcher = None
+        # The function checking the format, see ``aptos.formats``.
+        self.checker = None
 
     def accept(self, visitor, *args):
         return visitor.visit_string(self, *args)
@@ -169,7 +430,7 @@ class String(Primitive):
 
 class Array(Primitive):
 
-    class ArrayList(Component, list):
+    class ArrayList(ComponentList):
 
         @classmethod
         def unmarshal(cls, schema):
@@ -212,7 +473,7 @@ class Array(Primitive):
         return visitor.visit_array(self, *args)
 
 
-class SchemaMap(Component, dict):
+class SchemaMap(ComponentDict):
 
     @classmethod
     def unmarshal(cls, schema):
@@ -233,6 +494,36 @@ class Definitions(SchemaMap):
         return visitor.visit_definitions(self, *args)
 
 
+class PatternProperties(SchemaMap):
+
+    """Map regular expressions to the schemas of the members whose names
+    match them. Once resolved, ``matchers`` pairs the compiled expression
+    of each pattern, see ``aptos.regex.PatternPolicy``, with the pattern.
+    """
+
+    matchers = ()
+
+    def accept(self, visitor, *args):
+        return visitor.visit_pattern_properties(self, *args)
+
+
+class Dependencies(ComponentDict):
+
+    """Map the names of properties to the set of names of the properties
+    they require, or to the schema the whole object must be valid against
+    when they are present.
+    """
+
+    @classmethod
+    def unmarshal(cls, schema):
+        return cls({
+            name: frozenset(member) if isinstance(member, list) else Creator.create(member.get('type')).unmarshal(member)  # noqa: E501
+            for name, member in schema.items()})
+
+    def accept(self, visitor, *args):
+        return visitor.visit_dependencies(self, *args)
+
+
 class Object(Primitive):
 
     def __init__(self, maxProperties=0, minProperties=0, required=None,
@@ -242,23 +533,35 @@ class Object(Primitive):
         super().__init__(**kwargs)
         self.maxProperties = maxProperties
         self.minProperties = minProperties
-        self.required = [] if required is None else list(set(required))
+        # The names are compared with those of instances as sets.
+        self.required = frozenset() if required is None else frozenset(required)  # noqa: E501
         self.properties = Properties() if properties is None else properties
-        self.patternProperties = patternProperties
+        self.patternProperties = (
+            PatternProperties() if patternProperties is None
+            else patternProperties)
         self.additionalProperties = EmptySchema() if additionalProperties is None else additionalProperties  # noqa: E501
-        self.dependencies = dependencies
+        self.dependencies = (
+            Dependencies() if dependencies is None else dependencies)
         self.propertyNames = (
-            EmptySchema() if properties is None else propertyNames)
+            EmptySchema() if propertyNames is None else propertyNames)
 
     @classmethod
     def unmarshal(cls, schema):
         schema = deepcopy(schema)
         schema['properties'] = (
             Properties.unmarshal(schema.get('properties', {})))
+        schema['patternProperties'] = (
+            PatternProperties.unmarshal(schema.get('patternProperties', {})))
+        schema['dependencies'] = (
+            Dependencies.unmarshal(schema.get('dependencies', {})))
         if schema.get('additionalProperties') is not None:
             schema['additionalProperties'] = (
                 Creator.create(schema['additionalProperties'].get('type'))
             ).unmarshal(schema['additionalProperties'])
+        if schema.get('propertyNames') is not None:
+            schema['propertyNames'] = (
+                Creator.create(schema['propertyNames'].get('type'))
+            ).unmarshal(schema['propertyNames'])
         return super().unmarshal(schema)
 
     def accept(self, visitor, *args):
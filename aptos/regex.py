@@ -0,0 +1,545 @@
+import re
+import warnings
+
+from .budget import BudgetExceededError
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # pragma: no cover
+    import sre_constants
+    import sre_parse
+
+MAXREPEAT = sre_constants.MAXREPEAT
+
+# Repetitions allowing more than this number of iterations may make a
+# backtracking matcher take super-linear time.
+LARGE = 32
+
+# Flags the linear matcher does not support.
+UNSUPPORTED = re.IGNORECASE | re.MULTILINE | re.LOCALE
+
+REPEATS = tuple(
+    getattr(sre_constants, name) for name in
+    ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')
+    if hasattr(sre_constants, name))
+
+# Python 3.11 added atomic groups.
+ATOMIC_GROUP = getattr(sre_constants, 'ATOMIC_GROUP', None)
+
+# The instructions of a ``Program``.
+CHAR, TEST, SPLIT, JMP, ASSERT, MATCH = range(6)
+
+
+class BacktrackingWarning(UserWarning):
+
+    """A "pattern" may take super-linear time to match some strings."""
+
+
+def category(code, ascii=False):
+    """Return a function testing whether a character belongs to the
+    category ``code``, e.g. "\\d".
+    """
+    if ascii:
+        digit = lambda ch: '0' <= ch <= '9'  # noqa: E731
+        space = lambda ch: ch in ' \t\n\r\f\v'  # noqa: E731
+        word = lambda ch: ch < '\x80' and (ch.isalnum() or ch == '_')  # noqa: E501,E731
+    else:
+        digit = str.isdecimal
+        space = str.isspace
+        word = lambda ch: ch.isalnum() or ch == '_'  # noqa: E731
+    return {
+        sre_constants.CATEGORY_DIGIT: digit,
+        sre_constants.CATEGORY_NOT_DIGIT: lambda ch: not digit(ch),
+        sre_constants.CATEGORY_SPACE: space,
+        sre_constants.CATEGORY_NOT_SPACE: lambda ch: not space(ch),
+        sre_constants.CATEGORY_WORD: word,
+        sre_constants.CATEGORY_NOT_WORD: lambda ch: not word(ch),
+    }[code]
+
+
+def charset(items, flags):
+    """Return a function testing whether a character belongs to the set
+    of characters ``items``, e.g. "[^a-z_]".
+    """
+    negate = False
+    literals = set()
+    ranges = []
+    categories = []
+    for op, av in items:
+        if op is sre_constants.NEGATE:
+            negate = True
+        elif op is sre_constants.LITERAL:
+            literals.add(chr(av))
+        elif op is sre_constants.RANGE:
+            ranges.append((chr(av[0]), chr(av[1])))
+        elif op is sre_constants.CATEGORY:
+            categories.append(category(av, flags & re.ASCII))
+        else:
+            raise ValueError('%s is not supported in a set of characters' % (op,))  # noqa: E501
+
+    def test(ch):
+        found = (
+            ch in literals or
+            any(low <= ch <= high for low, high in ranges) or
+            any(function(ch) for function in categories))
+        return found is not negate
+    return test
+
+
+def predicate(op, av, flags):
+    """Return a function testing whether a character matches the single
+    character item ``op``, or ``None`` if ``op`` is not such an item.
+    """
+    if op is sre_constants.LITERAL:
+        literal = chr(av)
+        return lambda ch: ch == literal
+    if op is sre_constants.NOT_LITERAL:
+        literal = chr(av)
+        return lambda ch: ch != literal
+    if op is sre_constants.ANY:
+        if flags & re.DOTALL:
+            return lambda ch: True
+        return lambda ch: ch != '\n'
+    if op is sre_constants.IN:
+        return charset(av, flags)
+    return None
+
+
+def subpattern(av):
+    # Python 3.6 added the flags of scoped inline flags, e.g. "(?s:...)".
+    if len(av) == 4:
+        return av[1], av[2], av[3]
+    return 0, 0, av[-1]  # pragma: no cover
+
+
+def flags(parsed):
+    state = getattr(parsed, 'state', None) or getattr(parsed, 'pattern', None)  # noqa: E501
+    return state.flags
+
+
+class Analysis:
+
+    """Find the constructs of a regular expression which may make a
+    backtracking matcher such as ``re`` take super-linear time:
+
+    - a large repetition whose iterations may end with a repetition of
+      characters which may also start the next iteration, e.g. "(a+)+" or
+      "(\\w+\\s?)*", backtracks exponentially
+    - so does a large repetition of alternatives which may start with the
+      same characters, e.g. "(a|ab)*" or "(a|a)*"
+    - two large repetitions of the same characters, only separated by
+      items they may both consume, e.g. "\\d+\\s*\\d+" or ".*=.*",
+      backtrack polynomially, including those of consecutive iterations
+      of a repetition, e.g. "(.*a){12}"
+
+    The analysis is a heuristic: it misses some risky patterns, e.g.
+    "(a?){30}a{30}", and flags a few harmless ones, e.g. alternatives
+    following other items in a non-capturing group, which may be a
+    common prefix the parser factored out. Character sets are
+    compared on a sample alphabet made of the Latin-1 characters, a few
+    other Unicode characters and every character of the pattern.
+    """
+
+    samples = '\u0100\u0660\u2003\u4e00\U0001f600'
+
+    def __init__(self, pattern):
+        try:
+            self.parsed = sre_parse.parse(pattern)
+        except (re.error, OverflowError) as e:
+            raise ValueError('%r is not a valid regular expression: %s' % (pattern, e))  # noqa: E501
+        self.alphabet = ''.join(sorted(set(
+            ''.join(map(chr, range(256))) + self.samples + pattern)))
+        self.risks = []
+        self.sequence(self.parsed, flags(self.parsed), False)
+
+    def risk(self, description):
+        if description not in self.risks:
+            self.risks.append(description)
+
+    @staticmethod
+    def children(op, av, flags):
+        """Return the sequences of items nested in the item ``op`` along
+        with their flags.
+        """
+        if op is sre_constants.BRANCH:
+            return [(alternative, flags) for alternative in av[1]]
+        if op is sre_constants.SUBPATTERN:
+            add, remove, p = subpattern(av)
+            return [(p, (flags | add) & ~remove)]
+        if op in REPEATS:
+            return [(av[2], flags)]
+        if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            return [(av[1], flags)]
+        if op is ATOMIC_GROUP:
+            return [(av, flags)]
+        if op is sre_constants.GROUPREF_EXISTS:
+            return [(p, flags) for p in av[1:] if p is not None]
+        return []
+
+    @staticmethod
+    def variable(op, av, large):
+        """Whether the item ``op`` is a repetition matching a variable
+        number of iterations, a large number if ``large``.
+        """
+        if op not in REPEATS or av[1] <= av[0]:
+            return False
+        return not large or av[1] is MAXREPEAT or av[1] > LARGE
+
+    def footprint(self, items, flags):
+        """Return the sample characters ``items`` may consume."""
+        characters = set()
+        for op, av in items:
+            test = predicate(op, av, flags)
+            if test is not None:
+                characters.update(ch for ch in self.alphabet if test(ch))
+            elif op is sre_constants.GROUPREF:
+                # Backreferences may consume any character.
+                characters.update(self.alphabet)
+            for p, f in self.children(op, av, flags):
+                characters |= self.footprint(p, f)
+        return characters
+
+    def nullable(self, items):
+        """Whether ``items`` may match the empty string."""
+        for op, av in items:
+            if op is sre_constants.BRANCH:
+                if not any(self.nullable(alternative) for alternative in av[1]):  # noqa: E501
+                    return False
+            elif op is sre_constants.SUBPATTERN:
+                if not self.nullable(subpattern(av)[2]):
+                    return False
+            elif op in REPEATS:
+                if av[0] and not self.nullable(av[2]):
+                    return False
+            elif op is ATOMIC_GROUP:
+                if not self.nullable(av):
+                    return False
+            elif op not in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT, sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS):  # noqa: E501
+                return False
+        return True
+
+    def first(self, items, flags):
+        """Return the sample characters a match of ``items`` may start
+        with.
+        """
+        characters = set()
+        for op, av in items:
+            if predicate(op, av, flags) is not None or op is sre_constants.GROUPREF:  # noqa: E501
+                characters |= self.footprint([(op, av)], flags)
+            elif op not in REPEATS or av[1]:
+                for p, f in self.children(op, av, flags):
+                    characters |= self.first(p, f)
+            if not self.nullable([(op, av)]):
+                break
+        return characters
+
+    def edge(self, items, flags, large):
+        """Return the sample characters a variable repetition starting a
+        match of ``items`` may consume, a large one if ``large``.
+        """
+        characters = set()
+        for op, av in items:
+            if self.variable(op, av, large):
+                characters |= self.footprint(av[2], flags)
+            for p, f in self.children(op, av, flags):
+                characters |= self.edge(p, f, large)
+            if not self.nullable([(op, av)]):
+                break
+        return characters
+
+    def trailing(self, items, flags, large):
+        """Return the sample characters a variable repetition ending a
+        match of ``items`` may consume, a large one if ``large``.
+        """
+        characters = set()
+        for op, av in reversed(items):
+            if self.variable(op, av, large):
+                characters |= self.footprint(av[2], flags)
+            for p, f in self.children(op, av, flags):
+                characters |= self.trailing(p, f, large)
+            if not self.nullable([(op, av)]):
+                break
+        return characters
+
+    def flatten(self, items, flags):
+        """Return the items of ``items`` and of the groups among them along
+        with their flags.
+        """
+        flattened = []
+        for op, av in items:
+            if op is sre_constants.SUBPATTERN:
+                add, remove, p = subpattern(av)
+                flattened.extend(self.flatten(p, (flags | add) & ~remove))
+            else:
+                flattened.append((op, av, flags))
+        return flattened
+
+    def adjacent(self, items, flags):
+        """Whether ``items`` hold two large repetitions of the same
+        characters, only separated by items they may both consume, e.g.
+        "\\d+\\s*\\d+" or ".*a.*".
+        """
+        tail = set()
+        separator = set()
+        for op, av, flags in self.flatten(items, flags):
+            item = [(op, av)]
+            edge = self.edge(item, flags, True)
+            if tail & edge and separator <= edge:
+                return True
+            if self.nullable(item):
+                tail |= self.trailing(item, flags, True)
+            elif tail and self.footprint(item, flags) <= tail:
+                # The repetitions before the item may consume it.
+                separator |= self.footprint(item, flags)
+                tail |= self.trailing(item, flags, True)
+            else:
+                tail = self.trailing(item, flags, True)
+                separator = set()
+        return False
+
+    def sequence(self, items, flags, repeated):
+        """Analyse ``items``, ``repeated`` telling whether they are part of
+        the body of a large repetition.
+        """
+        if self.adjacent(items, flags):
+            self.risk('adjacent repetitions of the same characters may backtrack polynomially')  # noqa: E501
+        for index, (op, av) in enumerate(items):
+            if op is sre_constants.BRANCH and repeated:
+                starts = [self.first(alternative, flags) for alternative in av[1]]  # noqa: E501
+                for i, start in enumerate(starts):
+                    if any(start & other for other in starts[i + 1:]):
+                        self.risk('overlapping alternatives in a repetition may backtrack exponentially')  # noqa: E501
+                if index:
+                    # The parser moves the common prefix of alternatives
+                    # before them, e.g. "(a|ab)" becomes "(a(?:|b))", so
+                    # the alternatives of a branch following other items
+                    # may have started with the same characters.
+                    self.risk('overlapping alternatives in a repetition may backtrack exponentially')  # noqa: E501
+            nested = repeated
+            if self.variable(op, av, True):
+                nested = True
+                if self.trailing(av[2], flags, False) & self.first(av[2], flags):  # noqa: E501
+                    # An iteration may end with a repetition which may also
+                    # start the next iteration.
+                    self.risk('nested repetitions may backtrack exponentially')  # noqa: E501
+            if op in REPEATS and av[1] > 1 and self.adjacent(list(av[2]) * 2, flags):  # noqa: E501
+                # The repetitions of consecutive iterations, e.g. of
+                # "(.*a){12}", are adjacent.
+                self.risk('adjacent repetitions of the same characters may backtrack polynomially')  # noqa: E501
+            for p, f in self.children(op, av, flags):
+                self.sequence(p, f, nested)
+
+
+def analyze(pattern):
+    """Return descriptions of the constructs of ``pattern`` which may make
+    a backtracking matcher take super-linear time, e.g. "(a+)+$".
+    """
+    return Analysis(pattern).risks
+
+
+class Program:
+
+    """A regular expression matched by a Pike VM, in time proportional to
+    the length of the string times the size of the expression.
+
+    ``match`` returns ``True`` if a prefix of the string matches, like
+    ``re.match``, and ``None`` otherwise. Literals, sets, alternatives,
+    groups, repetitions and the anchors "^", "$", "\\A", "\\Z", "\\b"
+    and "\\B" are supported, with the flags "a", "s", "u" and "x".
+    Backreferences, lookarounds, atomic groups, possessive repetitions
+    and the flags "i", "m" and "L" raise a ``ValueError``.
+
+    ``steps`` limits the number of states of a single match; exceeding
+    it raises a ``BudgetExceededError``.
+    """
+
+    # The maximum number of instructions, since counted repetitions are
+    # expanded.
+    limit = 10000
+
+    def __init__(self, pattern, steps=None):
+        self.pattern = pattern
+        self.steps = steps
+        try:
+            parsed = sre_parse.parse(pattern)
+        except (re.error, OverflowError) as e:
+            raise ValueError('%r is not a valid regular expression: %s' % (pattern, e))  # noqa: E501
+        self.ascii = bool(flags(parsed) & re.ASCII)
+        self.word = category(sre_constants.CATEGORY_WORD, self.ascii)
+        self.instructions = []
+        self.emit(parsed, flags(parsed))
+        self.append(MATCH, None)
+
+    def __reduce__(self):
+        # Predicates cannot be pickled, the program is compiled again.
+        return self.__class__, (self.pattern, self.steps)
+
+    def append(self, op, av):
+        self.instructions.append((op, av))
+        if len(self.instructions) > self.limit:
+            raise ValueError('%r is too large for the linear matcher' % (self.pattern,))  # noqa: E501
+        return len(self.instructions) - 1
+
+    def unsupported(self, construct):
+        return ValueError('%r uses %s, which the linear matcher does not support' % (self.pattern, construct))  # noqa: E501
+
+    def emit(self, items, flags):
+        if flags & UNSUPPORTED:
+            raise self.unsupported('the flags "i", "m" or "L"')
+        instructions = self.instructions
+        for op, av in items:
+            if op is sre_constants.LITERAL:
+                self.append(CHAR, chr(av))
+            elif predicate(op, av, flags) is not None:
+                self.append(TEST, predicate(op, av, flags))
+            elif op is sre_constants.BRANCH:
+                jumps = []
+                for alternative in av[1][:-1]:
+                    split = self.append(SPLIT, None)
+                    self.emit(alternative, flags)
+                    jumps.append(self.append(JMP, None))
+                    instructions[split] = (SPLIT, (split + 1, len(instructions)))  # noqa: E501
+                self.emit(av[1][-1], flags)
+                for jump in jumps:
+                    instructions[jump] = (JMP, len(instructions))
+            elif op is sre_constants.SUBPATTERN:
+                add, remove, p = subpattern(av)
+                self.emit(p, (flags | add) & ~remove)
+            elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+                low, high, body = av
+                for _ in range(low):
+                    self.emit(body, flags)
+                if high is MAXREPEAT:
+                    split = self.append(SPLIT, None)
+                    self.emit(body, flags)
+                    self.append(JMP, split)
+                    instructions[split] = (SPLIT, (split + 1, len(instructions)))  # noqa: E501
+                else:
+                    splits = []
+                    for _ in range(high - low):
+                        splits.append(self.append(SPLIT, None))
+                        self.emit(body, flags)
+                    for split in splits:
+                        instructions[split] = (SPLIT, (split + 1, len(instructions)))  # noqa: E501
+            elif op is sre_constants.AT and av in (
+                    sre_constants.AT_BEGINNING,
+                    sre_constants.AT_BEGINNING_STRING,
+                    sre_constants.AT_END, sre_constants.AT_END_STRING,
+                    sre_constants.AT_BOUNDARY,
+                    sre_constants.AT_NON_BOUNDARY):
+                self.append(ASSERT, av)
+            else:
+                raise self.unsupported(str(op).lower())
+
+    def assertion(self, av, string, position):
+        if av in (sre_constants.AT_BEGINNING, sre_constants.AT_BEGINNING_STRING):  # noqa: E501
+            return position == 0
+        length = len(string)
+        if av is sre_constants.AT_END:
+            return position == length or (position == length - 1 and string[position] == '\n')  # noqa: E501
+        if av is sre_constants.AT_END_STRING:
+            return position == length
+        if not string:
+            return False
+        before = position > 0 and self.word(string[position - 1])
+        after = position < length and self.word(string[position])
+        return (before != after) is (av is sre_constants.AT_BOUNDARY)
+
+    def closure(self, pcs, string, position):
+        """Return the instructions consuming a character reachable from
+        ``pcs`` without consuming any, or ``None`` if the match succeeds.
+        """
+        instructions = self.instructions
+        threads = []
+        seen = set()
+        stack = list(reversed(pcs))
+        while stack:
+            pc = stack.pop()
+            if pc in seen:
+                continue
+            seen.add(pc)
+            op, av = instructions[pc]
+            if op is JMP:
+                stack.append(av)
+            elif op is SPLIT:
+                stack.append(av[1])
+                stack.append(av[0])
+            elif op is ASSERT:
+                if self.assertion(av, string, position):
+                    stack.append(pc + 1)
+            elif op is MATCH:
+                return None
+            else:
+                threads.append(pc)
+        return threads
+
+    def match(self, string):
+        instructions = self.instructions
+        threads = self.closure([0], string, 0)
+        steps = 0
+        for position, ch in enumerate(string):
+            if threads is None:
+                return True
+            pcs = []
+            for pc in threads:
+                op, av = instructions[pc]
+                if (av == ch) if op is CHAR else av(ch):
+                    pcs.append(pc + 1)
+            if not pcs:
+                return None
+            threads = self.closure(pcs, string, position + 1)
+            steps += len(pcs)
+            if self.steps is not None and steps > self.steps:
+                raise BudgetExceededError('steps', self.steps)
+        return True if threads is None else None
+
+
+class PatternPolicy:
+
+    """Decide how the "pattern" of string schemas are evaluated, once
+    ``analyze`` found they may backtrack in super-linear time.
+
+    - "warn" issues a ``BacktrackingWarning`` and evaluates them with
+      ``re`` anyway
+    - "reject" raises a ``ValueError`` when the schema is parsed
+    - "linear" evaluates every pattern the linear matcher supports with
+      it, whose matches are limited to ``steps`` states, since the
+      analysis misses some risky patterns; the other patterns are
+      evaluated with ``re``, unless they may backtrack, which raises a
+      ``ValueError`` when the schema is parsed
+
+    With "warn" and "reject", other patterns are evaluated with ``re``.
+    """
+
+    actions = ('reject', 'warn', 'linear')
+
+    def __init__(self, action='warn', steps=None):
+        if action not in self.actions:
+            raise ValueError('action MUST be one of %r' % (self.actions,))
+        self.action = action
+        self.steps = steps
+
+    def __repr__(self):
+        return '%s(%r, steps=%r)' % (self.__class__.__name__, self.action, self.steps)  # noqa: E501
+
+    def key(self):
+        return [self.action, self.steps]
+
+    def compile(self, pattern):
+        """Return an object whose ``match`` method matches strings against
+        ``pattern``.
+        """
+        if self.action == 'linear':
+            try:
+                return Program(pattern, self.steps)
+            except ValueError:
+                if analyze(pattern):
+                    raise
+                return re.compile(pattern)
+        risks = analyze(pattern)
+        if risks:
+            message = 'pattern %r: %s' % (pattern, ', '.join(risks))
+            if self.action == 'reject':
+                raise ValueError(message)
+            warnings.warn(message, BacktrackingWarning, stacklevel=2)
+        return re.compile(pattern)
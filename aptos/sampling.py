@@ -0,0 +1,97 @@
+import math
+import random
+import threading
+
+
+class SamplingReport:
+
+    """Summarize the elements a ``SamplingPolicy`` skipped during the
+    validation of a single instance.
+
+    ``confidence`` is the probability, for the array validated with the
+    smallest margin, that the sample would have included an invalid
+    element if at least ``tolerance`` of its elements were invalid.
+    """
+
+    def __init__(self, tolerance):
+        self.tolerance = tolerance
+        self.arrays = 0
+        self.elements = 0
+        self.validated = 0
+        self.confidence = 1.0
+
+    @property
+    def skipped(self):
+        return self.elements - self.validated
+
+    @property
+    def exhaustive(self):
+        return self.validated == self.elements
+
+    def record(self, length, size):
+        self.arrays += 1
+        self.elements += length
+        self.validated += size
+        # The probability that a sample of ``size`` elements, drawn
+        # without replacement, misses every one of ``invalid`` elements.
+        invalid = math.ceil(self.tolerance * length)
+        missed = 1.0
+        for i in range(size):
+            missed *= (length - invalid - i) / (length - i)
+            if missed <= 0.0:
+                missed = 0.0
+                break
+        self.confidence = min(self.confidence, 1.0 - missed)
+
+
+class SamplingPolicy:
+
+    """Validate a sample of the elements of large arrays against "items"
+    instead of every element, bounding the latency of validating long
+    homogeneous arrays, e.g. time series from trusted sources.
+
+    Arrays with more than ``minimum`` elements are sampled: ``rate`` of
+    their elements are validated, at least ``minimum`` of them. Elements
+    are evenly spaced, including the first and the last one, unless
+    ``randomized`` is true, in which case they are drawn at random with a
+    generator seeded with ``seed``. Keywords applying to the array
+    itself, e.g. "minItems", "maxItems" and "uniqueItems", are always
+    validated.
+    """
+
+    def __init__(self, rate=0.01, minimum=100, tolerance=0.01,
+                 randomized=False, seed=None):
+        if not 0 < rate <= 1:
+            raise ValueError('rate MUST be greater than 0 and less than or equal to 1')  # noqa: E501
+        if minimum < 1:
+            raise ValueError('minimum MUST be greater than 0')
+        self.rate = rate
+        self.minimum = minimum
+        self.tolerance = tolerance
+        self.randomized = randomized
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def report(self):
+        return SamplingReport(self.tolerance)
+
+    def size(self, length):
+        """Return the number of elements validated in an array of
+        ``length`` elements.
+        """
+        return min(length, max(self.minimum, math.ceil(self.rate * length)))
+
+    def sample(self, instance, report):
+        """Return the elements of the array ``instance`` to validate."""
+        length = len(instance)
+        size = self.size(length)
+        if size == length:
+            return instance
+        if self.randomized:
+            with self.lock:
+                indices = sorted(self.random.sample(range(length), size))
+        else:
+            step = (length - 1) / (size - 1) if size > 1 else 0
+            indices = [round(i * step) for i in range(size)]
+        report.record(length, size)
+        return [instance[index] for index in indices]
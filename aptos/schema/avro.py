@@ -0,0 +1,417 @@
+import json
+import os
+import struct
+import zlib
+
+# https://avro.apache.org/docs/current/spec.html#Object+Container+Files
+MAGIC = b'Obj\x01'
+SYNC_SIZE = 16
+CODECS = ('null', 'deflate')
+
+PRIMITIVES = (
+    'null', 'boolean', 'int', 'long', 'float', 'double', 'bytes', 'string')
+
+
+class BinaryEncoder:
+
+    """Serialize Python objects using the Avro binary encoding of a
+    schema such as the one generated by ``AvroSchemaVisitor``.
+
+    http://avro.apache.org/docs/current/spec.html#binary_encoding
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.names = {}
+        self.register(schema)
+        # Type names which are not defined by the enclosing dict itself.
+        self.aliases = frozenset(PRIMITIVES) | frozenset(self.names)
+
+    def register(self, schema):
+        # Named types (record, enum, fixed) may be referenced by name once
+        # they have been defined.
+        if isinstance(schema, list):
+            for element in schema:
+                self.register(element)
+        elif isinstance(schema, dict):
+            kind = schema.get('type')
+            if kind in ('record', 'enum', 'fixed') and schema.get('name'):
+                self.names[schema['name']] = schema
+            if kind == 'record':
+                for field in schema.get('fields', []):
+                    self.register(field['type'])
+            elif kind == 'array':
+                self.register(schema['items'])
+            elif kind == 'map':
+                self.register(schema['values'])
+            elif isinstance(kind, (dict, list)):
+                self.register(kind)
+
+    def encode(self, datum):
+        buffer = bytearray()
+        self.write(datum, self.schema, buffer)
+        return bytes(buffer)
+
+    def write(self, datum, schema, buffer):
+        if isinstance(schema, str):
+            if schema in self.names:
+                return self.write(datum, self.names[schema], buffer)
+            return getattr(self, 'write_' + schema)(datum, buffer)
+        if isinstance(schema, list):
+            return self.write_union(datum, schema, buffer)
+        kind = schema['type']
+        if not isinstance(kind, str) or kind in self.aliases:
+            return self.write(datum, kind, buffer)
+        return getattr(self, 'write_' + kind)(datum, schema, buffer)
+
+    def write_null(self, datum, buffer):
+        if datum is not None:
+            raise ValueError('datum %r is not null' % (datum,))
+
+    def write_boolean(self, datum, buffer):
+        if not isinstance(datum, bool):
+            raise ValueError('datum %r is not a boolean' % (datum,))
+        buffer.append(1 if datum else 0)
+
+    def write_long(self, datum, buffer):
+        if isinstance(datum, bool) or not isinstance(datum, int):
+            raise ValueError('datum %r is not an integer' % (datum,))
+        write_long(datum, buffer)
+
+    write_int = write_long
+
+    def write_float(self, datum, buffer):
+        buffer += struct.pack('<f', float(datum))
+
+    def write_double(self, datum, buffer):
+        if isinstance(datum, bool) or not isinstance(datum, (int, float)):
+            raise ValueError('datum %r is not a number' % (datum,))
+        buffer += struct.pack('<d', float(datum))
+
+    def write_bytes(self, datum, buffer):
+        write_long(len(datum), buffer)
+        buffer += datum
+
+    def write_string(self, datum, buffer):
+        if not isinstance(datum, str):
+            raise ValueError('datum %r is not a string' % (datum,))
+        self.write_bytes(datum.encode('utf-8'), buffer)
+
+    def write_fixed(self, datum, schema, buffer):
+        buffer += datum
+
+    def write_enum(self, datum, schema, buffer):
+        try:
+            write_long(schema['symbols'].index(datum), buffer)
+        except ValueError:
+            raise ValueError('datum %r is not one of the symbols %r' % (datum, schema['symbols']))  # noqa: E501
+
+    def write_array(self, datum, schema, buffer):
+        # Arrays are encoded as a single block followed by the zero-count
+        # block terminating the series.
+        if datum:
+            write_long(len(datum), buffer)
+            for element in datum:
+                self.write(element, schema['items'], buffer)
+        buffer.append(0)
+
+    def write_map(self, datum, schema, buffer):
+        if datum:
+            write_long(len(datum), buffer)
+            for name, value in datum.items():
+                self.write_string(name, buffer)
+                self.write(value, schema['values'], buffer)
+        buffer.append(0)
+
+    def write_record(self, datum, schema, buffer):
+        if not isinstance(datum, dict):
+            raise ValueError('datum %r is not an object' % (datum,))
+        for field in schema['fields']:
+            name = field['name']
+            if name in datum:
+                value = datum[name]
+            elif 'default' in field:
+                value = field['default']
+            elif self.nullable(field['type']):
+                value = None
+            else:
+                raise ValueError('datum %r is missing field %r' % (datum, name))  # noqa: E501
+            self.write(value, field['type'], buffer)
+
+    def write_union(self, datum, schema, buffer):
+        for index, branch in enumerate(schema):
+            if self.matches(datum, branch):
+                write_long(index, buffer)
+                return self.write(datum, branch, buffer)
+        raise ValueError('datum %r does not match any of the types %r' % (datum, schema))  # noqa: E501
+
+    def nullable(self, schema):
+        if isinstance(schema, list):
+            return 'null' in schema
+        if isinstance(schema, dict):
+            return self.nullable(schema['type'])
+        return schema == 'null'
+
+    def matches(self, datum, schema):
+        if isinstance(schema, str) and schema in self.names:
+            schema = self.names[schema]
+        if isinstance(schema, dict):
+            kind = schema['type']
+            if not isinstance(kind, str) or kind in self.aliases:
+                return self.matches(datum, kind)
+            if kind == 'enum':
+                return datum in schema['symbols']
+            return isinstance(datum, {
+                'record': dict, 'map': dict, 'array': list, 'fixed': bytes,
+            }[kind])
+        if isinstance(schema, list):
+            return any(self.matches(datum, branch) for branch in schema)
+        if isinstance(datum, bool):
+            return schema == 'boolean'
+        return isinstance(datum, {
+            'null': type(None),
+            'boolean': bool,
+            'int': int,
+            'long': int,
+            'float': (int, float),
+            'double': (int, float),
+            'bytes': bytes,
+            'string': str,
+        }[schema])
+
+
+class BinaryDecoder(BinaryEncoder):
+
+    """Deserialize Avro binary data written by ``BinaryEncoder``."""
+
+    def decode(self, data, offset=0):
+        self.data = data
+        self.offset = offset
+        return self.read(self.schema)
+
+    def read(self, schema):
+        if isinstance(schema, str):
+            if schema in self.names:
+                return self.read(self.names[schema])
+            return getattr(self, 'read_' + schema)()
+        if isinstance(schema, list):
+            return self.read(schema[self.read_long()])
+        kind = schema['type']
+        if not isinstance(kind, str) or kind in self.aliases:
+            return self.read(kind)
+        return getattr(self, 'read_' + kind)(schema)
+
+    def read_null(self):
+        return None
+
+    def read_boolean(self):
+        self.offset += 1
+        return self.data[self.offset - 1] == 1
+
+    def read_long(self):
+        value, self.offset = read_long(self.data, self.offset)
+        return value
+
+    read_int = read_long
+
+    def read_float(self):
+        self.offset += 4
+        return struct.unpack_from('<f', self.data, self.offset - 4)[0]
+
+    def read_double(self):
+        self.offset += 8
+        return struct.unpack_from('<d', self.data, self.offset - 8)[0]
+
+    def read_bytes(self):
+        size = self.read_long()
+        self.offset += size
+        return bytes(self.data[self.offset - size:self.offset])
+
+    def read_string(self):
+        return self.read_bytes().decode('utf-8')
+
+    def read_fixed(self, schema):
+        self.offset += schema['size']
+        return bytes(self.data[self.offset - schema['size']:self.offset])
+
+    def read_enum(self, schema):
+        return schema['symbols'][self.read_long()]
+
+    def read_blocks(self, read):
+        while True:
+            count = self.read_long()
+            if count == 0:
+                return
+            if count < 0:
+                # A negative count is followed by the block size in bytes.
+                count = -count
+                self.read_long()
+            for _ in range(count):
+                read()
+
+    def read_array(self, schema):
+        array = []
+        self.read_blocks(lambda: array.append(self.read(schema['items'])))
+        return array
+
+    def read_map(self, schema):
+        mapping = {}
+
+        def read():
+            name = self.read_string()
+            mapping[name] = self.read(schema['values'])
+        self.read_blocks(read)
+        return mapping
+
+    def read_record(self, schema):
+        return {
+            field['name']: self.read(field['type'])
+            for field in schema['fields']}
+
+
+def write_long(value, buffer):
+    # Variable-length zig-zag coding.
+    value = (value << 1) ^ (value >> 63)
+    while value & ~0x7f:
+        buffer.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_long(data, offset):
+    shift = value = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return (value >> 1) ^ -(value & 1), offset
+        shift += 7
+
+
+class DataFileWriter:
+
+    """Write records to an Avro object container file.
+
+    Records are buffered in memory until the serialized block reaches
+    ``block_size`` bytes, at which point the block is compressed using
+    ``codec`` and written to ``fp`` followed by the sync marker.
+    """
+
+    def __init__(self, fp, schema, codec='null', block_size=64 * 1024):
+        if codec not in CODECS:
+            raise ValueError('codec %r is not one of %r' % (codec, CODECS))
+        if block_size < 1:
+            raise ValueError('The value of "block_size" MUST be strictly greater than 0.')  # noqa: E501
+        self.fp = fp
+        self.schema = schema
+        self.codec = codec
+        self.block_size = block_size
+        self.encoder = BinaryEncoder(schema)
+        self.sync = os.urandom(SYNC_SIZE)
+        self.block = bytearray()
+        self.count = 0
+        self.write_header()
+
+    def write_header(self):
+        header = bytearray(MAGIC)
+        BinaryEncoder({'type': 'map', 'values': 'bytes'}).write_map({
+            'avro.schema': json.dumps(self.schema).encode('utf-8'),
+            'avro.codec': self.codec.encode('utf-8'),
+        }, {'type': 'map', 'values': 'bytes'}, header)
+        header += self.sync
+        self.fp.write(header)
+
+    def append(self, datum):
+        size = len(self.block)
+        try:
+            self.encoder.write(datum, self.schema, self.block)
+        except ValueError:
+            # Discard the partially serialized datum.
+            del self.block[size:]
+            raise
+        self.count += 1
+        if len(self.block) >= self.block_size:
+            self.flush()
+
+    def flush(self):
+        if not self.count:
+            return
+        data = bytes(self.block)
+        if self.codec == 'deflate':
+            # Avro uses raw deflate data without the zlib header.
+            compressor = zlib.compressobj(
+                zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+            data = compressor.compress(data) + compressor.flush()
+        header = bytearray()
+        write_long(self.count, header)
+        write_long(len(data), header)
+        self.fp.write(header)
+        self.fp.write(data)
+        self.fp.write(self.sync)
+        self.block = bytearray()
+        self.count = 0
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class DataFileReader:
+
+    """Iterate over the records of an Avro object container file."""
+
+    def __init__(self, fp):
+        self.fp = fp
+        if fp.read(len(MAGIC)) != MAGIC:
+            raise ValueError('file is not an Avro object container file')
+        metadata = {}
+        while True:
+            count = self.read_long()
+            if count == 0:
+                break
+            if count < 0:
+                count = -count
+                self.read_long()
+            for _ in range(count):
+                name = self.fp.read(self.read_long()).decode('utf-8')
+                metadata[name] = self.fp.read(self.read_long())
+        self.metadata = metadata
+        self.schema = json.loads(metadata['avro.schema'].decode('utf-8'))
+        self.codec = metadata.get('avro.codec', b'null').decode('utf-8')
+        if self.codec not in CODECS:
+            raise ValueError('codec %r is not one of %r' % (self.codec, CODECS))  # noqa: E501
+        self.sync = fp.read(SYNC_SIZE)
+        self.decoder = BinaryDecoder(self.schema)
+
+    def read_long(self):
+        shift = value = 0
+        while True:
+            byte = self.fp.read(1)
+            if not byte:
+                raise EOFError()
+            value |= (byte[0] & 0x7f) << shift
+            if not byte[0] & 0x80:
+                return (value >> 1) ^ -(value & 1)
+            shift += 7
+
+    def __iter__(self):
+        while True:
+            try:
+                count = self.read_long()
+            except EOFError:
+                return
+            data = self.fp.read(self.read_long())
+            if self.codec == 'deflate':
+                data = zlib.decompress(data, -15)
+            offset = 0
+            for _ in range(count):
+                yield self.decoder.decode(data, offset)
+                offset = self.decoder.offset
+            if self.fp.read(SYNC_SIZE) != self.sync:
+                raise ValueError('sync marker does not match the header')
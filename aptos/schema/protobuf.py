@@ -0,0 +1,218 @@
+import struct
+
+# https://developers.google.com/protocol-buffers/docs/encoding
+VARINT, FIXED64, LENGTH_DELIMITED = 0, 1, 2
+
+SCALARS = {
+    'double': FIXED64,
+    'int64': VARINT,
+    'bool': VARINT,
+    'string': LENGTH_DELIMITED,
+}
+
+
+def dumps(definitions, package=''):
+    """Render the definitions generated by ``ProtobufSchemaVisitor`` as a
+    ``.proto`` document.
+    """
+    lines = ['syntax = "proto3";', '']
+    if package:
+        lines.extend(['package %s;' % (package,), ''])
+    for definition in definitions:
+        lines.append('%s %s {' % (definition['type'], definition['name']))
+        if definition['reserved']:
+            lines.append('  reserved %s;' % (
+                ', '.join(str(number) for number in definition['reserved']),))  # noqa: E501
+        if definition['type'] == 'enum':
+            prefix = definition['name'].upper()
+            lines.append('  %s_UNSPECIFIED = 0;' % (prefix,))
+            for symbol, number in definition['symbols']:
+                lines.append('  %s_%s = %d;' % (
+                    prefix, ''.join(
+                        character if character.isalnum() else '_'
+                        for character in symbol.upper()), number))
+        else:
+            for field in definition['fields']:
+                label = field.get('label')
+                lines.append('  %s%s %s = %d;' % (
+                    label + ' ' if label else '', field['type'],
+                    field['name'], field['number']))
+        lines.extend(['}', ''])
+    return '\n'.join(lines)
+
+
+def write_varint(value, buffer):
+    # Negative integers are always encoded as ten bytes.
+    value &= 0xffffffffffffffff
+    while value > 0x7f:
+        buffer.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data, offset):
+    shift = value = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+class MessageEncoder:
+
+    """Serialize instances into the Protocol Buffers wire format of the
+    message ``name`` generated by ``ProtobufSchemaVisitor``.
+    """
+
+    def __init__(self, definitions, name):
+        self.definitions = {
+            definition['name']: definition for definition in definitions}
+        self.name = name
+        self.enums = {
+            name: dict(definition['symbols'])
+            for name, definition in self.definitions.items()
+            if definition['type'] == 'enum'}
+
+    def encode(self, instance):
+        buffer = bytearray()
+        self.write_message(instance, self.definitions[self.name], buffer)
+        return bytes(buffer)
+
+    def write_message(self, instance, message, buffer):
+        if not isinstance(instance, dict):
+            raise ValueError('instance %r is not an object' % (instance,))
+        for field in message['fields']:
+            value = instance.get(field['key'])
+            if value is None:
+                continue
+            kind = field['type']
+            if field.get('label') == 'repeated':
+                if not value:
+                    continue
+                if kind in self.enums or SCALARS.get(kind, LENGTH_DELIMITED) != LENGTH_DELIMITED:  # noqa: E501
+                    # Repeated scalar numeric fields are packed by default.
+                    packed = bytearray()
+                    for element in value:
+                        self.write_value(element, kind, packed)
+                    write_varint(field['number'] << 3 | LENGTH_DELIMITED, buffer)  # noqa: E501
+                    write_varint(len(packed), buffer)
+                    buffer += packed
+                else:
+                    for element in value:
+                        self.write_field(element, field, buffer)
+            elif field.get('label') == 'optional' or kind in self.definitions or value:  # noqa: E501
+                # Fields without explicit presence are not serialized when
+                # set to their default value.
+                self.write_field(value, field, buffer)
+
+    def write_field(self, value, field, buffer):
+        kind = field['type']
+        wire = VARINT if kind in self.enums else SCALARS.get(kind, LENGTH_DELIMITED)  # noqa: E501
+        write_varint(field['number'] << 3 | wire, buffer)
+        self.write_value(value, kind, buffer)
+
+    def write_value(self, value, kind, buffer):
+        if kind == 'string':
+            if not isinstance(value, str):
+                raise ValueError('instance %r is not a string' % (value,))
+            value = value.encode('utf-8')
+            write_varint(len(value), buffer)
+            buffer += value
+        elif kind == 'double':
+            if isinstance(value, bool) or not isinstance(value, (int, float)):  # noqa: E501
+                raise ValueError('instance %r is not a number' % (value,))
+            buffer += struct.pack('<d', value)
+        elif kind == 'int64':
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise ValueError('instance %r is not an integer' % (value,))
+            write_varint(value, buffer)
+        elif kind == 'bool':
+            if not isinstance(value, bool):
+                raise ValueError('instance %r is not a boolean' % (value,))
+            buffer.append(1 if value else 0)
+        elif kind in self.enums:
+            try:
+                write_varint(self.enums[kind][value], buffer)
+            except (KeyError, TypeError):
+                raise ValueError('instance %r is not one of the symbols of %r' % (value, kind))  # noqa: E501
+        else:
+            message = bytearray()
+            self.write_message(value, self.definitions[kind], message)
+            write_varint(len(message), buffer)
+            buffer += message
+
+
+class MessageDecoder(MessageEncoder):
+
+    """Deserialize the Protocol Buffers wire format written by
+    ``MessageEncoder``. Fields set to their default value are absent from
+    the decoded instance.
+    """
+
+    def __init__(self, definitions, name):
+        super().__init__(definitions, name)
+        self.symbols = {
+            name: {number: symbol for symbol, number in symbols.items()}
+            for name, symbols in self.enums.items()}
+
+    def decode(self, data):
+        return self.read_message(data, 0, len(data), self.definitions[self.name])  # noqa: E501
+
+    def read_message(self, data, offset, end, message):
+        fields = {field['number']: field for field in message['fields']}
+        instance = {}
+        while offset < end:
+            key, offset = read_varint(data, offset)
+            field = fields.get(key >> 3)
+            if key & 0x7 == VARINT:
+                value, offset = read_varint(data, offset)
+                values = [value]
+            elif key & 0x7 == FIXED64:
+                values = [data[offset:offset + 8]]
+                offset += 8
+            elif key & 0x7 == LENGTH_DELIMITED:
+                size, offset = read_varint(data, offset)
+                values = [data[offset:offset + size]]
+                offset += size
+            else:
+                raise ValueError('wire type %d is not supported' % (key & 0x7,))  # noqa: E501
+            if field is None:
+                # Skip unknown fields.
+                continue
+            kind = field['type']
+            if field.get('label') == 'repeated' and key & 0x7 == LENGTH_DELIMITED and (kind in self.enums or SCALARS.get(kind, LENGTH_DELIMITED) != LENGTH_DELIMITED):  # noqa: E501
+                values = self.unpack(values[0], kind)
+            values = [self.read_value(value, kind) for value in values]
+            if field.get('label') == 'repeated':
+                instance.setdefault(field['key'], []).extend(values)
+            else:
+                instance[field['key']] = values[0]
+        return instance
+
+    def unpack(self, data, kind):
+        values = []
+        offset = 0
+        while offset < len(data):
+            if SCALARS.get(kind) == FIXED64:
+                values.append(data[offset:offset + 8])
+                offset += 8
+            else:
+                value, offset = read_varint(data, offset)
+                values.append(value)
+        return values
+
+    def read_value(self, value, kind):
+        if kind == 'string':
+            return bytes(value).decode('utf-8')
+        if kind == 'double':
+            return struct.unpack('<d', value)[0]
+        if kind == 'int64':
+            return value - (1 << 64) if value >> 63 else value
+        if kind == 'bool':
+            return bool(value)
+        if kind in self.symbols:
+            return self.symbols[kind][value]
+        return self.read_message(value, 0, len(value), self.definitions[kind])  # noqa: E501
@@ -1,8 +1,15 @@
+import re
+
 from ..primitive import Array, Object, Reference, Enumeration
 
 
 class AvroSchemaVisitor:
 
+    def __init__(self):
+        # Names of the records being generated, referred to by name from
+        # recursive references.
+        self.visiting = {}
+
     def visit_empty_schema(self, schema, *args):  # pragma: no cover
         return
 
@@ -37,6 +44,7 @@ class AvroSchemaVisitor:
         return {'type': [element.accept(self, *args).get('type') for element in array_list][0]}  # noqa: E501
 
     def visit_object(self, obj, *args):
+        self.visiting[id(obj)] = obj.title
         fields = []
         for name, member in obj.properties.items():
             field = member.accept(self, *args)
@@ -46,11 +54,163 @@ class AvroSchemaVisitor:
             fields.append(field)
         for element in obj.allOf:
             fields.extend(element.accept(self, *args).get('fields', [element.accept(self, *args)]))  # noqa: E501
+        del self.visiting[id(obj)]
         return {'type': 'record', 'name': obj.title, 'fields': fields}
 
     def visit_reference(self, reference, *args):
         if reference.resolved:
+            if id(reference.value) in self.visiting:
+                name = self.visiting[id(reference.value)]
+                if not name:
+                    raise ValueError('recursive schema MUST have a "title"')
+                return {'type': name}
+            return reference.value.accept(self, *args)
+
+    def visit_union(self, union, *args):
+        types = {'integer': 'long', 'number': 'double'}
+        return {'type': [types.get(element, element) for element in union.type]}  # noqa: E501
+
+
+class ProtobufSchemaVisitor:
+
+    """Generate Protocol Buffers (proto3) message definitions.
+
+    Field numbers and enum values are read from, and recorded in,
+    ``mapping`` so that regenerating the definitions of an evolving schema
+    never renumbers existing fields. Every definition is collected in
+    ``definitions``; ``aptos.schema.protobuf.dumps`` renders them as a
+    ``.proto`` document.
+    """
+
+    scalars = {
+        'string': 'string',
+        'boolean': 'bool',
+        'integer': 'int64',
+        'number': 'double',
+    }
+
+    def __init__(self, mapping=None):
+        self.mapping = {'messages': {}, 'enums': {}} if mapping is None else mapping  # noqa: E501
+        self.mapping.setdefault('messages', {})
+        self.mapping.setdefault('enums', {})
+        self.definitions = []
+        # Names of the messages being generated, referred to by name from
+        # recursive references.
+        self.visiting = {}
+
+    @staticmethod
+    def identifier(name, camel=False):
+        name = re.sub(r'\W', '_', name)
+        if camel:
+            name = ''.join(
+                word[:1].upper() + word[1:] for word in name.split('_'))
+        if not name or name[0].isdigit():
+            name = '_' + name
+        return name
+
+    def define(self, definition):
+        for element in self.definitions:
+            if element['name'] == definition['name']:
+                if element == definition:
+                    return element['name']
+                raise ValueError('definitions named %r are not identical' % (definition['name'],))  # noqa: E501
+        self.definitions.append(definition)
+        return definition['name']
+
+    def number(self, numbers, keys):
+        # Never reuse the number of a field which has been removed.
+        for key in keys:
+            if key not in numbers:
+                number = max(numbers.values(), default=0) + 1
+                if 19000 <= number <= 19999:
+                    # Reserved for the Protocol Buffers implementation.
+                    number = 20000
+                numbers[key] = number
+        return numbers
+
+    def visit_empty_schema(self, schema, *args):
+        raise ValueError('schema %r does not describe a Protocol Buffers type' % (args[0] if args else schema,))  # noqa: E501
+
+    def visit_enumeration(self, enumeration, *args):
+        name = self.identifier(enumeration.title or (args[0] if args else 'Enum'), camel=True)  # noqa: E501
+        for symbol in enumeration.enum:
+            if not isinstance(symbol, str):
+                raise ValueError('enum %r symbol %r is not a string' % (name, symbol))  # noqa: E501
+        numbers = self.number(
+            self.mapping['enums'].setdefault(name, {}),
+            sorted(enumeration.enum))
+        symbols = [[symbol, numbers[symbol]] for symbol in enumeration.enum]
+        self.define({
+            'type': 'enum', 'name': name,
+            'symbols': sorted(symbols, key=lambda symbol: symbol[1]),
+            'reserved': sorted(
+                number for symbol, number in numbers.items()
+                if symbol not in enumeration.enum)})
+        return {'type': name}
+
+    def visit_boolean(self, boolean, *args):
+        return {'type': 'bool'}
+
+    def visit_null(self, null, *args):
+        raise ValueError('schema %r of type "null" does not describe a Protocol Buffers type' % (args[0] if args else null.title,))  # noqa: E501
+
+    def visit_number(self, number, *args):
+        return {'type': 'double'}
+
+    def visit_integer(self, integer, *args):
+        return {'type': 'int64'}
+
+    def visit_string(self, string, *args):
+        return {'type': 'string'}
+
+    def visit_array(self, array, *args):
+        items = array.items.accept(self, *args)
+        if items.get('label') is not None:
+            raise ValueError('array %r items MUST NOT be arrays or unions' % (args[0] if args else array.title,))  # noqa: E501
+        return {'type': items['type'], 'label': 'repeated'}
+
+    def visit_array_list(self, array_list, *args):
+        types = [element.accept(self, *args) for element in array_list]
+        if any(element != types[0] for element in types):
+            raise ValueError('array %r items MUST be of a single type' % (args[0] if args else '',))  # noqa: E501
+        return types[0]
+
+    def visit_object(self, obj, *args):
+        name = self.identifier(obj.title or (args[0] if args else 'Message'), camel=True)  # noqa: E501
+        members = list(obj.properties.items())
+        for element in obj.allOf:
+            while isinstance(element, Reference):
+                element = element.value
+            if isinstance(element, Object):
+                members.extend(element.properties.items())
+        self.visiting[id(obj)] = name
+        numbers = self.number(
+            self.mapping['messages'].setdefault(name, {}),
+            [key for key, member in members])
+        fields = []
+        for key, member in members:
+            field = member.accept(self, key)
+            field.update({
+                'name': self.identifier(key), 'key': key,
+                'number': numbers[key]})
+            fields.append(field)
+        keys = {key for key, member in members}
+        self.define({
+            'type': 'message', 'name': name, 'fields': fields,
+            'reserved': sorted(
+                number for key, number in numbers.items()
+                if key not in keys)})
+        del self.visiting[id(obj)]
+        return {'type': name}
+
+    def visit_reference(self, reference, *args):
+        if reference.resolved:
+            if id(reference.value) in self.visiting:
+                return {'type': self.visiting[id(reference.value)]}
             return reference.value.accept(self, *args)
 
     def visit_union(self, union, *args):
-        return {'type': union.type}
+        types = [element for element in union.type if element != 'null']
+        if len(types) != 1 or types[0] not in self.scalars:
+            raise ValueError('union %r MUST contain a single scalar type besides "null"' % (args[0] if args else union.type,))  # noqa: E501
+        return {'type': self.scalars[types[0]], 'label': 'optional'}
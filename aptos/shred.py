@@ -0,0 +1,473 @@
+import array
+import json
+import mmap
+import os
+import struct
+import sys
+
+from .primitive import Object, Reference
+from .visitor import ValidationVisitor
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+# Columns are written in little-endian byte order, like Parquet, whatever
+# the byte order of the machine, so they can be read on any machine. It is
+# recorded in the data types of the manifest.
+ENDIAN = '<'
+
+# Whether numbers are swapped to and from the byte order of the machine.
+SWAP = sys.byteorder != 'little'
+
+# The NumPy data type and the ``array`` type code of each kind of column.
+# Strings and other JSON values are stored as the UTF-8 bytes of every
+# value, concatenated, along with the offsets of each value.
+KINDS = {
+    'boolean': ('|b1', 'B'),
+    'integer': (ENDIAN + 'i8', 'q'),
+    'number': (ENDIAN + 'f8', 'd'),
+    'string': ('|u1', None),
+    'json': ('|u1', None),
+    'null': (None, None),
+}
+LEVEL = ('|u1', 'B')
+OFFSET = (ENDIAN + 'i8', 'q')
+
+# The ``memoryview`` formats of the data types, to map columns without
+# NumPy.
+FORMATS = {'|b1': '?', '|u1': 'B', ENDIAN + 'i8': 'q', ENDIAN + 'f8': 'd'}
+
+# Headers of .npy files are written before the length of the column is
+# known, and rewritten with the same size once it is.
+#
+# https://numpy.org/doc/stable/reference/generated/numpy.lib.format.html
+MAGIC = b'\x93NUMPY\x01\x00'
+HEADER_SIZE = 128
+
+MANIFEST = 'manifest.json'
+
+
+def header(dtype, length):
+    description = "{'descr': '%s', 'fortran_order': False, 'shape': (%d,), }" % (dtype, length)  # noqa: E501
+    description = description.ljust(HEADER_SIZE - len(MAGIC) - 3) + '\n'
+    return MAGIC + struct.pack('<H', len(description)) + description.encode('latin-1')  # noqa: E501
+
+
+class Leaf:
+
+    """A column holding the values of a leaf of the component tree, the
+    repetition and definition levels of each of its entries telling which
+    record, array and object the value belongs to.
+
+    https://research.google/pubs/pub36632/
+    """
+
+    def __init__(self, path, kind, repetition, definition, nullable=False):
+        self.path = path
+        self.kind = kind
+        # The maximum repetition and definition levels, the definition
+        # level of an entry holding a value.
+        self.repetition = repetition
+        self.definition = definition
+        self.nullable = nullable
+        self.repetitions = array.array(LEVEL[1])
+        self.definitions = array.array(LEVEL[1])
+        code = KINDS[kind][1]
+        self.values = None if code is None else array.array(code)
+        # The offsets of the values of strings and JSON values, in bytes
+        # from the start of the column, ``count`` bytes having been written.
+        self.offsets = array.array(OFFSET[1])
+        if kind in ('string', 'json'):
+            self.values = bytearray()
+            self.offsets.append(0)
+        self.count = 0
+
+    def leaves(self):
+        return [self]
+
+    def write(self, value, r, d):
+        """Add the value of the leaf for a parent defined at level ``d``."""
+        kind = self.kind
+        if value is None and kind != 'json' and kind != 'null':
+            if not self.nullable:
+                raise ValueError('value of %r MUST NOT be null' % ('.'.join(self.path),))  # noqa: E501
+            return self.skip(r, d)
+        self.repetitions.append(r)
+        self.definitions.append(self.definition)
+        if kind == 'string':
+            if value.__class__ is not str:
+                raise ValueError('value %r of %r is not a string' % (value, '.'.join(self.path)))  # noqa: E501
+            self.values += value.encode('utf-8')
+            self.offsets.append(len(self.values) + self.count)
+        elif kind == 'json':
+            self.values += json.dumps(value, separators=(',', ':')).encode('utf-8')  # noqa: E501
+            self.offsets.append(len(self.values) + self.count)
+        elif kind != 'null':
+            try:
+                self.values.append(value)
+            except (OverflowError, TypeError):
+                raise ValueError('value %r of %r is not a 64-bit %s' % (value, '.'.join(self.path), kind))  # noqa: E501
+
+    def skip(self, r, d):
+        """Add an entry without value, a parent being defined at level
+        ``d`` only.
+        """
+        self.repetitions.append(r)
+        self.definitions.append(d)
+
+
+class Group:
+
+    """The members of an object, declared in "properties". Optional
+    members increment the definition level of their descendants.
+    """
+
+    def __init__(self, path, members):
+        self.path = path
+        # (name, node, optional) tuples.
+        self.members = members
+
+    def leaves(self):
+        return [leaf for name, node, optional in self.members for leaf in node.leaves()]  # noqa: E501
+
+    def write(self, value, r, d):
+        if value.__class__ is not dict:
+            raise ValueError('value %r of %r is not an object' % (value, '.'.join(self.path)))  # noqa: E501
+        for name, node, optional in self.members:
+            if name in value:
+                node.write(value[name], r, d + optional)
+            elif optional:
+                node.skip(r, d)
+            else:
+                raise ValueError('value of %r is missing required property %r' % ('.'.join(self.path), name))  # noqa: E501
+
+    def skip(self, r, d):
+        for name, node, optional in self.members:
+            node.skip(r, d)
+
+
+class Repeated:
+
+    """The elements of an array, whose entries repeat at the repetition
+    level of the array. Non-empty arrays increment the definition level of
+    their elements.
+    """
+
+    def __init__(self, path, items, repetition):
+        self.path = path
+        self.items = items
+        self.repetition = repetition
+
+    def leaves(self):
+        return self.items.leaves()
+
+    def write(self, value, r, d):
+        if value.__class__ is not list:
+            raise ValueError('value %r of %r is not an array' % (value, '.'.join(self.path)))  # noqa: E501
+        if not value:
+            return self.items.skip(r, d)
+        items = self.items
+        items.write(value[0], r, d + 1)
+        for element in value[1:]:
+            items.write(element, self.repetition, d + 1)
+
+    def skip(self, r, d):
+        self.items.skip(r, d)
+
+
+class ColumnVisitor:
+
+    """Build the tree of the columns of a component tree, visiting each
+    schema with its path, the number of arrays and the number of optional
+    values among its ancestors.
+
+    Objects are groups of the members declared in "properties" and arrays
+    whose "items" is a single schema are repeated. Booleans, integers,
+    numbers, strings, enumerations of strings and nulls are typed leaves,
+    and unions of one of them with "null" are nullable leaves. Every other
+    schema, e.g. compositions, tuples and recursive references, is a leaf
+    holding the JSON serialization of its values.
+    """
+
+    def __init__(self):
+        # The values of the references being visited.
+        self.references = set()
+
+    def visit_reference(self, reference, *args):
+        # Recursive references are JSON leaves.
+        value = reference.value
+        if value is None or id(value) in self.references:
+            return self.visit_primitive(reference, *args)
+        self.references.add(id(value))
+        try:
+            return value.accept(self, *args)
+        finally:
+            self.references.discard(id(value))
+
+    def visit_primitive(self, primitive, path, repetition, definition):
+        return Leaf(path, 'json', repetition, definition)
+
+    def visit_scalar(self, primitive, kind, path, repetition, definition):
+        if primitive.allOf or primitive.anyOf or primitive.oneOf:
+            kind = 'json'
+        return Leaf(path, kind, repetition, definition)
+
+    def visit_boolean(self, boolean, *args):
+        return self.visit_scalar(boolean, 'boolean', *args)
+
+    def visit_integer(self, integer, *args):
+        return self.visit_scalar(integer, 'integer', *args)
+
+    def visit_number(self, number, *args):
+        return self.visit_scalar(number, 'number', *args)
+
+    def visit_string(self, string, *args):
+        return self.visit_scalar(string, 'string', *args)
+
+    def visit_null(self, null, path, repetition, definition):
+        # Nulls are values, defined one level below their parent.
+        return Leaf(path, 'null', repetition, definition + 1, nullable=True)  # noqa: E501
+
+    def visit_enumeration(self, enumeration, *args):
+        strings = enumeration.enum and all(
+            value.__class__ is str for value in enumeration.enum)
+        return self.visit_scalar(
+            enumeration, 'string' if strings else 'json', *args)
+
+    def visit_union(self, union, path, repetition, definition):
+        kinds = {
+            bool: 'boolean', int: 'integer', float: 'number', str: 'string'}
+        types = union.types - {type(None)}
+        if (type(None) in union.types and len(union.types) == 2 and
+                types <= kinds.keys() and
+                not (union.allOf or union.anyOf or union.oneOf)):
+            kind = kinds[next(iter(types))]
+            return Leaf(path, kind, repetition, definition + 1, nullable=True)  # noqa: E501
+        return Leaf(path, 'json', repetition, definition)
+
+    def visit_array(self, array, path, repetition, definition):
+        if (isinstance(array.items, array.ArrayList) or
+                array.allOf or array.anyOf or array.oneOf):
+            return Leaf(path, 'json', repetition, definition)
+        items = array.items.accept(self, path, repetition + 1, definition + 1)  # noqa: E501
+        return Repeated(path, items, repetition + 1)
+
+    def visit_object(self, obj, path, repetition, definition):
+        if obj.allOf or obj.anyOf or obj.oneOf:
+            return Leaf(path, 'json', repetition, definition)
+        members = []
+        for name, schema in obj.properties.items():
+            optional = name not in obj.required
+            node = schema.accept(
+                self, path + (name,), repetition, definition + optional)
+            members.append((name, node, optional))
+        return Group(path, members)
+
+    def visit_empty_schema(self, schema, *args):
+        return self.visit_primitive(schema, *args)
+
+    visit_all_of = visit_any_of = visit_one_of = visit_empty_schema
+
+
+class ColumnWriter:
+
+    """Shred records, e.g. the lines of an NDJSON document, into a column
+    per leaf of the component tree of an object schema, written to
+    ``directory`` along with a JSON manifest describing the columns.
+
+    Each column is made of up to five files, the repetition and definition
+    levels of every entry, the values of the entries holding one and, for
+    strings and JSON values, the offsets of the values in their UTF-8
+    bytes. Files are .npy files if ``format`` is "npy", headerless binary
+    files otherwise, numbers being little-endian in both, and can be
+    memory-mapped, see ``load``. Members not declared in "properties" are
+    not exported.
+
+    Records are validated with ``visitor`` unless it is ``None``, and
+    buffered until ``buffer_size`` records are shredded.
+    """
+
+    formats = ('npy', 'raw')
+
+    def __init__(self, component, directory, format='npy',
+                 visitor=ValidationVisitor, buffer_size=4096):
+        while isinstance(component, Reference):
+            component = component.value
+        if not isinstance(component, Object):
+            raise ValueError('component MUST be an object schema to shred records')  # noqa: E501
+        if format not in self.formats:
+            raise ValueError('format %r is not one of %r' % (format, self.formats))  # noqa: E501
+        self.component = component
+        self.directory = directory
+        self.format = format
+        self.visitor = visitor
+        self.buffer_size = buffer_size
+        self.root = component.accept(ColumnVisitor(), (), 0, 0)
+        self.leaves = self.root.leaves()
+        if any(leaf.definition > 255 or leaf.repetition > 255 for leaf in self.leaves):  # noqa: E501
+            raise ValueError('schema is nested too deeply to be shredded')
+        self.records = 0
+        self.buffered = 0
+        os.makedirs(directory, exist_ok=True)
+        self.files = []
+        for index, leaf in enumerate(self.leaves):
+            files = {}
+            for name, dtype in self.layout(leaf):
+                path = os.path.join(directory, 'column-%d.%s.%s' % (index, name, 'npy' if format == 'npy' else 'bin'))  # noqa: E501
+                fp = open(path, 'wb')
+                if format == 'npy':
+                    fp.write(header(dtype, 0))
+                files[name] = (fp, dtype)
+            self.files.append(files)
+
+    @staticmethod
+    def layout(leaf):
+        # The names and data types of the files of ``leaf``.
+        files = []
+        if leaf.repetition:
+            files.append(('repetition', LEVEL[0]))
+        if leaf.definition:
+            files.append(('definition', LEVEL[0]))
+        if leaf.values is not None:
+            files.append(('values', KINDS[leaf.kind][0]))
+        if leaf.kind in ('string', 'json'):
+            files.append(('offsets', OFFSET[0]))
+        return files
+
+    def append(self, record):
+        if self.visitor is not None:
+            self.component.accept(self.visitor(record))
+        # Discard the partially shredded record if it cannot be shredded.
+        sizes = [
+            (len(leaf.repetitions), len(leaf.values or ()), len(leaf.offsets))  # noqa: E501
+            for leaf in self.leaves]
+        try:
+            self.root.write(record, 0, 0)
+        except ValueError:
+            for leaf, (entries, values, offsets) in zip(self.leaves, sizes):
+                del leaf.repetitions[entries:]
+                del leaf.definitions[entries:]
+                if leaf.values is not None:
+                    del leaf.values[values:]
+                del leaf.offsets[offsets:]
+            raise
+        self.records += 1
+        self.buffered += 1
+        if self.buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        for leaf, files in zip(self.leaves, self.files):
+            buffers = {
+                'repetition': leaf.repetitions,
+                'definition': leaf.definitions,
+                'values': leaf.values,
+                'offsets': leaf.offsets,
+            }
+            for name, (fp, dtype) in files.items():
+                buffer = buffers[name]
+                if SWAP and isinstance(buffer, array.array) and buffer.itemsize > 1:  # noqa: E501
+                    buffer = array.array(buffer.typecode, buffer)
+                    buffer.byteswap()
+                fp.write(buffer)
+            leaf.repetitions = array.array(LEVEL[1])
+            leaf.definitions = array.array(LEVEL[1])
+            if leaf.kind in ('string', 'json'):
+                # Offsets are relative to the values written so far.
+                leaf.count += len(leaf.values)
+                leaf.values = bytearray()
+                leaf.offsets = array.array(OFFSET[1])
+            elif leaf.values is not None:
+                leaf.values = array.array(leaf.values.typecode)
+        self.buffered = 0
+
+    def close(self):
+        """Write the buffered records and the manifest, and return the
+        manifest.
+        """
+        self.flush()
+        columns = []
+        for leaf, files in zip(self.leaves, self.files):
+            description = {}
+            for name, (fp, dtype) in files.items():
+                size = fp.tell()
+                offset = 0
+                if self.format == 'npy':
+                    offset = HEADER_SIZE
+                    length = (size - offset) // struct.calcsize(FORMATS[dtype])  # noqa: E501
+                    fp.seek(0)
+                    fp.write(header(dtype, length))
+                else:
+                    length = size // struct.calcsize(FORMATS[dtype])
+                fp.close()
+                description[name] = {
+                    'path': os.path.basename(fp.name),
+                    'dtype': dtype,
+                    'offset': offset,
+                    'length': length,
+                }
+            columns.append({
+                'name': '.'.join(leaf.path),
+                'path': list(leaf.path),
+                'type': leaf.kind,
+                'repetition': leaf.repetition,
+                'definition': leaf.definition,
+                'files': description,
+            })
+        manifest = {
+            'format': self.format,
+            'records': self.records,
+            'columns': columns,
+        }
+        with open(os.path.join(self.directory, MANIFEST), 'w') as fp:
+            json.dump(manifest, fp, indent=2)
+        return manifest
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def load(directory, name):
+    """Memory-map the files of the column ``name`` of the records shredded
+    into ``directory``, returning a dictionary of read-only arrays by
+    file, e.g. "definition" and "values". Arrays are ``numpy.memmap``
+    instances if NumPy is installed, ``memoryview`` instances otherwise;
+    neither copies the column into memory, except for numbers on
+    big-endian machines without NumPy.
+    """
+    with open(os.path.join(directory, MANIFEST)) as fp:
+        manifest = json.load(fp)
+    for column in manifest['columns']:
+        if column['name'] == name:
+            break
+    else:
+        raise KeyError(name)
+    arrays = {}
+    for key, description in column['files'].items():
+        path = os.path.join(directory, description['path'])
+        dtype = description['dtype']
+        if numpy is not None:
+            arrays[key] = numpy.memmap(
+                path, dtype=numpy.dtype(dtype), mode='r',
+                offset=description['offset'], shape=(description['length'],))  # noqa: E501
+            continue
+        if not description['length']:
+            arrays[key] = memoryview(b'').cast(FORMATS[dtype])
+            continue
+        with open(path, 'rb') as fp:
+            if SWAP and dtype[0] == ENDIAN:
+                # Numbers are copied, in the byte order of the machine.
+                fp.seek(description['offset'])
+                values = array.array(FORMATS[dtype])
+                values.frombytes(fp.read())
+                values.byteswap()
+                arrays[key] = memoryview(values)
+                continue
+            buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        arrays[key] = memoryview(buffer)[description['offset']:].cast(FORMATS[dtype])  # noqa: E501
+    return arrays
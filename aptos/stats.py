@@ -0,0 +1,316 @@
+import gc
+import tracemalloc
+
+from collections import Counter
+
+from .optimizer import CountVisitor
+from .parser import SchemaParser
+from .primitive import Component, Reference
+from .regex import analyze
+
+# The attributes of components which do not affect the instances a schema
+# accepts, or which are derived from other attributes, ignored when
+# looking for duplicate subschemas.
+IGNORED = frozenset([
+    'title', 'description', 'default', 'examples', 'definitions', 'id',
+    'discriminator', 'statistics', 'matcher', 'checker', 'matchers',
+    'frozen'])
+
+
+class Target:
+
+    """The value of the references to a single URI: the ``address`` of
+    the first reference to it, the number of references to it (fan-in),
+    the number of references it holds (fan-out) and its estimates.
+    """
+
+    def __init__(self, address):
+        self.address = address
+        self.fanIn = 0
+        self.fanOut = 0
+        self.estimate = None
+
+
+class StatisticsVisitor:
+
+    """Collect the statistics of a resolved component tree, following each
+    resolved reference once. Visiting a schema returns the estimated cost
+    and the height of its subtree, see ``SchemaStatistics``.
+
+    Definitions are not visited since they play no role in validation;
+    the values of the references to them are.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.enums = []
+        self.patterns = 0
+        self.risky = 0
+        self.references = 0
+        self.recursive = []
+        self.root = Target('#')
+        self.targets = {}
+        self.owner = self.root
+        self.fingerprints = Counter()
+        # Maps each fingerprint to a small integer, so the fingerprint of a
+        # schema only holds those of its subschemas.
+        self.identifiers = {}
+        self.memo = {}
+
+    def fingerprint(self, value):
+        """Return an integer identifying the structure of ``value``:
+        equal subschemas share the same fingerprint.
+        """
+        if isinstance(value, Reference):
+            key = ('$ref', value.address)
+        elif isinstance(value, Component):
+            if id(value) in self.memo:
+                return self.memo[id(value)]
+            attributes = tuple(
+                (name, self.fingerprint(attribute))
+                for name, attribute in sorted(vars(value).items())
+                if name not in IGNORED)
+            if isinstance(value, dict):
+                content = tuple(sorted(
+                    (name, self.fingerprint(member))
+                    for name, member in value.items()))
+            elif isinstance(value, list):
+                content = tuple(map(self.fingerprint, value))
+            else:
+                content = ()
+            key = (value.__class__.__name__, attributes, content)
+        elif isinstance(value, (list, frozenset, set)):
+            # "enum" and "required" are unordered.
+            key = tuple(sorted(map(repr, value)))
+        else:
+            key = repr(value)
+        identifier = self.identifiers.setdefault(key, len(self.identifiers))
+        if isinstance(value, Component):
+            self.memo[id(value)] = identifier
+        return identifier
+
+    @staticmethod
+    def combine(estimates):
+        cost = height = 0
+        for estimate in estimates:
+            cost += estimate[0]
+            height = max(height, estimate[1])
+        return cost, height
+
+    def measure(self, primitive, depth):
+        # Count a schema and return the estimate of its compositions.
+        self.depth = max(self.depth, depth)
+        if primitive.enum:
+            self.enums.append(len(primitive.enum))
+        self.fingerprints[self.fingerprint(primitive)] += 1
+        cost, height = self.combine([
+            primitive.allOf.accept(self, depth + 1),
+            primitive.anyOf.accept(self, depth + 1),
+            primitive.oneOf.accept(self, depth + 1)])
+        return cost + 1, height + 1
+
+    def pattern(self, pattern):
+        self.patterns += 1
+        try:
+            if analyze(pattern):
+                self.risky += 1
+        except ValueError:  # pragma: no cover
+            pass
+
+    def visit_empty_schema(self, schema, depth=1):
+        return 0, 0
+
+    def visit_enumeration(self, enumeration, depth=1):
+        return self.visit_primitive(enumeration, depth)
+
+    def visit_all_of(self, all_of, depth=1):
+        return self.combine(element.accept(self, depth) for element in all_of)
+
+    visit_any_of = visit_one_of = visit_array_list = visit_all_of
+
+    def visit_primitive(self, primitive, depth=1):
+        return self.measure(primitive, depth)
+
+    visit_boolean = visit_null = visit_primitive
+    visit_number = visit_integer = visit_union = visit_primitive
+
+    def visit_string(self, string, depth=1):
+        if string.pattern:
+            self.pattern(string.pattern)
+        return self.measure(string, depth)
+
+    def visit_array(self, array, depth=1):
+        cost, height = self.measure(array, depth)
+        members = self.combine([
+            array.items.accept(self, depth + 1),
+            array.additionalItems.accept(self, depth + 1),
+            array.contains.accept(self, depth + 1)])
+        return cost + members[0], max(height, members[1] + 1)
+
+    def visit_properties(self, properties, depth=1):
+        return self.combine(
+            member.accept(self, depth) for member in properties.values())
+
+    def visit_pattern_properties(self, properties, depth=1):
+        for pattern in properties:
+            self.pattern(pattern)
+        return self.visit_properties(properties, depth)
+
+    def visit_dependencies(self, dependencies, depth=1):
+        return self.combine(
+            dependency.accept(self, depth)
+            for dependency in dependencies.values()
+            if dependency.__class__ is not frozenset)
+
+    def visit_object(self, obj, depth=1):
+        cost, height = self.measure(obj, depth)
+        members = self.combine([
+            obj.properties.accept(self, depth + 1),
+            obj.patternProperties.accept(self, depth + 1),
+            obj.additionalProperties.accept(self, depth + 1),
+            obj.propertyNames.accept(self, depth + 1),
+            obj.dependencies.accept(self, depth + 1)])
+        return cost + members[0], max(height, members[1] + 1)
+
+    def visit_reference(self, reference, depth=1):
+        self.depth = max(self.depth, depth)
+        self.references += 1
+        self.owner.fanOut += 1
+        if not reference.resolved:  # pragma: no cover
+            return 1, 1
+        target = self.targets.get(id(reference.value))
+        if target is None:
+            target = self.targets[id(reference.value)] = Target(reference.address)  # noqa: E501
+            owner, self.owner = self.owner, target
+            target.estimate = reference.value.accept(self, depth + 1)
+            self.owner = owner
+        target.fanIn += 1
+        if target.estimate is None:
+            # A reference back to a schema being visited: its cost grows
+            # with the depth of the instances.
+            if reference.address not in self.recursive:
+                self.recursive.append(reference.address)
+            return 1, 1
+        cost, height = target.estimate
+        self.depth = max(self.depth, depth + height)
+        return cost + 1, height + 1
+
+
+class SchemaStatistics:
+
+    """Report how expensive a resolved component tree is to hold and to
+    validate instances against:
+
+    - ``counts``: the number of schemas by type, including definitions
+      and the empty schemas of absent keywords, as counted by the
+      optimizer
+    - ``depth``: the maximum nesting of subschemas, references included
+    - ``references``: the number of references, and ``fanIn`` and
+      ``fanOut`` the number of references to and from the schema each
+      address refers to, "#" being the root schema
+    - ``duplicates``: the number of subschemas equal to another one,
+      ignoring annotations, which "definitions" and "$ref" could share
+    - ``enums``: the size of each "enum"
+    - ``patterns``: the number of regular expressions, of "pattern" and
+      "patternProperties", and ``risky`` those which may backtrack in
+      super-linear time, see ``aptos.regex.analyze``
+    - ``memory``: the bytes allocated by parsing the tree and still held
+      once parsed, if measured, see ``measure``
+    - ``cost``: the number of schemas evaluated to validate an instance
+      exercising every subschema once, in the worst case: every member of
+      "anyOf" and "oneOf" is evaluated and each reference is evaluated in
+      full. The schemas of array items and object members are evaluated
+      once per item and member, so the cost of an instance grows with
+      its size, and with its depth when ``recursive`` lists references.
+    """
+
+    def __init__(self, component, memory=None):
+        counter = CountVisitor()
+        component.accept(counter)
+        self.counts = counter.counts
+        visitor = StatisticsVisitor()
+        self.cost = component.accept(visitor)[0]
+        self.depth = visitor.depth
+        self.references = visitor.references
+        self.recursive = visitor.recursive
+        targets = [visitor.root] + list(visitor.targets.values())
+        self.fanIn = Counter()
+        self.fanOut = Counter()
+        for target in targets:
+            if target.fanIn:
+                self.fanIn[target.address] += target.fanIn
+            if target.fanOut:
+                self.fanOut[target.address] += target.fanOut
+        self.duplicates = sum(
+            count - 1 for count in visitor.fingerprints.values())
+        self.enums = sorted(visitor.enums, reverse=True)
+        self.patterns = visitor.patterns
+        self.risky = visitor.risky
+        self.memory = memory
+
+    @classmethod
+    def measure(cls, schema, **options):
+        """Parse ``schema``, with ``options`` passed to the parser, and
+        return the statistics of its component tree, measuring the memory
+        it retains with ``tracemalloc``. Caches filled by parsing, e.g.
+        of referenced documents or compiled patterns, are included.
+        """
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        try:
+            gc.collect()
+            before = tracemalloc.get_traced_memory()[0]
+            component = SchemaParser.parse(schema, **options)
+            gc.collect()
+            memory = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+        return cls(component, memory)
+
+    def report(self):
+        """Return the statistics as a JSON document."""
+        return {
+            'counts': dict(self.counts),
+            'schemas': sum(self.counts.values()),
+            'depth': self.depth,
+            'references': self.references,
+            'fanIn': dict(self.fanIn),
+            'fanOut': dict(self.fanOut),
+            'recursive': self.recursive,
+            'duplicates': self.duplicates,
+            'enums': self.enums,
+            'patterns': self.patterns,
+            'risky': self.risky,
+            'memory': self.memory,
+            'cost': self.cost,
+        }
+
+    def explain(self):
+        lines = ['{:<24}{:>10}'.format('schema', 'count')]
+        for name in sorted(self.counts):
+            lines.append('{:<24}{:>10}'.format(name, self.counts[name]))
+        lines.append('{:<24}{:>10}'.format('total', sum(self.counts.values())))  # noqa: E501
+        lines.append('')
+        rows = [
+            ('depth', self.depth),
+            ('references', self.references),
+            ('max fan-in', max(self.fanIn.values(), default=0)),
+            ('max fan-out', max(self.fanOut.values(), default=0)),
+            ('duplicate subschemas', self.duplicates),
+            ('enums', len(self.enums)),
+            ('largest enum', self.enums[0] if self.enums else 0),
+            ('patterns', self.patterns),
+            ('risky patterns', self.risky),
+        ]
+        if self.memory is not None:
+            rows.append(('retained memory (KiB)', '{:.1f}'.format(self.memory / 1024)))  # noqa: E501
+        rows.append(('worst-case cost', self.cost))
+        for name, value in rows:
+            lines.append('{:<24}{:>10}'.format(name, value))
+        for address, count in self.fanIn.most_common(5):
+            lines.append('fan-in {:>6}  {}'.format(count, address))
+        for address in self.recursive:
+            lines.append('recursive      {}'.format(address))
+        return '\n'.join(lines)
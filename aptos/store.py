@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+
+from urllib.parse import unquote, urldefrag, urljoin, urlsplit
+from urllib.request import url2pathname
+
+# Keywords whose values are instances rather than schemas.
+INSTANCE_KEYWORDS = frozenset(['const', 'default', 'enum', 'examples'])
+
+
+def escape(token):
+    """Escape a reference token of a JSON Pointer.
+
+    https://tools.ietf.org/html/rfc6901#section-3
+    """
+    return token.replace('~', '~0').replace('/', '~1')
+
+
+def unescape(token):
+    """Unescape a reference token of a JSON Pointer.
+
+    https://tools.ietf.org/html/rfc6901#section-4
+    """
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+class Document:
+
+    """A schema document retrieved from ``uri``, indexed once so that any of
+    its values is located in constant time.
+
+    ``pointers`` maps the JSON Pointer of every value to the value and the
+    base URI its own "$id" is relative to, i.e. the retrieval URI updated
+    by every "$id" on the way.
+    ``identifiers`` maps the absolute URI of every subschema identified
+    with "$id" or "$anchor" to its JSON Pointer. ``locations`` maps the
+    ``id()`` of every object or array to its JSON Pointer.
+    """
+
+    def __init__(self, content, uri=''):
+        self.content = content
+        self.uri = uri
+        self.base = uri
+        if isinstance(content, dict) and isinstance(content.get('$id'), str):
+            self.base = urldefrag(urljoin(uri, content['$id']))[0]
+        self.pointers = {}
+        self.identifiers = {}
+        self.locations = {}
+        self.walk(content, '', uri, True)
+
+    def walk(self, node, pointer, base, schema):
+        self.pointers[pointer] = (node, base)
+        if isinstance(node, dict):
+            self.locations[id(node)] = pointer
+            if schema:
+                identifier = node.get('$id')
+                if isinstance(identifier, str):
+                    uri = urljoin(base, identifier)
+                    base = urldefrag(uri)[0]
+                    self.identifiers[uri] = pointer
+                anchor = node.get('$anchor')
+                if isinstance(anchor, str):
+                    self.identifiers[urljoin(base, '#' + anchor)] = pointer
+            for name, value in node.items():
+                self.walk(
+                    value, pointer + '/' + escape(name), base,
+                    schema and name not in INSTANCE_KEYWORDS)
+        elif isinstance(node, list):
+            self.locations[id(node)] = pointer
+            for index, value in enumerate(node):
+                self.walk(value, pointer + '/' + str(index), base, schema)
+
+    def declares(self, uri):
+        """Whether ``uri`` refers to this document or one of its
+        subschemas.
+        """
+        location = urldefrag(uri)[0]
+        return (
+            location in (self.uri, self.base) or
+            uri in self.identifiers or location in self.identifiers)
+
+    def resolve(self, uri):
+        """Return the value ``uri`` refers to along with its base URI."""
+        if uri in self.identifiers:
+            return self.pointers[self.identifiers[uri]]
+        location, fragment = urldefrag(uri)
+        if location in (self.uri, self.base):
+            return self.locate(fragment)
+        # A pointer into an embedded resource identified by its "$id".
+        return self.locate(self.identifiers[location] + unquote(fragment))
+
+    def locate(self, fragment):
+        """Return the value the URI ``fragment``, a JSON Pointer or the name
+        of an anchor, refers to along with its base URI.
+        """
+        fragment = unquote(fragment)
+        if fragment and not fragment.startswith('/'):
+            uri = urljoin(self.base, '#' + fragment)
+            if uri not in self.identifiers:
+                raise ValueError('%r does not identify any subschema of %r' % (fragment, self.uri))  # noqa: E501
+            fragment = self.identifiers[uri]
+        try:
+            return self.pointers[fragment]
+        except KeyError:
+            raise ValueError('JSON Pointer %r does not refer to any value of %r' % (fragment, self.uri))  # noqa: E501
+
+    def pointer(self, node):
+        """Return the JSON Pointer of an object or array of the document."""
+        return self.locations[id(node)]
+
+
+class FileSystemLoader:
+
+    """Load JSON documents from "file" URIs and paths. Relative paths are
+    relative to ``root``, the working directory by default.
+    """
+
+    def __init__(self, root=None):
+        self.root = root
+
+    def __call__(self, uri):
+        parts = urlsplit(uri)
+        if parts.scheme not in ('', 'file'):
+            raise ValueError('cannot load %r, only "file" URIs are supported' % (uri,))  # noqa: E501
+        path = url2pathname(parts.path)
+        if self.root is not None:
+            path = os.path.join(self.root, path)
+        with open(path) as fp:
+            return json.load(fp)
+
+
+class MemoryLoader:
+
+    """Load JSON documents from a mapping of URIs to documents."""
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __call__(self, uri):
+        try:
+            return self.documents[uri]
+        except KeyError:
+            raise ValueError('cannot load %r, no such document' % (uri,))
+
+
+class DocumentStore:
+
+    """Retrieve schema documents with ``loader``, each document being
+    loaded once and shared by every parse using the store.
+    """
+
+    def __init__(self, loader=None):
+        self.loader = FileSystemLoader() if loader is None else loader
+        self.documents = {}
+        self.identifiers = {}
+        self.lock = threading.Lock()
+
+    def get(self, uri):
+        """Return the ``Document`` retrieved from ``uri``, loading it on
+        first use.
+        """
+        document = self.documents.get(uri)
+        if document is not None:
+            return document
+        with self.lock:
+            if uri not in self.documents:
+                document = Document(self.loader(uri), uri)
+                self.documents[uri] = self.documents[document.base] = document
+                for identifier in document.identifiers:
+                    self.identifiers.setdefault(identifier, document)
+            return self.documents[uri]
+
+    def clear(self):
+        with self.lock:
+            self.documents = {}
+            self.identifiers = {}
+
+
+# The store shared by every parse unless another one is given.
+STORE = DocumentStore()
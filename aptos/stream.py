@@ -0,0 +1,218 @@
+import codecs
+import json
+import mmap
+import re
+
+from .primitive import Array, EmptySchema, Object, Reference
+from .visitor import ValidationVisitor
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+# The characters which may continue a number.
+NUMBER = re.compile(r'[0-9.eE+\-]*')
+
+
+def hashable(instance):
+    # A hashable value equal for equal instances, e.g. 1 and 1.0, as
+    # compared by the ValidationVisitor.
+    cls = instance.__class__
+    if cls is dict:
+        return frozenset(
+            (name, hashable(value)) for name, value in instance.items())
+    if cls is list:
+        return tuple(hashable(element) for element in instance)
+    return instance
+
+
+class JSONTokenizer:
+
+    """Incrementally read a JSON document from a file object, e.g. an open
+    file or a memory-mapped buffer.
+
+    Structural characters are consumed one at a time while values are
+    decoded whole, so at most a single value is held in memory.
+    """
+
+    decoder = json.JSONDecoder()
+
+    def __init__(self, fp, size=64 * 1024):
+        self.fp = fp
+        self.size = size
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+        self.codec = codecs.getincrementaldecoder('utf-8')()
+
+    def fill(self, size):
+        chunk = self.fp.read(size)
+        if not chunk:
+            self.eof = True
+            chunk = self.codec.decode(b'', final=True)
+        elif isinstance(chunk, bytes):
+            chunk = self.codec.decode(chunk)
+        # Discard the characters which have already been consumed.
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it,
+        or an empty string at the end of the document.
+        """
+        while True:
+            buffer = self.buffer
+            position = WHITESPACE.match(buffer, self.position).end()
+            self.position = position
+            if position < len(buffer):
+                return buffer[position]
+            if self.eof:
+                return ''
+            self.fill(self.size)
+
+    def expect(self, characters):
+        character = self.peek()
+        if not character or character not in characters:
+            raise ValueError('Expecting one of %r, found %r' % (characters, character or 'end of document'))  # noqa: E501
+        self.position += 1
+        return character
+
+    def value(self):
+        self.peek()
+        size = self.size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(
+                    self.buffer, self.position)
+            except ValueError:
+                if self.eof:
+                    raise
+            else:
+                # A number ending with the buffer, or followed by a partial
+                # fraction or exponent, e.g. "1." or "1e", may continue in
+                # the next chunk.
+                if self.eof or NUMBER.fullmatch(self.buffer, end) is None:
+                    self.position = end
+                    return value
+            # Grow the read size to avoid decoding large values repeatedly.
+            self.fill(size)
+            size = max(size, len(self.buffer))
+
+
+class StreamingValidator:
+
+    """Validate a JSON document against a schema while it is being read.
+
+    The elements of a top-level array and the members of a top-level
+    object are validated as soon as they are decoded, and validation stops
+    at the first violation. Documents whose schema constrains the
+    top-level value as a whole, e.g. with "allOf" or "enum", are decoded
+    entirely before being validated.
+
+    Memory use is bounded by the largest element or member, except with
+    "uniqueItems", where the elements already read are kept to detect
+    duplicates.
+    """
+
+    def __init__(self, component, visitor=ValidationVisitor):
+        while isinstance(component, Reference):
+            component = component.value
+        self.component = component
+        self.visitor = visitor
+
+    def streamable(self):
+        component = self.component
+        if not isinstance(component, (Array, Object)):
+            return False
+        if component.allOf or component.anyOf or component.oneOf:
+            return False
+        if component.enum or component.const is not None:
+            return False
+        if isinstance(component, Array):
+            return isinstance(component.contains, EmptySchema)
+        # Schema dependencies apply to the object as a whole.
+        return all(
+            dependency.__class__ is frozenset
+            for dependency in component.dependencies.values())
+
+    def validate(self, fp):
+        tokenizer = JSONTokenizer(fp)
+        if not self.streamable():
+            self.component.accept(self.visitor(tokenizer.value()))
+        elif isinstance(self.component, Array):
+            self.validate_array(tokenizer)
+        else:
+            self.validate_object(tokenizer)
+        if tokenizer.peek():
+            raise ValueError('Extra data after the end of the document')
+
+    def validate_path(self, path):
+        with open(path, 'rb') as fp:
+            try:
+                buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be memory-mapped.
+                return self.validate(fp)
+            with buffer:
+                return self.validate(buffer)
+
+    def expect_type(self, tokenizer, bracket, name):
+        character = tokenizer.peek()
+        if character != bracket:
+            kind = {'[': 'array', '{': 'object', '"': 'string', 'n': 'null', 't': 'boolean', 'f': 'boolean'}.get(character, 'number')  # noqa: E501
+            assert False, 'instance of type %r is not in any of the sets listed %r' % (kind, name)  # noqa: E501
+        tokenizer.expect(bracket)
+
+    def validate_array(self, tokenizer):
+        array = self.component
+        self.expect_type(tokenizer, '[', array.type)
+        seen = set()
+        size = 0
+        while tokenizer.peek() != ']':
+            if size:
+                tokenizer.expect(',')
+            element = tokenizer.value()
+            if isinstance(array.items, array.ArrayList):
+                schema = array.items[size] if size < len(array.items) else array.additionalItems  # noqa: E501
+            else:
+                schema = array.items
+            schema.accept(self.visitor(element))
+            size += 1
+            if array.maxItems:
+                assert size <= array.maxItems, 'instance has more than %r elements' % (array.maxItems,)  # noqa: E501
+            if array.uniqueItems:
+                key = hashable(element)
+                assert key not in seen, 'instance contains duplicate element %r' % (element,)  # noqa: E501
+                seen.add(key)
+        tokenizer.expect(']')
+        assert size >= array.minItems, 'instance has fewer than %r elements' % (array.minItems,)  # noqa: E501
+
+    def validate_object(self, tokenizer):
+        obj = self.component
+        self.expect_type(tokenizer, '{', obj.type)
+        names = set()
+        matchers = obj.patternProperties.matchers
+        while tokenizer.peek() != '}':
+            if names:
+                tokenizer.expect(',')
+            if tokenizer.peek() != '"':
+                raise ValueError('Expecting property name enclosed in double quotes')  # noqa: E501
+            name = tokenizer.value()
+            tokenizer.expect(':')
+            member = tokenizer.value()
+            if not isinstance(obj.propertyNames, EmptySchema):
+                obj.propertyNames.accept(self.visitor(name))
+            schemas = [
+                obj.patternProperties[pattern] for matcher, pattern in matchers  # noqa: E501
+                if matcher.match(name) is not None]
+            if name in obj.properties:
+                schemas.insert(0, obj.properties[name])
+            for schema in schemas or [obj.additionalProperties]:
+                schema.accept(self.visitor(member), obj.additionalProperties)
+            names.add(name)
+            if obj.maxProperties:
+                assert len(names) <= obj.maxProperties, 'instance has more than %r properties' % (obj.maxProperties,)  # noqa: E501
+        tokenizer.expect('}')
+        assert len(names) >= obj.minProperties, 'instance has fewer than %r properties' % (obj.minProperties,)  # noqa: E501
+        if not names >= obj.required:
+            assert False, 'instance is missing required property %r' % (min(obj.required - names),)  # noqa: E501
+        for name, dependency in obj.dependencies.items():
+            if name in names:
+                assert names >= dependency, 'instance property %r depends on missing property %r' % (name, min(dependency - names))  # noqa: E501
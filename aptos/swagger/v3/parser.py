@@ -6,7 +6,9 @@ from ...parser import Parser
 class OpenAPIParser(Parser):
 
     @staticmethod
-    def parse(schema):
+    def parse(schema, uri='', store=None, freeze=True, patterns=None,
+              formats=None):
         component = Swagger.unmarshal(schema)
-        component.accept(OpenAPIResolveVisitor(schema))
-        return component
+        component.accept(OpenAPIResolveVisitor(
+            schema, uri, store, patterns, formats))
+        return component.freeze() if freeze else component
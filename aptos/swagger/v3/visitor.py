@@ -1,21 +1,11 @@
-from ...primitive import Creator
 from ...visitor import ResolveVisitor
 
 
 class OpenAPIResolveVisitor(ResolveVisitor):
 
-    def __init__(self, context):
-        self.context = context
-
-    def visit_reference(self, reference, *args):
-        if reference.resolved:  # pragma: no cover
-            return reference
-        component, name = reference.address.split('/')[-2:]
-        schema = self.context['components'][component][name]
-        reference.value = Creator.create(schema.get('type')).unmarshal(schema)
-        reference.value.accept(self, *args)
-        reference.resolved = True
-        return reference
+    """Resolve the references of an OpenAPI document, e.g.
+    "#/components/schemas/Pet", like those of a JSON Schema.
+    """
 
     def visit_swagger(self, swagger, *args):
         swagger.paths.accept(self, *args)
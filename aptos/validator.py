@@ -0,0 +1,39 @@
+from .visitor import ValidationVisitor
+
+
+class Validator:
+
+    """Validate instances against a parsed component tree.
+
+    A validator keeps no state between calls: every call validates the
+    instance with a visitor of its own, and a frozen component tree is
+    never modified. A single validator can be shared by any number of
+    threads.
+
+    ``options`` are passed to the visitor, e.g. ``adaptive=True`` or a
+    ``ValidationCache`` shared by every call.
+    """
+
+    __slots__ = ('component', 'visitor', 'options')
+
+    def __init__(self, component, visitor=ValidationVisitor, **options):
+        if not component.frozen:
+            raise ValueError('component MUST be frozen to be shared, see "Component.freeze"')  # noqa: E501
+        self.component = component
+        self.visitor = visitor
+        self.options = options
+
+    def validate(self, instance):
+        """Raise an ``AssertionError`` if ``instance`` is invalid, otherwise
+        return the ``SamplingReport`` of the visitor, if any.
+        """
+        visitor = self.visitor(instance, **self.options)
+        self.component.accept(visitor)
+        return visitor.report
+
+    def is_valid(self, instance):
+        try:
+            self.component.accept(self.visitor(instance, **self.options))
+        except AssertionError:
+            return False
+        return True
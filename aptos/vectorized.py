@@ -0,0 +1,105 @@
+from .primitive import Integer, Number
+
+# Long arrays of numbers are validated against the schema of their elements
+# by NumPy, which checks every element at once. NumPy is optional: without
+# it, every element is validated on its own. It is imported by ``load``
+# the first time an array may be checked at once, so that importing aptos,
+# e.g. to run the command line interface, does not pay for it.
+UNLOADED = object()
+numpy = UNLOADED
+
+
+def load():
+    """Return the NumPy module, importing it on first use, or ``None`` if
+    it is not installed.
+    """
+    global numpy
+    if numpy is UNLOADED:
+        try:
+            import numpy as module
+        except ImportError:  # pragma: no cover
+            module = None
+        numpy = module
+    return numpy
+
+
+# The kinds of NumPy data types whose elements are Python ints or floats.
+KINDS = {Integer: 'iu', Number: 'f'}
+
+# Integers are only checked at once if 64-bit floats represent them
+# exactly, so NumPy divides and compares them like Python.
+PRECISION = 2 ** 53
+
+
+def vectorizable(schema):
+    """Whether every keyword of ``schema``, the "items" of an array, can be
+    checked on all the elements at once.
+    """
+    return (
+        schema.__class__ in KINDS and
+        schema.type is not None and schema.const is None and
+        not (schema.enum or schema.allOf or schema.anyOf or schema.oneOf) and
+        load() is not None)
+
+
+def values(schema, instance):
+    """Return the elements of ``instance`` as a one-dimensional ndarray of
+    64-bit numbers, or ``None`` if some element is not of the type of
+    ``schema`` or cannot be checked by NumPy.
+    """
+    dtype = numpy.int64 if schema.__class__ is Integer else numpy.float64
+    if instance.__class__ is list:
+        if not schema.types.issuperset(map(type, instance)):
+            return None
+        try:
+            values = numpy.fromiter(instance, dtype, len(instance))
+        except OverflowError:
+            return None
+    else:
+        values = numpy.asarray(instance)
+        if values.ndim != 1 or values.dtype.kind not in KINDS[schema.__class__]:  # noqa: E501
+            return None
+    if schema.__class__ is Integer and len(values) and (
+            values.min() < -PRECISION or values.max() > PRECISION):
+        return None
+    return values.astype(dtype, copy=False)
+
+
+def mask(schema, elements):
+    """Return whether each of ``elements``, an ndarray returned by
+    ``values``, is valid against the numeric keywords of ``schema``.
+    """
+    valid = numpy.ones(len(elements), dtype=bool)
+    with numpy.errstate(all='ignore'):
+        if schema.multipleOf is not None:
+            quotient = elements / schema.multipleOf
+            valid &= numpy.isfinite(quotient) & (numpy.floor(quotient) == quotient)  # noqa: E501
+        if schema.maximum is not None:
+            valid &= elements <= schema.maximum
+        if schema.exclusiveMaximum is not None:
+            valid &= elements < schema.exclusiveMaximum
+        if schema.minimum is not None:
+            valid &= elements >= schema.minimum
+        if schema.exclusiveMinimum is not None:
+            valid &= elements > schema.exclusiveMinimum
+    return valid
+
+
+def residue(schema, instance):
+    """Return the elements of ``instance`` which remain to be validated
+    against ``schema`` one at a time: none if every element is valid, the
+    elements from the first invalid one otherwise, so that validation
+    reports the same violation as without NumPy. Return ``None`` if the
+    elements cannot be checked at once.
+    """
+    if not vectorizable(schema):
+        return None
+    elements = values(schema, instance)
+    if elements is None:
+        return None
+    valid = mask(schema, elements)
+    if valid.all():
+        return []
+    first = int(numpy.argmin(valid))
+    remainder = instance[first:]
+    return remainder.tolist() if isinstance(remainder, numpy.ndarray) else remainder  # noqa: E501
@@ -1,6 +1,16 @@
+import json
+import math
 import re
 
-from .primitive import Creator, Translator
+from copy import copy
+from json.encoder import encode_basestring_ascii
+from urllib.parse import urldefrag, urljoin
+
+from .formats import FORMATS
+from .primitive import Creator, Discriminator, EmptySchema, ndarray
+from .regex import PatternPolicy
+from .store import STORE, Document
+from .vectorized import residue
 
 
 class SchemaArrayValidationHandler:
@@ -10,56 +20,162 @@ class SchemaArrayValidationHandler:
 
     def __call__(self, sequence, *args):
         errors = []
-        for element in sequence:
+        for index, error in self.evaluate(sequence, *args):
+            if error is not None:
+                errors.append(error)
+        return errors
+
+    def evaluate(self, sequence, *args, indices=None):
+        """Lazily validate the instance against each member of
+        ``sequence``, yielding the position of the member and the error
+        message, or ``None`` if the instance is valid.
+
+        With an adaptive visitor, members are tried from the historically
+        most to the least successful one. ``indices`` restricts validation
+        to the given members.
+        """
+        if indices is not None:
+            order = indices
+        elif self.visitor.adaptive:
+            order = sequence.statistics.order
+        else:
+            order = range(len(sequence))
+        for position, index in enumerate(order):
             try:
-                element.accept(self.visitor, *args)
+                sequence[index].accept(self.visitor, *args)
             except AssertionError as e:
-                errors.append(e.args[0])
-                continue
-        return errors
+                yield position, e.args[0]
+            else:
+                yield position, None
 
 
 class ValidationVisitor:
 
-    def __init__(self, instance):
+    # Skip the values of an instance no subschema constrains, e.g. the
+    # elements of an array without "items".
+    prune = True
+
+    # Memoize results with a ``ValidationCache``, see ``aptos.cache``.
+    cache = None
+
+    # Validate a sample of the elements of large arrays with a
+    # ``SamplingPolicy``, see ``aptos.sampling``. ``report`` summarizes the
+    # elements which were skipped.
+    sampling = report = None
+
+    # Limit the resources spent validating the instance with a ``Budget``,
+    # see ``aptos.budget``. ``depth`` is the nesting of the instance.
+    meter = None
+    depth = 0
+
+    # Check arrays of at least ``vectorize`` numbers at once with NumPy, see
+    # ``aptos.vectorized``. ``None`` validates every element on its own.
+    vectorize = 16
+
+    def __init__(self, instance, adaptive=False, cache=None, sampling=None,
+                 budget=None):
         self.instance = instance
+        self.adaptive = adaptive
+        if cache is not None:
+            self.cache = cache
+        if sampling is not None:
+            self.sampling = sampling
+            self.report = sampling.report()
+        if budget is not None:
+            self.meter = budget.meter()
+            self.meter.visit(0)
+
+    def descend(self, instance):
+        """Return a visitor sharing the state of this visitor to validate a
+        child ``instance``, e.g. an array element or an object member.
+        """
+        visitor = object.__new__(self.__class__)
+        visitor.__dict__.update(self.__dict__)
+        visitor.instance = instance
+        meter = self.meter
+        if meter is not None:
+            depth = visitor.depth = self.depth + 1
+            meter.count -= 1
+            if meter.count <= 0 or depth > meter.depth:
+                meter.check(depth)
+        return visitor
+
+    def sibling(self):
+        """Return a visitor validating the same instance against a subschema,
+        e.g. the members of "allOf", "anyOf" and "oneOf".
+        """
+        return self
 
     def visit_empty_schema(self, schema, *args):  # pragma: no cover
         """Always passes validation."""
         return
 
     def visit_enumeration(self, enumeration, *args):
+        # "enum" is validated along with the other keywords applying to any
+        # instance type.
         self.visit_primitive(enumeration, *args)
-        assert self.instance in enumeration.enum, 'instance %r is not equal to one of the elements %r' % (self.instance, enumeration)  # noqa: E501
 
     def visit_all_of(self, all_of, *args):
         for element in all_of:
             element.accept(self, *args)
 
+    def candidates(self, sequence):
+        """Return the indices of the members of "anyOf" or "oneOf" selected
+        by the discriminator of ``sequence``, if any.
+        """
+        if sequence.discriminator is None:
+            return None
+        indices = sequence.discriminator.candidates(self.instance)
+        if indices is not None:
+            assert indices, 'instance %r property %r is not equal to one of the elements %r' % (self.instance, sequence.discriminator.propertyName, sorted(sequence.discriminator.mapping))  # noqa: E501
+        return indices
+
     def visit_any_of(self, any_of, *args):
         if any_of:
+            errors = []
+            indices = self.candidates(any_of)
             handler = SchemaArrayValidationHandler(self)
-            errors = handler(any_of, *args)
-            assert len(any_of) != len(errors), ', '.join(errors)
+            for position, error in handler.evaluate(any_of, *args, indices=indices):  # noqa: E501
+                if error is None:
+                    # Stop at the first member the instance is valid against.
+                    if self.adaptive and indices is None:
+                        any_of.statistics.hit(position)
+                    return
+                errors.append(error)
+            assert False, ', '.join(errors)
 
     def visit_one_of(self, one_of, *args):
         if one_of:
+            errors = []
+            matched = None
+            indices = self.candidates(one_of)
             handler = SchemaArrayValidationHandler(self)
-            errors = handler(one_of, *args)
-            assert len(errors) == 1, ', '.join(errors)
+            for position, error in handler.evaluate(one_of, *args, indices=indices):  # noqa: E501
+                if error is not None:
+                    errors.append(error)
+                    continue
+                # Stop at the second member the instance is valid against.
+                assert matched is None, 'instance %r is valid against more than one schema' % (self.instance,)  # noqa: E501
+                matched = position
+            assert matched is not None, ', '.join(errors)
+            if self.adaptive and indices is None:
+                one_of.statistics.hit(matched)
 
     def visit_primitive(self, primitive, *args):
         instance = self.instance
         if primitive.const is not None:
             assert instance == primitive.const, 'instance %r is not equal to %r' % (instance, primitive.const)  # noqa: E501
+        if primitive.enum:
+            assert instance in primitive.enum, 'instance %r is not equal to one of the elements %r' % (instance, primitive.enum)  # noqa: E501
         if primitive.type is not None:
-            assert {
-                str: lambda instance: Translator.translate(instance).__name__.lower() == primitive.type,  # noqa: E501
-                list: lambda instance: Translator.translate(instance).__name__.lower() in primitive.type,  # noqa: E501
-            }[primitive.type.__class__](instance), 'instance %r is not in any of the sets listed %r' % (instance, primitive.type)  # noqa: E501
-        primitive.allOf.accept(self, *args)
-        primitive.anyOf.accept(self, *args)
-        primitive.oneOf.accept(self, *args)
+            # NumPy arrays are arrays, without importing NumPy to tell.
+            assert instance.__class__ in primitive.types or (list in primitive.types and ndarray(instance)), 'instance %r is not in any of the sets listed %r' % (instance, primitive.type)  # noqa: E501
+        if primitive.allOf:
+            primitive.allOf.accept(self.sibling(), *args)
+        if primitive.anyOf:
+            primitive.anyOf.accept(self.sibling(), *args)
+        if primitive.oneOf:
+            primitive.oneOf.accept(self.sibling(), *args)
 
     def visit_boolean(self, boolean, *args):
         self.visit_primitive(boolean, *args)
@@ -72,7 +188,8 @@ class ValidationVisitor:
 
         cls = args[0]
         instance = cls(self.instance)
-        assert float(instance / numeric.multipleOf).is_integer(), 'instance %r division by %r is not an integer' % (instance, numeric.multipleOf)  # noqa: E501
+        if numeric.multipleOf is not None:
+            assert float(instance / numeric.multipleOf).is_integer(), 'instance %r division by %r is not an integer' % (instance, numeric.multipleOf)  # noqa: E501
         if numeric.maximum is not None:
             assert instance <= numeric.maximum, 'instance %r is not less than or exactly equal to %r' % (instance, numeric.maximum)  # noqa: E501
         if numeric.exclusiveMaximum is not None:
@@ -89,6 +206,8 @@ class ValidationVisitor:
         self.visit_numeric(integer, int)
 
     def visit_string(self, string, *args):
+        if self.meter is not None and self.instance.__class__ is str:
+            self.meter.examine(self.instance)
         self.visit_primitive(string, *args)
 
         instance = self.instance
@@ -96,21 +215,58 @@ class ValidationVisitor:
             assert len(instance) <= string.maxLength, 'instance %r is not less than, or equal to to %r' % (instance, string.maxLength)  # noqa: E501
         assert len(instance) >= string.minLength, 'instance %r is not greater than, or equal to %r' % (instance, string.minLength)  # noqa: E501
         if string.pattern:
-            assert re.match(string.pattern, instance) is not None, 'instance %r does not match the regular expression %r' % (instance, string.pattern)  # noqa: E501
+            matcher = string.matcher
+            assert (re.match(string.pattern, instance) if matcher is None else matcher.match(instance)) is not None, 'instance %r does not match the regular expression %r' % (instance, string.pattern)  # noqa: E501
+        if string.checker is not None:
+            assert string.checker(instance), 'instance %r is not a valid %r' % (instance, string.format)  # noqa: E501
 
     def visit_array(self, array, *args):
         self.visit_primitive(array, *args)
 
         instance = self.instance
-        for element in instance:
+        sampled = self.sampling is not None and len(instance) > self.sampling.minimum  # noqa: E501
+        remainder = None
+        if self.vectorize is not None and not sampled and (instance.__class__ is not list or len(instance) >= self.vectorize):  # noqa: E501
+            remainder = residue(array.items, instance)
+        if instance.__class__ is not list:
+            # An array.array or a numpy.ndarray, whose elements are
+            # validated as Python numbers.
+            instance = self.instance = instance.tolist()
+        if isinstance(array.items, array.ArrayList):
             array.items.accept(self, array.additionalItems)
+        elif not (self.prune and isinstance(array.items, EmptySchema)):
+            elements = instance
+            if sampled:
+                elements = self.sampling.sample(instance, self.report)
+            elif remainder is not None:
+                # The elements before the first invalid one are valid.
+                elements = remainder
+                if self.meter is not None:
+                    self.meter.advance(len(instance) - len(remainder), self.depth + 1)  # noqa: E501
+            if self.cache is not None and self.cache.memoizes(array.items):
+                for element in elements:
+                    self.cache.validate(array.items, self.descend(element))
+            else:
+                for element in elements:
+                    array.items.accept(self.descend(element))
         if array.maxItems:
             assert len(instance) <= array.maxItems, 'instance %r is not less than, or equal to %r' % (instance, array.maxItems)  # noqa: E501
         assert len(instance) >= array.minItems, 'instance %r is not greater than, or equal to %r' % (instance, array.minItems)  # noqa: E501
         if array.uniqueItems:
             assert len(set(instance)) == len(instance), 'instance %r contains duplicate elements' % (instance,)  # noqa: E501
-        # TODO: contains
-        array.contains.accept(self, *args)
+        if not isinstance(array.contains, EmptySchema):
+            # Validation stops at the first element valid against
+            # "contains".
+            #
+            # http://json-schema.org/latest/json-schema-validation.html#rfc.section.6.4.6
+            for element in instance:
+                try:
+                    array.contains.accept(self.descend(element).sibling())
+                except AssertionError:
+                    continue
+                break
+            else:
+                assert False, 'instance %r does not contain any element valid against "contains"' % (instance,)  # noqa: E501
 
     def visit_array_list(self, array_list, *args):
         # TODO: array list
@@ -119,23 +275,28 @@ class ValidationVisitor:
         for i, element in enumerate(instance):
             # Determine which subschemas apply to which elements of the array.
             try:
-                array_list[i].accept(ValidationVisitor(element), *args)
+                array_list[i].accept(self.descend(element), *args)
             except IndexError:
                 # If "items" is an array of schemas, validation succeeds if
                 # every instance element at a position greater than the size of
                 # "items" validates against "additionalItems".
                 #
                 # http://json-schema.org/latest/json-schema-validation.html#rfc.section.6.10
-                additionalItems.accept(ValidationVisitor(element), *args)
+                additionalItems.accept(self.descend(element), *args)
 
     def visit_properties(self, properties, *args):
         instance = self.instance
         additionalProperties = args[0]
+        cache = self.cache
         for name, member in instance.items():
             # Validation succeeds if, for each name that appears in both the
             # instance and as a name within this keyword's value.
             try:
-                properties[name].accept(ValidationVisitor(member), *args)
+                schema = properties[name]
+                if cache is not None and cache.memoizes(schema):
+                    cache.validate(schema, self.descend(member), *args)
+                else:
+                    schema.accept(self.descend(member), *args)
             except KeyError:
                 # Validation with "additionalProperties" applies only to the
                 # child values of instance names that do not match any names in
@@ -143,7 +304,7 @@ class ValidationVisitor:
                 # "patternProperties".
                 #
                 # http://json-schema.org/latest/json-schema-validation.html#rfc.section.6.20
-                additionalProperties.accept(ValidationVisitor(member), *args)
+                additionalProperties.accept(self.descend(member), *args)
 
     def visit_definitions(self, definitions, *args):  # pragma: no cover
         """This keyword plays no role in validation per se. Its role is to
@@ -161,22 +322,236 @@ class ValidationVisitor:
         if obj.maxProperties:
             assert len(instance) <= obj.maxProperties, 'instance %r number of properties is not less than, or equal to %r' % (instance, obj.maxProperties)  # noqa: E501
         assert len(instance) >= obj.minProperties, 'instance %r number of properties is not greater than, or equal to %r' % (instance, obj.minProperties)  # noqa: E501
-        for element in obj.required:
-            assert element in instance, 'instance %r is missing required property %r' % (instance, element)  # noqa: E501
-        obj.properties.accept(self, obj.additionalProperties)
+        if obj.required and not instance.keys() >= obj.required:
+            assert False, 'instance %r is missing required property %r' % (instance, min(obj.required.difference(instance)))  # noqa: E501
+        if obj.dependencies:
+            obj.dependencies.accept(self, *args)
+        if obj.patternProperties or not isinstance(obj.propertyNames, EmptySchema):  # noqa: E501
+            self.visit_members(obj, *args)
+        elif obj.properties or not (self.prune and isinstance(obj.additionalProperties, EmptySchema)):  # noqa: E501
+            obj.properties.accept(self, obj.additionalProperties)
+
+    def visit_members(self, obj, *args):
+        """Validate the names of the members of the instance against
+        "propertyNames" and their values against the schemas of
+        "properties", "patternProperties" and "additionalProperties", in a
+        single pass over the members.
+        """
+        instance = self.instance
+        properties = obj.properties
+        additionalProperties = obj.additionalProperties
+        patternProperties = obj.patternProperties
+        # Patterns are compiled when the schema is resolved.
+        matchers = patternProperties.matchers or tuple(
+            (re.compile(pattern), pattern) for pattern in patternProperties)
+        names = obj.propertyNames
+        if isinstance(names, EmptySchema):
+            names = None
+        cache = self.cache
+        for name, member in instance.items():
+            if names is not None:
+                names.accept(self.descend(name))
+            matched = False
+            schema = properties.get(name)
+            if schema is not None:
+                if cache is not None and cache.memoizes(schema):
+                    cache.validate(schema, self.descend(member))
+                else:
+                    schema.accept(self.descend(member))
+                matched = True
+            for matcher, pattern in matchers:
+                # Every schema whose pattern matches the name applies.
+                if matcher.match(name) is not None:
+                    patternProperties[pattern].accept(self.descend(member))
+                    matched = True
+            if not matched:
+                additionalProperties.accept(self.descend(member))
+
+    def visit_dependencies(self, dependencies, *args):
+        instance = self.instance
+        for name, dependency in dependencies.items():
+            if name not in instance:
+                continue
+            if dependency.__class__ is frozenset:
+                assert instance.keys() >= dependency, 'instance %r property %r depends on missing property %r' % (instance, name, min(dependency.difference(instance)))  # noqa: E501
+            else:
+                dependency.accept(self.sibling())
 
     def visit_reference(self, reference, *args):
         if reference.resolved:  # pragma: no cover
-            reference.value.accept(self, *args)
+            if self.cache is not None and self.cache.memoizes(reference.value, True):  # noqa: E501
+                self.cache.validate(reference.value, self, *args)
+            else:
+                reference.value.accept(self, *args)
 
     def visit_union(self, union, *args):
         self.visit_primitive(union, *args)
 
 
+class JSONEncodingVisitor(ValidationVisitor):
+
+    """Validate an instance and serialize it into compact JSON in a single
+    traversal.
+
+    The serialized form is only complete once validation succeeds; the
+    first violation raises an ``AssertionError`` and the partial output is
+    discarded with the visitor.
+    """
+
+    # Every value is serialized, even those no subschema constrains.
+    prune = False
+    vectorize = None
+
+    encode = json.JSONEncoder(separators=(',', ':')).encode
+
+    encoders = {
+        str: encode_basestring_ascii,
+        int: int.__repr__,
+        float: lambda instance: float.__repr__(instance) if math.isfinite(instance) else JSONEncodingVisitor.encode(instance),  # noqa: E501
+        bool: lambda instance: 'true' if instance else 'false',
+        type(None): lambda instance: 'null',
+    }
+
+    def __init__(self, instance, adaptive=False):
+        super().__init__(instance, adaptive)
+        self.buffer = []
+
+    def getvalue(self):
+        # Every value is followed by a separator, including the last one.
+        return ''.join(self.buffer)[:-1]
+
+    def sibling(self):
+        # Subschemas only validate the instance, the schema the instance is
+        # declared against serializes it.
+        visitor = copy(self)
+        visitor.buffer = None
+        return visitor
+
+    def emit(self):
+        buffer = self.buffer
+        if buffer is not None:
+            instance = self.instance
+            buffer.append(
+                self.encoders.get(instance.__class__, self.encode)(instance))
+            buffer.append(',')
+
+    def close(self, bracket):
+        buffer = self.buffer
+        if buffer is not None:
+            # Replace the separator following the last value, if any.
+            if buffer[-1] == ',':
+                buffer[-1] = bracket
+            else:
+                buffer.append(bracket)
+            buffer.append(',')
+
+    def visit_empty_schema(self, schema, *args):
+        self.emit()
+
+    def visit_enumeration(self, enumeration, *args):
+        ValidationVisitor.visit_enumeration(self, enumeration, *args)
+        self.emit()
+
+    def visit_boolean(self, boolean, *args):
+        ValidationVisitor.visit_boolean(self, boolean, *args)
+        self.emit()
+
+    def visit_null(self, null, *args):
+        ValidationVisitor.visit_null(self, null, *args)
+        self.emit()
+
+    def visit_numeric(self, numeric, *args):
+        ValidationVisitor.visit_numeric(self, numeric, *args)
+        self.emit()
+
+    def visit_string(self, string, *args):
+        ValidationVisitor.visit_string(self, string, *args)
+        self.emit()
+
+    def visit_array(self, array, *args):
+        if self.buffer is not None:
+            self.buffer.append('[')
+        ValidationVisitor.visit_array(self, array, *args)
+        self.close(']')
+
+    def visit_properties(self, properties, *args):
+        buffer = self.buffer
+        additionalProperties = args[0]
+        for name, member in self.instance.items():
+            if buffer is not None:
+                buffer.append(encode_basestring_ascii(name) + ':')
+            properties.get(name, additionalProperties).accept(
+                self.descend(member), *args)
+
+    def visit_members(self, obj, *args):
+        # Several schemas may apply to a member, so the members are only
+        # serialized once the object is validated.
+        ValidationVisitor.visit_members(self.sibling(), obj, *args)
+        buffer = self.buffer
+        if buffer is not None:
+            for name, member in self.instance.items():
+                buffer.append(encode_basestring_ascii(name) + ':')
+                self.descend(member).emit()
+
+    def visit_object(self, obj, *args):
+        if self.buffer is not None:
+            self.buffer.append('{')
+        ValidationVisitor.visit_object(self, obj, *args)
+        self.close('}')
+
+    def visit_union(self, union, *args):
+        ValidationVisitor.visit_union(self, union, *args)
+        self.emit()
+
+
 class ResolveVisitor:
 
-    def __init__(self, context):
+    """Resolve the references of a component tree parsed from the schema
+    ``context`` retrieved from ``uri``.
+
+    A reference is an URI relative to the base URI of the enclosing
+    schema, see "$id". It may refer to any value of the schema itself, of
+    a subschema identified by "$id" or "$anchor", or of another document
+    loaded through ``store``. The fragment is either a JSON Pointer or the
+    name of an anchor.
+
+    References to the same URI share the same value, so recursive schemas
+    resolve to cyclic trees. Patterns are compiled according to
+    ``patterns``, a ``PatternPolicy`` or the name of its action, and the
+    checker of each "format" is looked up in ``formats``, a
+    ``FormatRegistry``.
+    """
+
+    def __init__(self, context, uri='', store=None, patterns=None,
+                 formats=None):
         self.context = context
+        self.document = Document(context, uri)
+        self.store = STORE if store is None else store
+        self.components = {}
+        if not isinstance(patterns, PatternPolicy):
+            patterns = PatternPolicy() if patterns is None else PatternPolicy(patterns)  # noqa: E501
+        self.patterns = patterns
+        self.formats = FORMATS if formats is None else formats
+
+    def scope(self, primitive, *args):
+        """Return the base URI of the subschemas of ``primitive``, the base
+        URI of the enclosing schema being given as the first argument.
+        """
+        base = args[0] if args else self.document.uri
+        if primitive.id is not None:
+            base = urldefrag(urljoin(base, primitive.id))[0]
+        return base
+
+    def locate(self, uri):
+        """Return the schema ``uri`` refers to along with its base URI."""
+        document = self.document
+        if not document.declares(uri):
+            location = urldefrag(uri)[0]
+            document = (
+                self.store.identifiers.get(uri) or
+                self.store.identifiers.get(location) or
+                self.store.get(location))
+        return document.resolve(uri)
 
     def visit_empty_schema(self, schema, *args):  # pragma: no cover
         return schema
@@ -187,26 +562,31 @@ class ResolveVisitor:
     def visit_all_of(self, all_of, *args):
         for i, element in enumerate(all_of):
             # Resolve each member recursively.
-            element = self.visit_primitive(element, *args)
             all_of[i] = element.accept(self, *args)
-
-    def visit_any_of(self, any_of, *args):
-        for i, element in enumerate(any_of):
-            # Resolve each member recursively.
-            element = self.visit_primitive(element, *args)
-            any_of[i] = element.accept(self, *args)
-
-    def visit_one_of(self, one_of, *args):
-        for i, element in enumerate(one_of):
-            # Resolve each member recursively.
-            element = self.visit_primitive(element, *args)
-            one_of[i] = element.accept(self, *args)
+        return all_of
+
+    visit_any_of = visit_one_of = visit_array_list = visit_all_of
+
+    def visit_subschemas(self, primitive, base):
+        primitive.allOf.accept(self, base)
+        primitive.anyOf.accept(self, base)
+        primitive.oneOf.accept(self, base)
+        primitive.definitions.accept(self, base)
+        self.discriminate(primitive, base)
+
+    def discriminate(self, primitive, base):
+        for sequence in (primitive.anyOf, primitive.oneOf):
+            # Once the members are resolved, build the lookup table used to
+            # dispatch tagged unions to the matching member.
+            if sequence and sequence.discriminator is None:
+                if primitive.discriminator is not None:
+                    sequence.discriminator = Discriminator.unmarshal(
+                        primitive.discriminator, sequence, base)
+                else:
+                    sequence.discriminator = Discriminator.infer(sequence)
 
     def visit_primitive(self, primitive, *args):
-        primitive.allOf.accept(self, *args)
-        primitive.anyOf.accept(self, *args)
-        primitive.oneOf.accept(self, *args)
-        primitive.definitions.accept(self, *args)
+        self.visit_subschemas(primitive, self.scope(primitive, *args))
         return primitive
 
     def visit_boolean(self, boolean, *args):
@@ -222,46 +602,67 @@ class ResolveVisitor:
         return self.visit_primitive(integer, *args)
 
     def visit_string(self, string, *args):
+        if string.pattern and string.matcher is None:
+            string.matcher = self.patterns.compile(string.pattern)
+        if string.format and string.checker is None:
+            string.checker = self.formats.get(string.format)
         return self.visit_primitive(string, *args)
 
     def visit_array(self, array, *args):
-        array = self.visit_primitive(array, *args)
-        array.items = array.items.accept(self, *args)
-        array.additionalItems = array.additionalItems.accept(self, *args)
-        array.contains = array.contains.accept(self, *args)
+        base = self.scope(array, *args)
+        self.visit_subschemas(array, base)
+        array.items = array.items.accept(self, base)
+        array.additionalItems = array.additionalItems.accept(self, base)
+        array.contains = array.contains.accept(self, base)
         return array
 
-    def visit_array_list(self, array_list, *args):
-        for i, element in enumerate(array_list):
-            element = self.visit_primitive(element, *args)
-            array_list[i] = element.accept(self, *args)
-        return array_list
-
     def visit_properties(self, properties, *args):
         for name, member in properties.items():
             # Resolve each member recursively.
-            member = self.visit_primitive(member, *args)
             properties[name] = member.accept(self, *args)
 
-    def visit_definitions(self, definitions, *args):
-        for name, member in definitions.items():
-            # Resolve each member recursively.
-            member = self.visit_primitive(member, *args)
-            definitions[name] = member.accept(self, *args)
+    visit_definitions = visit_properties
+
+    def visit_pattern_properties(self, properties, *args):
+        self.visit_properties(properties, *args)
+        self.match(properties)
+
+    def match(self, properties):
+        if not properties.matchers:
+            properties.matchers = tuple(
+                (self.patterns.compile(pattern), pattern)
+                for pattern in properties)
+
+    def visit_dependencies(self, dependencies, *args):
+        for name, dependency in dependencies.items():
+            if dependency.__class__ is not frozenset:
+                dependencies[name] = dependency.accept(self, *args)
 
     def visit_object(self, obj, *args):
-        obj = self.visit_primitive(obj, *args)
-        obj.properties.accept(self, *args)
+        base = self.scope(obj, *args)
+        self.visit_subschemas(obj, base)
+        obj.properties.accept(self, base)
+        obj.patternProperties.accept(self, base)
+        obj.dependencies.accept(self, base)
+        obj.additionalProperties = obj.additionalProperties.accept(self, base)  # noqa: E501
+        obj.propertyNames = obj.propertyNames.accept(self, base)
         return obj
 
     def visit_reference(self, reference, *args):
         if reference.resolved:  # pragma: no cover
             return reference
-        definition = reference.address.split('/')[-1]
-        schema = self.context['definitions'][definition]
-        reference.value = Creator.create(schema.get('type')).unmarshal(schema)
-        # Resolve the value returned from the Creator.
-        reference.value.accept(self, *args)
+        # Other keywords of a reference, including "$id", are ignored.
+        base = args[0] if args else self.document.uri
+        uri = urljoin(base, reference.address)
+        component = self.components.get(uri)
+        if component is None:
+            schema, base = self.locate(uri)
+            component = Creator.create(schema.get('type')).unmarshal(schema)
+            # Register the value before resolving it, so references back to
+            # it terminate.
+            self.components[uri] = component
+            component.accept(self, base)
+        reference.value = component
         reference.resolved = True
         return reference
 
@@ -0,0 +1,86 @@
+"""Compare the validation of a batch of flat, wide clinical records record
+by record and column by column.
+
+    $ python benchmarks/batch.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from aptos import vectorized  # noqa: E402
+from aptos.batch import BatchValidator  # noqa: E402
+from aptos.parser import SchemaParser  # noqa: E402
+from aptos.validator import Validator  # noqa: E402
+
+RECORDS = 10000
+LABS = 100
+VITALS = 50
+CODES = 50
+
+SCHEMA = {
+    'type': 'object',
+    'required': ['mrn', 'encounter', 'sex'],
+    'properties': dict(
+        [('lab-%d' % i, {'type': 'number', 'minimum': 0, 'maximum': 1000}) for i in range(LABS)] +  # noqa: E501
+        [('vital-%d' % i, {'type': 'integer', 'minimum': 0, 'exclusiveMaximum': 300}) for i in range(VITALS)] +  # noqa: E501
+        [('code-%d' % i, {'type': 'string', 'maxLength': 8}) for i in range(CODES)] +  # noqa: E501
+        [
+            ('mrn', {'type': 'string', 'minLength': 8, 'maxLength': 8}),
+            ('encounter', {'type': 'integer', 'minimum': 1}),
+            ('sex', {'enum': ['F', 'M', 'U']}),
+        ]),
+}
+
+
+def generate(rng):
+    record = {
+        'mrn': '%08d' % rng.randrange(10 ** 8),
+        'encounter': rng.randrange(1, 10 ** 6),
+        'sex': rng.choice('FMU'),
+    }
+    for i in range(LABS):
+        record['lab-%d' % i] = rng.random() * 1000
+    for i in range(VITALS):
+        record['vital-%d' % i] = rng.randrange(300)
+    for i in range(CODES):
+        record['code-%d' % i] = 'C%d' % rng.randrange(10 ** 6)
+    return record
+
+
+def main():
+    rng = random.Random(0)
+    records = [generate(rng) for _ in range(RECORDS)]
+    # One record in a hundred has an out-of-range lab result.
+    for record in rng.sample(records, RECORDS // 100):
+        record['lab-%d' % rng.randrange(LABS)] = -1.0
+    component = SchemaParser.parse(SCHEMA)
+
+    validator = Validator(component)
+    invalid = [
+        index for index, record in enumerate(records)
+        if not validator.is_valid(record)]
+    record = min(timeit.repeat(
+        lambda: [validator.is_valid(record) for record in records],
+        number=1, repeat=3))
+
+    batch = BatchValidator(component)
+    report = batch.validate(records)
+    column = min(timeit.repeat(
+        lambda: batch.validate(records), number=1, repeat=3))
+
+    assert report.invalid == invalid
+    print('{} records of {} properties, NumPy {}'.format(
+        RECORDS, len(SCHEMA['properties']),
+        'installed' if vectorized.load() is not None else 'not installed'))
+    print('{:<20}{:>10}{:>18}'.format('mode', 'ms', 'records/s'))
+    for mode, seconds in (('record by record', record), ('column by column', column)):  # noqa: E501
+        print('{:<20}{:>10.0f}{:>18.0f}'.format(
+            mode, seconds * 1e3, RECORDS / seconds))
+    print('speedup {:.1f}x'.format(record / column))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Measure the overhead of validating instances within a ``Budget``.
+
+    $ python benchmarks/budget.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from aptos.budget import Budget  # noqa: E402
+from aptos.parser import SchemaParser  # noqa: E402
+from aptos.visitor import ValidationVisitor  # noqa: E402
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'id': {'type': 'integer', 'minimum': 0},
+        'name': {'type': 'string', 'maxLength': 64},
+        'readings': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'time': {'type': 'integer'},
+                    'value': {'type': 'number'},
+                    'unit': {'type': 'string'},
+                },
+            },
+        },
+    },
+    'required': ['id', 'name'],
+}
+
+RECORDS = [{
+    'id': i,
+    'name': 'record %d' % i,
+    'readings': [{'time': j, 'value': j * 0.5, 'unit': 'bpm'} for j in range(20)],  # noqa: E501
+} for i in range(200)]
+
+BUDGET = Budget(depth=32, nodes=100000, length=1 << 16, timeout=1.0)
+
+
+def main():
+    component = SchemaParser.parse(SCHEMA)
+
+    def unlimited():
+        for record in RECORDS:
+            component.accept(ValidationVisitor(record))
+
+    def limited():
+        for record in RECORDS:
+            component.accept(ValidationVisitor(record, budget=BUDGET))
+
+    results = []
+    for name, function in (('without budget', unlimited),
+                           ('with budget', limited)):
+        best = min(timeit.repeat(function, number=5, repeat=5)) / 5
+        results.append(best)
+        print('{:<24}{:>10.2f} us/record'.format(
+            name, best / len(RECORDS) * 1e6))
+    print('{:<24}{:>10.1%}'.format('overhead', results[1] / results[0] - 1))
+
+
+if __name__ == '__main__':
+    main()
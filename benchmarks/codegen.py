@@ -0,0 +1,79 @@
+"""Compare interpreted validation with the ``ValidationVisitor`` against
+the module generated by ``aptos codegen``.
+
+    $ python benchmarks/codegen.py
+"""
+import os
+import sys
+import timeit
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from aptos.codegen import CodeGenerationVisitor  # noqa: E402
+from aptos.parser import SchemaParser  # noqa: E402
+from aptos.visitor import ValidationVisitor  # noqa: E402
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'id': {'type': 'integer', 'minimum': 0},
+        'name': {'type': 'string', 'maxLength': 64, 'pattern': '^product'},
+        'price': {'type': 'number', 'minimum': 0},
+        'status': {'enum': ['draft', 'published', 'archived']},
+        'tags': {'type': 'array', 'items': {'type': 'string'}},
+        'dimensions': {
+            'allOf': [{
+                'type': 'object',
+                'properties': {
+                    'length': {'type': 'number'},
+                    'width': {'type': 'number'},
+                },
+                'required': ['length', 'width'],
+            }, {
+                'type': 'object',
+                'properties': {'height': {'type': 'number'}},
+            }],
+        },
+    },
+    'required': ['id', 'name', 'price'],
+}
+
+RECORDS = [{
+    'id': i,
+    'name': 'product %d' % i,
+    'price': i * 1.25,
+    'status': 'published',
+    'tags': ['home', 'green', 'door'],
+    'dimensions': {'length': 7.0, 'width': 12.0, 'height': 9.5},
+} for i in range(1000)]
+
+
+def main():
+    component = SchemaParser.parse(SCHEMA)
+    module = types.ModuleType('validator')
+    source = CodeGenerationVisitor().generate(
+        SchemaParser.parse(SCHEMA, optimize=True))
+    exec(compile(source, 'validator.py', 'exec'), module.__dict__)
+
+    def interpreted():
+        for record in RECORDS:
+            component.accept(ValidationVisitor(record))
+
+    def generated():
+        validate = module.validate
+        for record in RECORDS:
+            validate(record)
+
+    results = []
+    for name, function in (('ValidationVisitor', interpreted),
+                           ('generated module', generated)):
+        best = min(timeit.repeat(function, number=5, repeat=5)) / 5
+        results.append(best)
+        print('{:<24}{:>10.2f} us/record'.format(
+            name, best / len(RECORDS) * 1e6))
+    print('{:<24}{:>10.2f}x'.format('speedup', results[0] / results[1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Measure validation of polymorphic events against an "anyOf" with many
+members, in declaration order, with adaptive member ordering and with
+discriminator-based dispatch.
+
+    $ python benchmarks/composition.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from aptos.parser import SchemaParser  # noqa: E402
+from aptos.visitor import ValidationVisitor  # noqa: E402
+
+BRANCHES = 24
+
+SCHEMA = {
+    'type': 'object',
+    'anyOf': [{
+        'type': 'object',
+        'properties': {
+            'eventType': {'type': 'string', 'enum': ['event%d' % i]},
+            'timestamp': {'type': 'integer', 'minimum': 0},
+            'payload': {
+                'type': 'object',
+                'properties': {'value%d' % i: {'type': 'number'}},
+                'required': ['value%d' % i],
+            },
+        },
+        'required': ['eventType', 'timestamp', 'payload'],
+    } for i in range(BRANCHES)],
+}
+
+# Most events are of the last declared types.
+EVENTS = [{
+    'eventType': 'event%d' % (BRANCHES - 1 - i % 3),
+    'timestamp': i,
+    'payload': {'value%d' % (BRANCHES - 1 - i % 3): 1.0},
+} for i in range(300)]
+
+
+def main():
+    component = SchemaParser.parse(SCHEMA)
+    undiscriminated = SchemaParser.parse(SCHEMA, freeze=False)
+    undiscriminated.anyOf.discriminator = None
+
+    def ordered():
+        for event in EVENTS:
+            undiscriminated.accept(ValidationVisitor(event))
+
+    def adaptive():
+        for event in EVENTS:
+            undiscriminated.accept(ValidationVisitor(event, adaptive=True))
+
+    def dispatched():
+        for event in EVENTS:
+            component.accept(ValidationVisitor(event))
+
+    for name, function in (('declaration order', ordered),
+                           ('adaptive order', adaptive),
+                           ('discriminator', dispatched)):
+        best = min(timeit.repeat(function, number=5, repeat=5)) / 5
+        print('{:<24}{:>10.2f} us/event'.format(
+            name, best / len(EVENTS) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
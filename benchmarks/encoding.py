@@ -0,0 +1,77 @@
+"""Compare validating and serializing records in two passes against the
+fused ``JSONEncodingVisitor``.
+
+    $ python benchmarks/encoding.py
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from aptos.parser import SchemaParser  # noqa: E402
+from aptos.visitor import JSONEncodingVisitor, ValidationVisitor  # noqa: E402,E501
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'id': {'type': 'integer', 'minimum': 0},
+        'name': {'type': 'string', 'maxLength': 64},
+        'price': {'type': 'number', 'minimum': 0},
+        'tags': {'type': 'array', 'items': {'type': 'string'}},
+        'dimensions': {
+            'type': 'object',
+            'properties': {
+                'length': {'type': 'number'},
+                'width': {'type': 'number'},
+                'height': {'type': 'number'},
+            },
+            'required': ['length', 'width', 'height'],
+        },
+    },
+    'required': ['id', 'name', 'price'],
+}
+
+RECORDS = [{
+    'id': i,
+    'name': 'product %d' % i,
+    'price': i * 1.25,
+    'tags': ['home', 'green', 'door'],
+    'dimensions': {'length': 7.0, 'width': 12.0, 'height': 9.5},
+} for i in range(1000)]
+
+
+def main():
+    component = SchemaParser.parse(SCHEMA)
+    dumps = json.JSONEncoder(separators=(',', ':')).encode
+
+    def validate():
+        for record in RECORDS:
+            component.accept(ValidationVisitor(record))
+
+    def serialize():
+        for record in RECORDS:
+            dumps(record)
+
+    def separate():
+        for record in RECORDS:
+            component.accept(ValidationVisitor(record))
+            dumps(record)
+
+    def fused():
+        for record in RECORDS:
+            visitor = JSONEncodingVisitor(record)
+            component.accept(visitor)
+            visitor.getvalue()
+
+    for name, function in (('validate', validate), ('serialize', serialize),
+                           ('validate + serialize', separate),
+                           ('fused', fused)):
+        best = min(timeit.repeat(function, number=5, repeat=5)) / 5
+        print('{:<24}{:>10.2f} us/record'.format(
+            name, best / len(RECORDS) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
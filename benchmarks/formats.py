@@ -0,0 +1,101 @@
+"""Compare the throughput of the built-in format checkers and of the
+regular expressions commonly used instead, on bulk inputs mixing valid
+and invalid strings.
+
+"second pass" looks the regular expression of the format up by name and
+matches it with ``re.match`` for every string, like validators checking
+formats after validating the rest of the document. "compiled" matches
+the compiled regular expression directly, the lower bound of any check
+written in Python.
+
+    $ python benchmarks/formats.py
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from aptos.formats import FORMATS  # noqa: E402
+
+COUNT = 100000
+
+# Regular expressions equivalent to the checkers, as found in validators
+# which check formats in a separate pass.
+PATTERNS = {
+    'date-time': '^\\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\\d|3[01])[Tt]([01]\\d|2[0-3]):[0-5]\\d:([0-5]\\d|60)(\\.\\d+)?([Zz]|[+-]([01]\\d|2[0-3]):[0-5]\\d)$',  # noqa: E501
+    'date': '^\\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\\d|3[01])$',
+    'email': "^[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(\\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*@([A-Za-z0-9]([A-Za-z0-9-]{0,61}[A-Za-z0-9])?\\.)*[A-Za-z0-9]([A-Za-z0-9-]{0,61}[A-Za-z0-9])?$",  # noqa: E501
+    'uuid': '^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$',  # noqa: E501
+    'ipv4': '^((25[0-5]|2[0-4]\\d|1\\d\\d|[1-9]?\\d)\\.){3}(25[0-5]|2[0-4]\\d|1\\d\\d|[1-9]?\\d)$',  # noqa: E501
+    'ipv6': '^(([0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}|([0-9a-fA-F]{1,4}:){1,7}:|([0-9a-fA-F]{1,4}:){1,6}:[0-9a-fA-F]{1,4}|([0-9a-fA-F]{1,4}:){1,5}(:[0-9a-fA-F]{1,4}){1,2}|([0-9a-fA-F]{1,4}:){1,4}(:[0-9a-fA-F]{1,4}){1,3}|([0-9a-fA-F]{1,4}:){1,3}(:[0-9a-fA-F]{1,4}){1,4}|([0-9a-fA-F]{1,4}:){1,2}(:[0-9a-fA-F]{1,4}){1,5}|[0-9a-fA-F]{1,4}:(:[0-9a-fA-F]{1,4}){1,6}|:((:[0-9a-fA-F]{1,4}){1,7}|:))$',  # noqa: E501
+    'uri': "^[A-Za-z][A-Za-z0-9+.-]*:([A-Za-z0-9._~:/?\\[\\]@!$&'()*+,;=-]|%[0-9a-fA-F]{2})*(#([A-Za-z0-9._~:/?\\[\\]@!$&'()*+,;=-]|%[0-9a-fA-F]{2})*)?$",  # noqa: E501
+    'hostname': '^(?=.{1,253}\\.?$)([A-Za-z0-9]([A-Za-z0-9-]{0,61}[A-Za-z0-9])?\\.)*[A-Za-z0-9]([A-Za-z0-9-]{0,61}[A-Za-z0-9])?\\.?$',  # noqa: E501
+}
+
+
+def generate(name, rng):
+    if name == 'date-time':
+        return '20{:02}-{:02}-{:02}T{:02}:{:02}:{:02}.{}Z'.format(
+            rng.randrange(100), rng.randrange(1, 13), rng.randrange(1, 29),
+            rng.randrange(24), rng.randrange(60), rng.randrange(60),
+            rng.randrange(1000))
+    if name == 'date':
+        return '20{:02}-{:02}-{:02}'.format(
+            rng.randrange(100), rng.randrange(1, 13), rng.randrange(1, 29))
+    if name == 'email':
+        return 'user.{}@mail{}.example.com'.format(
+            rng.randrange(10 ** 6), rng.randrange(100))
+    if name == 'uuid':
+        value = '{:032x}'.format(rng.getrandbits(128))
+        return '-'.join((value[:8], value[8:12], value[12:16], value[16:20], value[20:]))  # noqa: E501
+    if name == 'ipv4':
+        return '.'.join(str(rng.randrange(256)) for _ in range(4))
+    if name == 'ipv6':
+        return '2001:db8::{:x}:{:x}'.format(
+            rng.randrange(1 << 16), rng.randrange(1 << 16))
+    if name == 'uri':
+        return 'https://example.com/items/{}?page={}#top'.format(
+            rng.randrange(10 ** 6), rng.randrange(100))
+    if name == 'hostname':
+        return 'host-{}.region{}.example.com'.format(
+            rng.randrange(10 ** 6), rng.randrange(10))
+
+
+def corrupt(value, rng):
+    index = rng.randrange(len(value))
+    return value[:index] + rng.choice(' _:/.-x9') + value[index + 1:]
+
+
+def measure(function, values):
+    start = time.perf_counter()
+    for value in values:
+        function(value)
+    return time.perf_counter() - start
+
+
+def main():
+    rng = random.Random(0)
+    print('{:<12}{:>14}{:>14}{:>14}{:>10}'.format(
+        'format', 'second pass', 'compiled', 'aptos', 'agree'))
+    for name, pattern in PATTERNS.items():
+        values = [generate(name, rng) for _ in range(COUNT)]
+        # One value in ten is corrupted.
+        values = [
+            corrupt(value, rng) if rng.random() < 0.1 else value
+            for value in values]
+        match = re.compile(pattern).match
+        checker = FORMATS.get(name)
+        agree = sum(
+            (match(value) is not None) == checker(value) for value in values)
+        second = measure(lambda value: re.match(PATTERNS[name], value), values)  # noqa: E501
+        compiled = measure(match, values)
+        aptos = measure(checker, values)
+        print('{:<12}{:>11.1f} ms{:>11.1f} ms{:>11.1f} ms{:>9.2%}'.format(
+            name, second * 1e3, compiled * 1e3, aptos * 1e3, agree / COUNT))
+
+
+if __name__ == '__main__':
+    main()
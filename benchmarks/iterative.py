@@ -0,0 +1,124 @@
+"""Compare the recursive visitors with the iterative engines driven by an
+explicit stack, validating flat records and nested trees of increasing
+depth, and resolving a long chain of definitions. The recursive visitors
+raise a RecursionError beyond a few hundred levels.
+
+    $ python benchmarks/iterative.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from aptos.iterative import (  # noqa: E402
+    IterativeResolveVisitor, IterativeValidationVisitor)
+from aptos.parser import SchemaParser  # noqa: E402
+from aptos.primitive import Creator  # noqa: E402
+from aptos.visitor import ResolveVisitor, ValidationVisitor  # noqa: E402
+
+DEPTHS = (10, 100, 1000, 10000)
+
+RECORD = {
+    'type': 'object',
+    'required': ['id', 'name'],
+    'properties': {
+        'id': {'type': 'integer', 'minimum': 1},
+        'name': {'type': 'string', 'maxLength': 64},
+        'tags': {'type': 'array', 'items': {'type': 'string'}},
+        'address': {
+            'type': 'object',
+            'properties': {
+                'city': {'type': 'string'},
+                'zip': {'type': 'string', 'pattern': '^[0-9]{5}$'},
+            },
+        },
+        'status': {'anyOf': [{'type': 'null'}, {'enum': ['active', 'closed']}]},  # noqa: E501
+    },
+}
+
+# An element of a FHIR-like resource, nesting extensions in extensions.
+TREE = {
+    'definitions': {
+        'extension': {
+            'type': 'object',
+            'required': ['url'],
+            'properties': {
+                'url': {'type': 'string'},
+                'valueString': {'type': 'string'},
+                'extension': {
+                    'type': 'array',
+                    'items': {'$ref': '#/definitions/extension'},
+                },
+            },
+        },
+    },
+    '$ref': '#/definitions/extension',
+}
+
+
+def nest(depth):
+    instance = {'url': 'leaf', 'valueString': 'a'}
+    for i in range(depth):
+        instance = {'url': 'node', 'extension': [instance, {'url': 'x'}]}
+    return instance
+
+
+def measure(function, number):
+    try:
+        return min(timeit.repeat(function, number=number, repeat=3)) / number  # noqa: E501
+    except RecursionError:
+        return None
+
+
+def row(name, recursive, iterative):
+    print('{:<28}{:>14}{:>14}{:>10}'.format(
+        name,
+        'RecursionError' if recursive is None else '{:.3f} ms'.format(recursive * 1e3),  # noqa: E501
+        '{:.3f} ms'.format(iterative * 1e3),
+        '' if recursive is None else '{:.2f}x'.format(recursive / iterative)))  # noqa: E501
+
+
+def main():
+    print('{:<28}{:>14}{:>14}{:>10}'.format(
+        'validation', 'recursive', 'iterative', 'ratio'))
+    component = SchemaParser.parse(RECORD)
+    records = [{
+        'id': i, 'name': 'name-%d' % i, 'tags': ['a', 'b'],
+        'address': {'city': 'Philadelphia', 'zip': '19104'},
+        'status': 'active'} for i in range(1, 1001)]
+    row('1000 flat records', *(
+        measure(lambda: [component.accept(visitor(record)) for record in records], 10)  # noqa: E501
+        for visitor in (ValidationVisitor, IterativeValidationVisitor)))
+    component = SchemaParser.parse(TREE)
+    for depth in DEPTHS:
+        instance = nest(depth)
+        number = max(1, 10000 // depth)
+        row('tree of depth {}'.format(depth), *(
+            measure(lambda: component.accept(visitor(instance)), number)
+            for visitor in (ValidationVisitor, IterativeValidationVisitor)))
+
+    print('\n{:<28}{:>14}{:>14}{:>10}'.format(
+        'resolution', 'recursive', 'iterative', 'ratio'))
+    for length in (10, 100, 1000):
+        schema = {'definitions': {}, '$ref': '#/definitions/d0'}
+        for i in range(length):
+            schema['definitions']['d%d' % i] = {
+                'type': 'object',
+                'properties': {
+                    'value': {'type': 'string'},
+                    'next': {'$ref': '#/definitions/d%d' % (i + 1)},
+                },
+            }
+        schema['definitions']['d%d' % length] = {'type': 'integer'}
+        components = [
+            Creator.create(None).unmarshal(schema) for _ in range(6)]
+        recursive = measure(
+            lambda: components.pop().accept(ResolveVisitor(schema)), 1)
+        iterative = measure(
+            lambda: IterativeResolveVisitor(schema).resolve(components.pop()), 1)  # noqa: E501
+        row('chain of {} references'.format(length), recursive, iterative)
+
+
+if __name__ == '__main__':
+    main()
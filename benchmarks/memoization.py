@@ -0,0 +1,84 @@
+"""Compare validation of a batch repeating the same sub-documents with
+and without a ``ValidationCache``.
+
+    $ python benchmarks/memoization.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from aptos.cache import ValidationCache  # noqa: E402
+from aptos.parser import SchemaParser  # noqa: E402
+from aptos.visitor import ValidationVisitor  # noqa: E402
+
+SCHEMA = {
+    'definitions': {
+        'address': {
+            'type': 'object',
+            'properties': {
+                'street': {'type': 'string', 'maxLength': 64},
+                'city': {'type': 'string'},
+                'zip': {'type': 'string', 'pattern': '^[0-9]{5}$'},
+            },
+            'required': ['street', 'city', 'zip'],
+        },
+        'provider': {
+            'type': 'object',
+            'properties': {
+                'npi': {'type': 'string', 'pattern': '^[0-9]{10}$'},
+                'name': {'type': 'string'},
+                'address': {'$ref': '#/definitions/address'},
+                'specialties': {'type': 'array', 'items': {'type': 'string'}},
+            },
+            'required': ['npi', 'name'],
+        },
+    },
+    'type': 'object',
+    'properties': {
+        'id': {'type': 'integer'},
+        'provider': {'$ref': '#/definitions/provider'},
+        'address': {'$ref': '#/definitions/address'},
+    },
+}
+
+PROVIDERS = [{
+    'npi': '%010d' % i,
+    'name': 'provider %d' % i,
+    'address': {'street': '%d Spruce St' % i, 'city': 'Philadelphia', 'zip': '19104'},  # noqa: E501
+    'specialties': ['cardiology', 'internal medicine'],
+} for i in range(10)]
+
+RECORDS = [{
+    'id': i,
+    'provider': PROVIDERS[i % len(PROVIDERS)],
+    'address': PROVIDERS[i % 7]['address'],
+} for i in range(1000)]
+
+
+def main():
+    component = SchemaParser.parse(SCHEMA)
+    cache = ValidationCache()
+
+    def uncached():
+        for record in RECORDS:
+            component.accept(ValidationVisitor(record))
+
+    def cached():
+        for record in RECORDS:
+            component.accept(ValidationVisitor(record, cache=cache))
+
+    results = []
+    for name, function in (('without cache', uncached),
+                           ('with cache', cached)):
+        best = min(timeit.repeat(function, number=5, repeat=5)) / 5
+        results.append(best)
+        print('{:<24}{:>10.2f} us/record'.format(
+            name, best / len(RECORDS) * 1e6))
+    print('{:<24}{:>10.2f}x'.format('speedup', results[0] / results[1]))
+    print('{:<24}{:>10.1%}'.format('hit rate', cache.hit_rate))
+
+
+if __name__ == '__main__':
+    main()
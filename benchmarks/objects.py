@@ -0,0 +1,50 @@
+"""Measure the cost of the keywords applying to the members of a wide
+object, a 5000-member record of lab results, validated in a single pass
+over its members.
+
+    $ python benchmarks/objects.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from aptos.parser import SchemaParser  # noqa: E402
+from aptos.visitor import ValidationVisitor  # noqa: E402
+
+WIDTH = 5000
+
+INSTANCE = dict(
+    [('lab-%d' % i, i % 97) for i in range(WIDTH)] +
+    [('id', 1), ('card', 'a'), ('zip', 'b')])
+
+BASE = {
+    'type': 'object',
+    'properties': {'id': {'type': 'integer'}},
+    'additionalProperties': {'type': ['integer', 'string']},
+}
+
+KEYWORDS = [
+    ('properties', {}),
+    ('required', {'required': ['id'] + ['lab-%d' % i for i in range(0, WIDTH, 10)]}),  # noqa: E501
+    ('dependencies', {'dependencies': {'card': ['zip', 'id']}}),
+    ('propertyNames', {'propertyNames': {'type': 'string', 'maxLength': 16}}),  # noqa: E501
+    ('patternProperties', {'patternProperties': {'^lab-': {'type': 'integer', 'minimum': 0}}}),  # noqa: E501
+]
+
+
+def main():
+    print('{:<20}{:>12}{:>18}'.format('keyword', 'ms/object', 'ns/member'))
+    for name, keywords in KEYWORDS:
+        component = SchemaParser.parse(dict(BASE, **keywords))
+        number = 10
+        seconds = min(timeit.repeat(
+            lambda: component.accept(ValidationVisitor(INSTANCE)),
+            number=number, repeat=5)) / number
+        print('{:<20}{:>12.2f}{:>18.0f}'.format(
+            name, seconds * 1e3, seconds * 1e9 / len(INSTANCE)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Compare validating a large document after each JSON Patch against
+revalidating the values each patch modified.
+
+    $ python benchmarks/patch.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from aptos.parser import SchemaParser  # noqa: E402
+from aptos.patch import IncrementalValidator, Patch  # noqa: E402
+from aptos.visitor import ValidationVisitor  # noqa: E402
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'id': {'type': 'integer'},
+        'lines': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'code': {'type': 'string', 'pattern': '^[A-Z][0-9]{2}'},
+                    'quantity': {'type': 'integer', 'minimum': 1},
+                },
+                'required': ['code', 'quantity'],
+            },
+            'maxItems': 100000,
+        },
+    },
+    'required': ['id', 'lines'],
+}
+
+DOCUMENT = {
+    'id': 1,
+    'lines': [{'code': 'A%02d' % (i % 100), 'quantity': i + 1} for i in range(10000)],  # noqa: E501
+}
+
+PATCH = [{'op': 'replace', 'path': '/lines/5000/quantity', 'value': 7}]
+
+
+def main():
+    component = SchemaParser.parse(SCHEMA)
+    validator = IncrementalValidator(component, DOCUMENT, valid=True)
+
+    def full():
+        document = Patch(PATCH).apply(DOCUMENT).document
+        component.accept(ValidationVisitor(document))
+
+    def incremental():
+        validator.apply(PATCH)
+
+    results = []
+    for name, function in (('whole document', full),
+                           ('incremental', incremental)):
+        best = min(timeit.repeat(function, number=10, repeat=5)) / 10
+        results.append(best)
+        print('{:<24}{:>10.2f} us/patch'.format(name, best * 1e6))
+    print('{:<24}{:>10.2f}x'.format('speedup', results[0] / results[1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Compare the latency of ``re`` and of the linear matcher on patterns
+which backtrack catastrophically.
+
+    $ python benchmarks/regex.py
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from aptos.regex import Program, analyze  # noqa: E402
+
+CASES = [
+    # Exponential backtracking.
+    ('^(a+)+$', lambda n: 'a' * n + '!', (16, 20, 22, 24)),
+    ('^(\\w+\\s?)*$', lambda n: 'a' * n + '!', (16, 20, 22, 24)),
+    # Polynomial backtracking.
+    ('^\\d+\\s*\\d+$', lambda n: '1' * n + 'x', (1000, 4000, 16000)),
+]
+
+
+def measure(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    for pattern, string, sizes in CASES:
+        print('{} ({})'.format(pattern, '; '.join(analyze(pattern))))
+        compiled = re.compile(pattern)
+        program = Program(pattern)
+        for size in sizes:
+            instance = string(size)
+            print('  {:>6} characters  re {:>10.2f} ms  linear {:>8.2f} ms'.format(  # noqa: E501
+                size,
+                measure(lambda: compiled.match(instance)) * 1e3,
+                measure(lambda: program.match(instance)) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
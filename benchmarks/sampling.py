@@ -0,0 +1,61 @@
+"""Compare validating every element of a long time series against
+validating a sample of its elements.
+
+    $ python benchmarks/sampling.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from aptos.parser import SchemaParser  # noqa: E402
+from aptos.sampling import SamplingPolicy  # noqa: E402
+from aptos.visitor import ValidationVisitor  # noqa: E402
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'vitals': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'time': {'type': 'integer', 'minimum': 0},
+                    'heartRate': {'type': 'integer', 'minimum': 0, 'maximum': 300},  # noqa: E501
+                },
+                'required': ['time', 'heartRate'],
+            },
+        },
+    },
+}
+
+INSTANCE = {
+    'vitals': [{'time': i, 'heartRate': 60 + i % 40} for i in range(200000)],
+}
+
+
+def main():
+    component = SchemaParser.parse(SCHEMA)
+    policy = SamplingPolicy(rate=0.01, minimum=1000)
+
+    def exhaustive():
+        component.accept(ValidationVisitor(INSTANCE))
+
+    def sampled():
+        component.accept(ValidationVisitor(INSTANCE, sampling=policy))
+
+    results = []
+    for name, function in (('every element', exhaustive),
+                           ('sampled', sampled)):
+        best = min(timeit.repeat(function, number=1, repeat=3))
+        results.append(best)
+        print('{:<24}{:>10.2f} ms'.format(name, best * 1e3))
+    print('{:<24}{:>10.2f}x'.format('speedup', results[0] / results[1]))
+    visitor = ValidationVisitor(INSTANCE, sampling=policy)
+    component.accept(visitor)
+    print('{:<24}{:>10.4f}'.format('confidence', visitor.report.confidence))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Compare reading a single column of an NDJSON export, by parsing every
+record, with memory-mapping the column shredded by ``ColumnWriter``.
+
+    $ python benchmarks/shred.py
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from aptos.parser import SchemaParser  # noqa: E402
+from aptos.shred import ColumnWriter, load, numpy  # noqa: E402
+
+RECORDS = 100000
+
+SCHEMA = {
+    'type': 'object',
+    'required': ['mrn', 'encounter'],
+    'properties': {
+        'mrn': {'type': 'string'},
+        'encounter': {'type': 'integer'},
+        'vitals': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'required': ['name', 'value'],
+                'properties': {
+                    'name': {'type': 'string'},
+                    'value': {'type': 'number'},
+                    'unit': {'type': ['string', 'null']},
+                },
+            },
+        },
+    },
+}
+
+
+def generate(rng):
+    return {
+        'mrn': '%08d' % rng.randrange(10 ** 8),
+        'encounter': rng.randrange(10 ** 6),
+        'vitals': [
+            {'name': name, 'value': rng.random() * 100, 'unit': None}
+            for name in ('hr', 'rr', 'spo2', 'temp')[:rng.randrange(5)]],
+    }
+
+
+def main():
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'records.ndjson')
+        with open(path, 'w') as fp:
+            for _ in range(RECORDS):
+                fp.write(json.dumps(generate(rng)) + '\n')
+
+        component = SchemaParser.parse(SCHEMA)
+        output = os.path.join(directory, 'columns')
+        start = time.perf_counter()
+        with open(path) as fp, ColumnWriter(component, output, visitor=None) as writer:  # noqa: E501
+            for line in fp:
+                writer.append(json.loads(line))
+        shredding = time.perf_counter() - start
+
+        # The mean of every vital sign.
+        start = time.perf_counter()
+        total = count = 0
+        with open(path) as fp:
+            for line in fp:
+                for vital in json.loads(line)['vitals']:
+                    total += vital['value']
+                    count += 1
+        parsed = time.perf_counter() - start
+        expected = total / count
+
+        start = time.perf_counter()
+        values = load(output, 'vitals.value')['values']
+        mean = values.mean() if numpy is not None else sum(values) / len(values)  # noqa: E501
+        mapped = time.perf_counter() - start
+        assert abs(mean - expected) < 1e-6 * abs(expected)
+
+    print('{} records, NumPy {}'.format(
+        RECORDS, 'installed' if numpy is not None else 'not installed'))
+    print('{:<34}{:>10.1f} ms'.format('shredding', shredding * 1e3))
+    print('{:<34}{:>10.1f} ms'.format('mean of a column, parsing NDJSON', parsed * 1e3))  # noqa: E501
+    print('{:<34}{:>10.1f} ms'.format('mean of a column, memory-mapped', mapped * 1e3))  # noqa: E501
+    print('speedup {:.0f}x'.format(parsed / mapped))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Measure the throughput of a single ``Validator`` shared by an
+increasing number of threads.
+
+Threads only scale on a free-threaded build of CPython, e.g. 3.13t run
+with ``PYTHON_GIL=0``; with the GIL the throughput stays flat.
+
+    $ python benchmarks/threads.py
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from aptos.parser import SchemaParser  # noqa: E402
+from aptos.validator import Validator  # noqa: E402
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'id': {'type': 'integer', 'minimum': 0},
+        'name': {'type': 'string', 'maxLength': 64, 'pattern': '^product'},
+        'price': {'type': 'number', 'minimum': 0},
+        'status': {'enum': ['draft', 'published', 'archived']},
+        'tags': {'type': 'array', 'items': {'type': 'string'}},
+    },
+    'required': ['id', 'name', 'price'],
+}
+
+RECORDS = [{
+    'id': i,
+    'name': 'product %d' % i,
+    'price': i * 1.25,
+    'status': 'published',
+    'tags': ['home', 'green', 'door'],
+} for i in range(1000)]
+
+ROUNDS = 20
+
+
+def run(validator, count):
+    barrier = threading.Barrier(count + 1)
+
+    def work():
+        barrier.wait()
+        for _ in range(ROUNDS):
+            for record in RECORDS:
+                validator.validate(record)
+
+    threads = [threading.Thread(target=work) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return count * ROUNDS * len(RECORDS) / (time.perf_counter() - start)
+
+
+def main():
+    validator = Validator(SchemaParser.parse(SCHEMA))
+    enabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print('GIL {}'.format('enabled' if enabled else 'disabled'))
+    single = None
+    for count in (1, 2, 4, 8):
+        throughput = run(validator, count)
+        single = single or throughput
+        print('{:>2} threads{:>12.0f} records/s{:>8.2f}x'.format(
+            count, throughput, throughput / single))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Compare the validation of arrays of numbers one element at a time and
+with NumPy, by length of the array, for lists and ndarrays of samples of
+a waveform.
+
+    $ python benchmarks/vectorized.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from aptos import vectorized  # noqa: E402
+from aptos.parser import SchemaParser  # noqa: E402
+from aptos.visitor import ValidationVisitor  # noqa: E402
+
+LENGTHS = (16, 64, 256, 1024, 10 ** 4, 10 ** 5, 10 ** 6)
+
+SCHEMA = {
+    'type': 'array',
+    'items': {
+        'type': 'number',
+        'minimum': -10.0,
+        'exclusiveMaximum': 10.0,
+        'multipleOf': 0.125,
+    },
+}
+
+
+class ScalarValidationVisitor(ValidationVisitor):
+
+    vectorize = None
+
+
+class VectorizedValidationVisitor(ValidationVisitor):
+
+    vectorize = 0
+
+
+def measure(visitor, component, instance):
+    number = max(1, 10 ** 5 // len(instance))
+    return min(timeit.repeat(
+        lambda: component.accept(visitor(instance)),
+        number=number, repeat=3)) / number
+
+
+def main():
+    if vectorized.load() is None:
+        print('NumPy is not installed, arrays are validated one element at a time')  # noqa: E501
+        return
+    component = SchemaParser.parse(SCHEMA)
+    print('{:>10}{:>14}{:>14}{:>10}{:>14}{:>10}'.format(
+        'length', 'scalar', 'list', 'speedup', 'ndarray', 'speedup'))
+    for length in LENGTHS:
+        instance = [(i % 160 - 80) / 8 for i in range(length)]
+        scalar = measure(ScalarValidationVisitor, component, instance)
+        lists = measure(VectorizedValidationVisitor, component, instance)
+        arrays = measure(
+            VectorizedValidationVisitor, component,
+            vectorized.load().array(instance))
+        print('{:>10}{:>11.3f} ms{:>11.3f} ms{:>9.1f}x{:>11.3f} ms{:>9.1f}x'.format(  # noqa: E501
+            length, scalar * 1e3, lists * 1e3, scalar / lists,
+            arrays * 1e3, scalar / arrays))
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,9 @@ setup(
         'colorama',
         'termcolor',
     ],
+    extras_require={
+        'numpy': ['numpy'],
+    },
     name='aptos',
     version='1.0.2',
     url='https://github.com/pennsignals/aptos',
@@ -0,0 +1,74 @@
+import io
+import json
+import os
+import unittest
+
+from aptos.parser import SchemaParser
+from aptos.schema.avro import (
+    MAGIC, BinaryDecoder, BinaryEncoder, DataFileReader, DataFileWriter)
+from aptos.schema.visitor import AvroSchemaVisitor
+
+BASE_DIR = os.path.dirname(__file__)
+
+
+class BinaryEncodingTestCase(unittest.TestCase):
+
+    def runTest(self):
+        encoder = BinaryEncoder('long')
+        # http://avro.apache.org/docs/current/spec.html#binary_encoding
+        for value, expected in ((0, b'\x00'), (-1, b'\x01'), (1, b'\x02'), (-64, b'\x7f'), (64, b'\x80\x01')):  # noqa: E501
+            self.assertEqual(encoder.encode(value), expected)
+        self.assertEqual(BinaryEncoder('string').encode('foo'), b'\x06foo')
+
+        schema = {
+            'type': 'record', 'name': 'Test', 'fields': [
+                {'name': 'a', 'type': 'long'},
+                {'name': 'b', 'type': ['string', 'null']},
+                {'name': 'c', 'type': {'type': 'array', 'items': 'double'}},
+                {'name': 'd', 'type': {
+                    'type': 'enum', 'name': 'Color',
+                    'symbols': ['red', 'green']}},
+            ]}
+        datum = {'a': 27, 'b': None, 'c': [1.5, -2.0], 'd': 'green'}
+        data = BinaryEncoder(schema).encode(datum)
+        self.assertEqual(BinaryDecoder(schema).decode(data), datum)
+
+        with self.assertRaises(ValueError):
+            BinaryEncoder(schema).encode({'a': 27})
+        with self.assertRaises(ValueError):
+            BinaryEncoder(schema).encode(dict(datum, d='blue'))
+
+
+class DataFileTestCase(unittest.TestCase):
+
+    def runTest(self):
+        with open(os.path.join(BASE_DIR, 'schema', 'inventory')) as fp:
+            schema = json.load(fp)
+        record = SchemaParser.parse(schema).accept(AvroSchemaVisitor())
+        records = [{
+            'required': bool(i % 2), 'id': i, 'country': 'US',
+            'units': [1.0, 2.2], 'comments': None if i % 3 else 'fragile',
+        } for i in range(1000)]
+
+        for codec in ('null', 'deflate'):
+            fp = io.BytesIO()
+            with DataFileWriter(fp, record, codec, block_size=1024) as writer:
+                for element in records:
+                    writer.append(element)
+            data = fp.getvalue()
+            self.assertTrue(data.startswith(MAGIC))
+            fp.seek(0)
+            reader = DataFileReader(fp)
+            self.assertEqual(reader.codec, codec)
+            self.assertEqual(list(reader), records)
+            # Multiple blocks are separated by the sync marker.
+            self.assertGreater(data.count(reader.sync), 2)
+
+        fp = io.BytesIO()
+        with DataFileWriter(fp, record) as writer:
+            writer.append(records[0])
+            with self.assertRaises(ValueError):
+                writer.append({'id': 'one'})
+            writer.append(records[1])
+        fp.seek(0)
+        self.assertEqual(list(DataFileReader(fp)), records[:2])
@@ -0,0 +1,119 @@
+import unittest
+
+from aptos import vectorized
+from aptos.batch import BatchValidator
+from aptos.budget import Budget, BudgetExceededError
+from aptos.parser import SchemaParser
+from aptos.visitor import ValidationVisitor
+
+
+def is_valid(component, instance):
+    try:
+        component.accept(ValidationVisitor(instance))
+    except AssertionError:
+        return False
+    return True
+
+
+class BatchEquivalenceTestCase(unittest.TestCase):
+
+    schema = {
+        'type': 'object',
+        'required': ['id', 'name'],
+        'properties': {
+            'id': {'type': 'integer', 'minimum': 1, 'multipleOf': 1},
+            'name': {'type': 'string', 'minLength': 1, 'maxLength': 8, 'pattern': '^[a-z]'},  # noqa: E501
+            'weight': {'type': 'number', 'exclusiveMinimum': 0, 'maximum': 500},  # noqa: E501
+            'email': {'type': 'string', 'format': 'email'},
+            'status': {'enum': ['active', 'inactive', None]},
+            'smoker': {'type': 'boolean'},
+            'code': {'const': 'X1'},
+            'tags': {'type': 'array', 'items': {'type': 'string'}},
+        },
+        'additionalProperties': {'type': ['integer', 'string']},
+        'maxProperties': 6,
+    }
+
+    records = [
+        {'id': 1, 'name': 'ann', 'weight': 70.5, 'status': 'active'},
+        {'id': 0, 'name': 'Bob', 'weight': 0.0, 'smoker': 'no'},
+        {'id': 2.0, 'name': '', 'email': 'ann@example.com', 'code': 'X1'},
+        {'id': 3, 'name': 'carla', 'email': 'nobody', 'code': 'X2'},
+        {'id': True, 'name': 'dan', 'status': 'retired', 'tags': ['a', 1]},
+        {'name': 'eve', 'weight': float('nan'), 'lab': 4, 'extra': [1]},
+        {'id': 2 ** 60, 'name': 'fay', 'weight': 500, 'status': None},
+        {'id': 4, 'name': 'gus', 'a': 1, 'b': 2, 'c': 3, 'd': 4, 'e': 5},
+        {'id': 5, 'name': 'hal', 'weight': {'kg': 1}, 'status': ['active']},  # noqa: E501
+        [],
+        None,
+        {},
+    ]
+
+    def runTest(self):
+        component = SchemaParser.parse(self.schema)
+        report = BatchValidator(component).validate(self.records)
+        self.assertEqual(report.records, len(self.records))
+        self.assertEqual(report.invalid, [
+            index for index, record in enumerate(self.records)
+            if not is_valid(component, record)])
+        self.assertEqual(report.violations[:4], [
+            (1, 'id', 'instance 0 is not greater than or exactly equal to 1'),
+            (1, 'name', "instance 'Bob' does not match the regular expression '^[a-z]'"),  # noqa: E501
+            (1, 'weight', 'instance 0.0 is not strictly greater than (not equal to) 0'),  # noqa: E501
+            (1, 'smoker', "instance 'no' is not in any of the sets listed 'boolean'"),  # noqa: E501
+        ])
+        self.assertIn(
+            (5, 'id', "instance %r is missing required property 'id'" % (self.records[5],)),  # noqa: E501
+            report.violations)
+        self.assertIn(
+            (7, None, 'instance %r number of properties is not less than, or equal to 6' % (self.records[7],)),  # noqa: E501
+            report.violations)
+        self.assertIn(
+            (9, None, "instance [] is not in any of the sets listed 'object'"),  # noqa: E501
+            report.violations)
+        self.assertTrue(BatchValidator(component).validate(self.records[:1]).valid)  # noqa: E501
+
+        # Strings exceeding the length limit of a budget are not checked
+        # at once.
+        with self.assertRaises(BudgetExceededError):
+            BatchValidator(component, budget=Budget(length=4)).validate(
+                [{'id': 1, 'name': 'carla'}])
+
+
+class RecordByRecordTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = SchemaParser.parse({
+            'type': 'object',
+            'properties': {'card': {'type': 'string'}},
+            'dependencies': {'card': ['zip']},
+        })
+        validator = BatchValidator(component)
+        self.assertFalse(validator.columnar)
+        report = validator.validate([{'card': 'a', 'zip': 'b'}, {'card': 'a'}])  # noqa: E501
+        self.assertEqual(report.violations, [
+            (1, None, "instance {'card': 'a'} property 'card' depends on missing property 'zip'"),  # noqa: E501
+        ])
+
+        with self.assertRaises(ValueError):
+            BatchValidator(SchemaParser.parse({'type': 'array'}))
+
+
+class ScalarFallbackTestCase(unittest.TestCase):
+
+    def runTest(self):
+        # Without NumPy, the bounds of numbers are checked by the visitor.
+        numpy, vectorized.numpy = vectorized.numpy, None
+        try:
+            component = SchemaParser.parse({
+                'type': 'object',
+                'properties': {'n': {'type': 'number', 'maximum': 1}},
+            })
+            report = BatchValidator(component).validate(
+                [{'n': 0.5}, {'n': 1.5}, {'n': 1}])
+        finally:
+            vectorized.numpy = numpy
+        self.assertEqual(report.violations, [
+            (1, 'n', 'instance 1.5 is not less than or exactly equal to 1'),
+            (2, 'n', "instance 1 is not in any of the sets listed 'number'"),
+        ])
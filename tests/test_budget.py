@@ -0,0 +1,48 @@
+import unittest
+
+from aptos.budget import Budget, BudgetExceededError
+from aptos.parser import SchemaParser
+from aptos.validator import Validator
+from aptos.visitor import ValidationVisitor
+
+
+class BudgetTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = SchemaParser.parse({
+            'type': 'array',
+            'items': {
+                'anyOf': [{'$ref': '#'}, {'type': 'string'}],
+            },
+        })
+        instance = 'leaf'
+        for _ in range(10000):
+            instance = [instance]
+        # The budget is exceeded before the recursion limit.
+        with self.assertRaises(BudgetExceededError) as context:
+            component.accept(ValidationVisitor(instance, budget=Budget(depth=32)))  # noqa: E501
+        self.assertEqual(context.exception.limit, 'depth')
+        self.assertNotIsInstance(context.exception, AssertionError)
+
+        instance = [['a'] * 10] * 10
+        component.accept(ValidationVisitor(instance, budget=Budget(depth=2, nodes=111)))  # noqa: E501
+        with self.assertRaises(BudgetExceededError) as context:
+            component.accept(ValidationVisitor(instance, budget=Budget(nodes=110)))  # noqa: E501
+        self.assertEqual(context.exception.limit, 'nodes')
+
+        with self.assertRaises(BudgetExceededError) as context:
+            component.accept(ValidationVisitor([['a' * 1001]], budget=Budget(length=1000)))  # noqa: E501
+        self.assertEqual(context.exception.limit, 'length')
+
+        budget = Budget(timeout=0.0)
+        budget.interval = 1
+        with self.assertRaises(BudgetExceededError) as context:
+            component.accept(ValidationVisitor(instance, budget=budget))
+        self.assertEqual(context.exception.limit, 'timeout')
+
+        # A budget is shared by every instance a validator validates.
+        validator = Validator(component, budget=Budget(nodes=10))
+        self.assertFalse(validator.is_valid([1]))
+        self.assertTrue(validator.is_valid(['a'] * 9))
+        with self.assertRaises(BudgetExceededError):
+            validator.is_valid(['a'] * 10)
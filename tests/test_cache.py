@@ -0,0 +1,188 @@
+import json
+import os
+import pathlib
+import pickle
+import tempfile
+import unittest
+
+from aptos.cache import SchemaCache, ValidationCache
+from aptos.formats import FormatRegistry
+from aptos.parser import SchemaParser
+from aptos.regex import PatternPolicy
+from aptos.store import DocumentStore
+from aptos.swagger.v3.parser import OpenAPIParser
+from aptos.visitor import ValidationVisitor
+
+
+class SchemaCacheTestCase(unittest.TestCase):
+
+    def runTest(self):
+        schema = json.loads('''
+            {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer", "minimum": 1}
+                },
+                "required": ["id"]
+            }
+        ''')
+        with tempfile.TemporaryDirectory() as directory:
+            schemas = SchemaCache(directory)
+            component = schemas.parse(schema)
+            key = schemas.key(schema)
+            self.assertTrue(os.path.exists(schemas.path(key)))
+            self.assertNotEqual(key, schemas.key(schema, optimize=True))
+            self.assertNotEqual(key, schemas.key(schema, OpenAPIParser))
+
+            cached = schemas.parse(schema)
+            self.assertIsNot(cached, component)
+            cached.accept(ValidationVisitor({'id': 1}))
+            with self.assertRaises(AssertionError):
+                cached.accept(ValidationVisitor({'id': 0}))
+
+            # Changing the schema changes the key.
+            schema['properties']['id']['minimum'] = 0
+            schemas.parse(schema).accept(ValidationVisitor({'id': 0}))
+            self.assertEqual(len(os.listdir(directory)), 2)
+
+            # Truncated entries are parsed again.
+            with open(schemas.path(key), 'wb') as fp:
+                fp.write(b'\x80')
+            self.assertIsNone(schemas.load(key))
+
+            # Entries written by another version are stale.
+            with open(schemas.path(key), 'wb') as fp:
+                pickle.dump('0.0.0', fp)
+                pickle.dump(component, fp)
+            self.assertIsNone(schemas.load(key))
+            self.assertEqual(schemas.prune(), 1)
+            self.assertEqual(len(os.listdir(directory)), 1)
+            self.assertIsNotNone(schemas.load(schemas.key(schema)))
+
+            # Options are keyed by value, not by identity.
+            self.assertEqual(
+                schemas.key(schema, patterns=PatternPolicy('linear')),
+                schemas.key(schema, patterns=PatternPolicy('linear')))
+            self.assertNotEqual(
+                schemas.key(schema, patterns=PatternPolicy('linear')),
+                schemas.key(schema, patterns=PatternPolicy('linear', 10)))
+            self.assertIsNone(schemas.key(schema, store=DocumentStore()))
+
+            # Checkers which are not module-level functions are neither
+            # keyed nor pickled: the schema is parsed without the cache.
+            formats = FormatRegistry({'even': lambda value: len(value) % 2 == 0})  # noqa: E501
+            schema = {'type': 'string', 'format': 'even'}
+            self.assertIsNone(schemas.key(schema, formats=formats))
+            component = schemas.parse(schema, formats=formats)
+            with self.assertRaises(AssertionError):
+                component.accept(ValidationVisitor('odd'))
+            self.assertFalse(schemas.store('unpicklable', component))
+            self.assertEqual(len(os.listdir(directory)), 1)
+
+
+class SchemaCacheReferenceTestCase(unittest.TestCase):
+
+    def runTest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'b.json')
+            with open(path, 'w') as fp:
+                json.dump({'type': 'integer', 'minimum': 1}, fp)
+            uri = pathlib.Path(directory, 'a.json').as_uri()
+            schema = {'$ref': 'b.json'}
+            schemas = SchemaCache(os.path.join(directory, 'cache'))
+            with self.assertRaises(AssertionError):
+                schemas.parse(schema, uri=uri).accept(ValidationVisitor(0))
+            key = schemas.key(schema, uri=uri)
+            self.assertIsNotNone(schemas.load(key))
+
+            # Editing the referenced document invalidates the entry.
+            with open(path, 'w') as fp:
+                json.dump({'type': 'integer', 'minimum': 0}, fp)
+            self.assertIsNone(schemas.load(key))
+            schemas.parse(schema, uri=uri).accept(ValidationVisitor(0))
+            self.assertIsNotNone(schemas.load(key))
+
+            # So does removing it.
+            os.unlink(path)
+            self.assertIsNone(schemas.load(key))
+
+
+class ValidationCacheTestCase(unittest.TestCase):
+
+    schema = {
+        'definitions': {
+            'address': {
+                'type': 'object',
+                'properties': {
+                    'street': {'type': 'string'},
+                    'zip': {'type': 'string', 'pattern': '^[0-9]{5}$'},
+                },
+                'required': ['street'],
+            },
+        },
+        'type': 'object',
+        'properties': {
+            'home': {'$ref': '#/definitions/address'},
+            'work': {'$ref': '#/definitions/address'},
+            'tags': {'type': 'array', 'items': {'type': 'string'}},
+        },
+    }
+
+    def runTest(self):
+        component = SchemaParser.parse(self.schema)
+        cache = ValidationCache()
+        address = {'street': '3400 Spruce St', 'zip': '19104'}
+        for _ in range(3):
+            component.accept(ValidationVisitor(
+                {'home': address, 'work': dict(address)}, cache=cache))
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hits, 5)
+        self.assertAlmostEqual(cache.hit_rate, 5 / 6)
+
+        # Invalid results are memoized as well.
+        for _ in range(2):
+            with self.assertRaises(AssertionError):
+                component.accept(ValidationVisitor(
+                    {'home': {'street': 'Spruce St', 'zip': 'none'}},
+                    cache=cache))
+        self.assertEqual(cache.statistics()['size'], 2)
+        self.assertEqual(cache.hits, 6)
+
+        # Instances of different types are never confused.
+        with self.assertRaises(AssertionError):
+            component.accept(ValidationVisitor(
+                {'home': {'street': 1, 'zip': '19104'}}, cache=cache))
+        component.accept(ValidationVisitor(
+            {'home': {'street': '1', 'zip': '19104'}}, cache=cache))
+
+        # Scalars and small instances are not hashed.
+        skipped = cache.skipped
+        component.accept(ValidationVisitor(
+            {'home': {'street': 'Spruce St'}}, cache=cache))
+        self.assertEqual(cache.skipped, skipped + 1)
+
+        cache.clear()
+        self.assertEqual(cache.statistics(), {
+            'hits': 0, 'misses': 0, 'skipped': 0, 'size': 0, 'hit_rate': 0.0})  # noqa: E501
+
+
+class ValidationCacheNodesTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = SchemaParser.parse(ValidationCacheTestCase.schema)
+        tags = component.properties['tags'].items
+        cache = ValidationCache(size=2, threshold=0, nodes=[tags])
+        self.assertFalse(cache.memoizes(component.properties['home'].value, True))  # noqa: E501
+
+        instance = {'tags': ['a', 'b', 'a'], 'home': {'street': 'Spruce St'}}
+        component.accept(ValidationVisitor(instance, cache=cache))
+        # Scalars are never memoized.
+        self.assertEqual((cache.hits, cache.misses, cache.skipped), (0, 0, 3))
+
+        cache = ValidationCache(size=2, threshold=0, nodes=[component.properties['home'].value])  # noqa: E501
+        for street in ('a', 'b', 'c', 'a'):
+            component.accept(ValidationVisitor(
+                {'home': {'street': street}}, cache=cache))
+        # The least recently used result is evicted first.
+        self.assertEqual((cache.hits, cache.misses), (0, 4))
+        self.assertEqual(len(cache.results), 2)
@@ -0,0 +1,186 @@
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+
+from aptos.codegen import CodeGenerationVisitor
+from aptos.parser import SchemaParser
+from aptos.visitor import ValidationVisitor
+
+
+def verdict(function, instance):
+    try:
+        function(instance)
+    except AssertionError as e:
+        return e.args[0]
+    return None
+
+
+class CodeGenerationTestCase(unittest.TestCase):
+
+    schema = json.loads('''
+        {
+            "definitions": {
+                "cat": {
+                    "type": "object",
+                    "properties": {
+                        "petType": {"const": "cat"},
+                        "lives": {"type": "integer", "maximum": 9}
+                    },
+                    "required": ["petType"]
+                },
+                "dog": {
+                    "type": "object",
+                    "properties": {
+                        "petType": {"const": "dog"},
+                        "bark": {"type": "string", "pattern": "^wo+f$"}
+                    },
+                    "required": ["petType"]
+                }
+            },
+            "type": "object",
+            "properties": {
+                "id": {"type": "integer", "minimum": 1, "multipleOf": 2},
+                "price": {"type": "number", "exclusiveMaximum": 10},
+                "name": {"type": "string", "minLength": 1, "maxLength": 4},
+                "status": {"enum": ["draft", "published"]},
+                "point": {
+                    "type": "array",
+                    "items": [{"type": "number"}, {"type": "number"}],
+                    "additionalItems": {"type": "null"},
+                    "maxItems": 3
+                },
+                "tags": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "uniqueItems": true
+                },
+                "pet": {
+                    "oneOf": [
+                        {"$ref": "#/definitions/cat"},
+                        {"$ref": "#/definitions/dog"}
+                    ]
+                },
+                "value": {
+                    "anyOf": [{"type": "string"}, {"type": "boolean"}]
+                }
+            },
+            "additionalProperties": {"type": ["integer", "null"]},
+            "required": ["id"],
+            "maxProperties": 5
+        }
+    ''')
+
+    instances = [
+        {'id': 2},
+        {'id': 3},
+        {'id': 0},
+        {'id': '2'},
+        {'id': 2, 'price': 9.5},
+        {'id': 2, 'price': 10},
+        {'id': 2, 'name': ''},
+        {'id': 2, 'name': 'abcde'},
+        {'id': 2, 'status': 'published'},
+        {'id': 2, 'status': 'deleted'},
+        {'id': 2, 'point': [1.0, 2.0, None]},
+        {'id': 2, 'point': [1.0, 2.0, 3.0]},
+        {'id': 2, 'point': [1.0, 2.0, None, None]},
+        {'id': 2, 'tags': ['a', 'b']},
+        {'id': 2, 'tags': ['a', 'a']},
+        {'id': 2, 'pet': {'petType': 'cat', 'lives': 9}},
+        {'id': 2, 'pet': {'petType': 'cat', 'lives': 10}},
+        {'id': 2, 'pet': {'petType': 'dog', 'bark': 'wooof'}},
+        {'id': 2, 'pet': {'petType': 'dog', 'bark': 'meow'}},
+        {'id': 2, 'pet': {'petType': 'bird'}},
+        {'id': 2, 'value': True},
+        {'id': 2, 'value': 1.0},
+        {'id': 2, 'extra': None},
+        {'id': 2, 'extra': 'a'},
+        {'id': 2, 'a': 1, 'b': 2, 'c': 3, 'd': 4, 'e': 5},
+        [],
+        None,
+    ]
+
+    def runTest(self):
+        component = SchemaParser.parse(self.schema)
+        source = CodeGenerationVisitor().generate(component)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'validator.py')
+            with open(path, 'w') as fp:
+                fp.write(source)
+            specification = importlib.util.spec_from_file_location(
+                'validator', path)
+            module = importlib.util.module_from_spec(specification)
+            specification.loader.exec_module(module)
+
+        for instance in self.instances:
+            self.assertEqual(
+                verdict(module.validate, instance),
+                verdict(
+                    lambda instance: component.accept(
+                        ValidationVisitor(instance)), instance),
+                instance)
+
+
+class ObjectKeywordsCodeGenerationTestCase(CodeGenerationTestCase):
+
+    schema = json.loads('''
+        {
+            "type": "object",
+            "properties": {
+                "id": {"type": "integer"},
+                "x-count": {"maximum": 3},
+                "points": {
+                    "type": "array",
+                    "contains": {"type": "integer", "minimum": 10}
+                }
+            },
+            "patternProperties": {
+                "^x-": {"type": "integer"},
+                "^x-c": {"minimum": 1}
+            },
+            "additionalProperties": {"type": "string"},
+            "propertyNames": {"maxLength": 8},
+            "dependencies": {
+                "card": ["billing", "id"],
+                "shipping": {"type": "object", "required": ["address"]}
+            },
+            "required": ["id"]
+        }
+    ''')
+
+    instances = [
+        {'id': 1},
+        {},
+        {'id': 1, 'x-count': 2, 'x-other': 7, 'name': 'a'},
+        {'id': 1, 'x-count': 0},
+        {'id': 1, 'x-count': 4},
+        {'id': 1, 'x-other': 'a'},
+        {'id': 1, 'name': 2},
+        {'id': 1, 'very-long-name': 'a'},
+        {'id': 1, 'card': 'a', 'billing': 'b'},
+        {'id': 1, 'card': 'a'},
+        {'card': 'a', 'billing': 'b'},
+        {'id': 1, 'shipping': 'a', 'address': 'b'},
+        {'id': 1, 'shipping': 'a'},
+        {'id': 1, 'points': [1, 2, 30]},
+        {'id': 1, 'points': [1, 2, 3]},
+        {'id': 1, 'points': []},
+    ]
+
+
+class OptimizedCodeGenerationTestCase(CodeGenerationTestCase):
+
+    def runTest(self):
+        component = SchemaParser.parse(self.schema)
+        namespace = {}
+        exec(CodeGenerationVisitor().generate(
+            SchemaParser.parse(self.schema, optimize=True)), namespace)
+        for instance in self.instances:
+            self.assertEqual(
+                verdict(namespace['validate'], instance) is None,
+                verdict(
+                    lambda instance: component.accept(
+                        ValidationVisitor(instance)), instance) is None,
+                instance)
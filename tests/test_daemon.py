@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from aptos.daemon import Client, ValidationServer
+
+
+class DaemonTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.schema = os.path.join(self.directory.name, 'schema.json')
+        with open(self.schema, 'w') as fp:
+            json.dump({
+                'type': 'object',
+                'properties': {'id': {'type': 'integer', 'minimum': 1}},
+                'required': ['id'],
+            }, fp)
+        self.path = os.path.join(self.directory.name, 'aptos.sock')
+        self.server = ValidationServer(self.path, [self.schema])
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.assertFalse(os.path.exists(self.path))
+        self.directory.cleanup()
+
+    def runTest(self):
+        with Client(self.path, timeout=5) as client:
+            self.assertEqual(client.request({'command': 'ping'}), {'result': 'pong'})  # noqa: E501
+            client.validate(self.schema, {'id': 1})
+            with self.assertRaises(AssertionError) as context:
+                client.validate(self.schema, {'id': 0})
+            self.assertEqual(context.exception.args[0], 'instance 0 is not greater than or exactly equal to 1')  # noqa: E501
+            record = client.convert(self.schema, 'avro')
+            self.assertEqual(record['type'], 'record')
+
+            # Requests with errors leave the connection usable.
+            with self.assertRaises(ValueError):
+                client.validate(os.path.join(self.directory.name, 'missing.json'), {})  # noqa: E501
+            with self.assertRaises(ValueError):
+                client.request({'command': 'unknown'})
+
+            # Schemas are parsed with the pattern policy of the request.
+            client.validate(self.schema, {'id': 1}, patterns='reject')
+            with self.assertRaises(ValueError):
+                client.validate(self.schema, {'id': 1}, patterns='unknown')
+
+            # A second daemon cannot take over the socket of a running one.
+            with self.assertRaises(OSError):
+                ValidationServer(self.path)
+            self.assertEqual(client.request({'command': 'ping'}), {'result': 'pong'})  # noqa: E501
+
+            # Modified schemas are parsed again.
+            with open(self.schema, 'w') as fp:
+                json.dump({'type': 'object', 'required': ['name']}, fp)
+            os.utime(self.schema, ns=(0, 0))
+            with self.assertRaises(AssertionError):
+                client.validate(self.schema, {'id': 1})
+
+            # So are schemas whose referenced documents are modified.
+            definitions = os.path.join(self.directory.name, 'definitions.json')  # noqa: E501
+            with open(definitions, 'w') as fp:
+                json.dump({'name': {'type': 'string'}}, fp)
+            with open(self.schema, 'w') as fp:
+                json.dump({'type': 'object', 'properties': {'name': {'$ref': 'definitions.json#/name'}}}, fp)  # noqa: E501
+            client.validate(self.schema, {'name': 'Rex'})
+            with open(definitions, 'w') as fp:
+                json.dump({'name': {'type': 'integer'}}, fp)
+            os.utime(definitions, ns=(0, 0))
+            with self.assertRaises(AssertionError):
+                client.validate(self.schema, {'name': 'Rex'})
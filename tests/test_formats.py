@@ -0,0 +1,141 @@
+import pickle
+import types
+import unittest
+
+from aptos import formats
+from aptos.codegen import CodeGenerationVisitor
+from aptos.formats import FORMATS, FormatRegistry
+from aptos.parser import SchemaParser
+from aptos.visitor import ValidationVisitor
+
+
+def even(value):
+    return value.isdigit() and int(value) % 2 == 0
+
+
+class CheckerTestCase(unittest.TestCase):
+
+    def runTest(self):
+        cases = {
+            'date': (
+                ['2018-02-28', '2016-02-29', '2000-02-29', '0001-12-31'],
+                ['2018-02-29', '1900-02-29', '2018-13-01', '2018-00-10',
+                 '2018-1-01', '18-01-01', '2018/01/01', '２０１８-01-01']),
+            'date-time': (
+                ['1985-04-12T23:20:50.52Z', '1996-12-19T16:39:57-08:00',
+                 '1990-12-31t23:59:60z', '2018-01-01T00:00:00+14:00'],
+                ['1985-04-12T23:20:50', '1985-04-12 23:20:50Z',
+                 '1985-04-12T24:00:00Z', '1985-04-12T23:20:50.Z',
+                 '1985-04-12T23:20:50+0800', '1985-04-12T23:20:50+08:60',
+                 '1985-04-31T23:20:50Z']),
+            'time': (
+                ['23:20:50Z', '16:39:57.000001-08:00'],
+                ['23:20Z', '23:61:00Z', '23:20:50', '23:20:50+8:00']),
+            'email': (
+                ['john.doe@example.com', "o'hara+tag@mail.example.org",
+                 'a@b'],
+                ['john..doe@example.com', '.john@example.com', 'john@',
+                 '@example.com', 'john@-example.com', 'jöhn@example.com',
+                 'john doe@example.com', 'a' * 65 + '@example.com']),
+            'hostname': (
+                ['example.com', 'www.example.com.', 'a-1.b2', 'localhost'],
+                ['', '-example.com', 'example-.com', 'exa_mple.com',
+                 'a..b', 'a' * 64 + '.com', 'exämple.com']),
+            'ipv4': (
+                ['192.168.0.1', '0.0.0.0', '255.255.255.255'],
+                ['256.0.0.1', '192.168.0', '192.168.00.1', '1.2.3.4.5',
+                 '1.2.3.-4', '١.2.3.4', '1.2.3. 4']),
+            'ipv6': (
+                ['2001:db8::1', '::', '::ffff:192.168.0.1',
+                 'fe80:0:0:0:200:f8ff:fe21:67cf'],
+                ['2001:db8:::1', 'fe80::1%eth0', '192.168.0.1', 'g::1',
+                 '1:2:3:4:5:6:7:8:9']),
+            'uuid': (
+                ['f81d4fae-7dec-11d0-a765-00a0c91e6bf6',
+                 'F81D4FAE-7DEC-11D0-A765-00A0C91E6BF6'],
+                ['f81d4fae7dec11d0a76500a0c91e6bf6',
+                 'f81d4fae-7dec-11d0-a765-00a0c91e6bfg',
+                 'f81d4fae-7dec-11d0-a765-00a0c91e-bf6']),
+            'uri': (
+                ['http://example.com/schema.json#/definitions/a',
+                 'urn:isbn:0451450523', 'mailto:john@example.com',
+                 'http://example.com/%20'],
+                ['//example.com', 'schema.json', '1http://example.com',
+                 'http://example.com/a b', 'http://example.com/%2',
+                 'http://example.com/%zz', 'http://example.com/#a#b']),
+            'uri-reference': (
+                ['../schema.json#/definitions/a', '#a', '', '//example.com'],
+                ['a b', '<a>', '%g0']),
+        }
+        for name, (valid, invalid) in cases.items():
+            checker = FORMATS.get(name)
+            for value in valid:
+                self.assertTrue(checker(value), (name, value))
+            for value in invalid:
+                self.assertFalse(checker(value), (name, value))
+
+
+class FormatValidationTestCase(unittest.TestCase):
+
+    def runTest(self):
+        schema = {
+            'type': 'object',
+            'properties': {
+                'created': {'type': 'string', 'format': 'date-time'},
+                'host': {'type': 'string', 'format': 'ipv4'},
+                'color': {'type': 'string', 'format': 'color'},
+            },
+        }
+        component = SchemaParser.parse(schema)
+        checkers = component.properties
+        self.assertIs(checkers['created'].checker, formats.date_time)
+        self.assertIs(checkers['host'].checker, formats.ipv4)
+        # Unknown formats are not validated.
+        self.assertIsNone(checkers['color'].checker)
+        self.assertIs(pickle.loads(pickle.dumps(component)).properties['host'].checker, formats.ipv4)  # noqa: E501
+
+        module = types.ModuleType('generated')
+        exec(CodeGenerationVisitor().generate(component), module.__dict__)
+        for instance, valid in (
+                ({'created': '2018-01-01T00:00:00Z', 'color': 'mauve'}, True),  # noqa: E501
+                ({'created': '2018-01-01'}, False),
+                ({'host': '192.168.0.256'}, False)):
+            for validate in (
+                    lambda: component.accept(ValidationVisitor(instance)),
+                    lambda: module.validate(instance)):
+                if valid:
+                    validate()
+                else:
+                    with self.assertRaisesRegex(AssertionError, 'is not a valid'):  # noqa: E501
+                        validate()
+
+
+class RegistryTestCase(unittest.TestCase):
+
+    def runTest(self):
+        registry = FORMATS.copy()
+        self.assertIs(registry.register('even', even), even)
+        self.assertIsNone(FORMATS.get('even'))
+
+        @registry.register('ipv4')
+        def ipv4(value):
+            return value == 'localhost'
+
+        self.assertIs(registry.get('ipv4'), ipv4)
+        self.assertIs(FORMATS.get('ipv4'), formats.ipv4)
+
+        schema = {'type': 'string', 'format': 'even'}
+        component = SchemaParser.parse(schema, formats=registry)
+        component.accept(ValidationVisitor('42'))
+        with self.assertRaises(AssertionError):
+            component.accept(ValidationVisitor('41'))
+        # The default registry does not know the format.
+        SchemaParser.parse(schema).accept(ValidationVisitor('41'))
+
+        # Functions which cannot be imported cannot be generated.
+        component = SchemaParser.parse(
+            {'type': 'string', 'format': 'ipv4'}, formats=registry)
+        with self.assertRaises(ValueError):
+            CodeGenerationVisitor().generate(component)
+        self.assertIn("('even', '{}.even')".format(__name__), repr(registry))
+        self.assertEqual(FormatRegistry().formats, {})
@@ -0,0 +1,187 @@
+import json
+import os
+import unittest
+
+from aptos.budget import Budget, BudgetExceededError
+from aptos.cache import ValidationCache
+from aptos.iterative import (
+    IterativeResolveVisitor, IterativeValidationVisitor)
+from aptos.parser import SchemaParser
+from aptos.primitive import Creator
+from aptos.sampling import SamplingPolicy
+from aptos.stats import SchemaStatistics
+from aptos.validator import Validator
+from aptos.visitor import ResolveVisitor, ValidationVisitor
+
+BASE_DIR = os.path.dirname(__file__)
+
+# Schemas along with instances exercising every keyword, both valid and
+# invalid ones.
+CASES = [
+    ({'type': 'string', 'minLength': 2, 'maxLength': 3, 'pattern': '^a'},
+     ['ab', 'a', 'abcd', 'bb', 1]),
+    ({'type': 'integer', 'minimum': 0, 'exclusiveMaximum': 10, 'multipleOf': 2},  # noqa: E501
+     [2, -2, 10, 3, 2.0]),
+    ({'type': ['null', 'boolean'], 'enum': [None, True]},
+     [None, True, False, 0]),
+    ({'const': {'a': [1]}},
+     [{'a': [1]}, {'a': [2]}]),
+    ({'type': 'array', 'items': {'type': 'number', 'maximum': 1}, 'minItems': 1, 'maxItems': 3, 'uniqueItems': True},  # noqa: E501
+     [[0.5], [], [0.5, 2.0], [0.5, 0.5], [0.1, 0.2, 0.3, 0.4], [0.5] * 20 + [2.0]]),  # noqa: E501
+    ({'type': 'array', 'items': [{'type': 'integer'}, {'type': 'string'}], 'additionalItems': {'type': 'null'}},  # noqa: E501
+     [[1, 'a', None], [1, 2], [1, 'a', 1], []]),
+    ({'type': 'array', 'contains': {'type': 'integer', 'minimum': 5}},
+     [[1, 6], [1, 2], []]),
+    ({'type': 'object', 'required': ['a', 'b'], 'maxProperties': 3, 'minProperties': 2,  # noqa: E501
+      'properties': {'a': {'type': 'integer'}, 'b': {'type': 'string'}},
+      'additionalProperties': {'type': 'boolean'}},
+     [{'a': 1, 'b': 'x'}, {'a': 1}, {'a': 'x', 'b': 1}, {'a': 1, 'b': 'x', 'c': 1}, {'a': 1, 'b': 'x', 'c': True, 'd': True}]),  # noqa: E501
+    ({'type': 'object', 'patternProperties': {'^x-': {'type': 'integer'}, '-y$': {'minimum': 2}},  # noqa: E501
+      'properties': {'x-y': {'maximum': 3}}, 'propertyNames': {'maxLength': 3},
+      'additionalProperties': {'type': 'string'}},
+     [{'x-y': 2, 'b': 'c'}, {'x-y': 1}, {'x-y': 4}, {'x-y': 2.0}, {'long': 'a'}, {'b': 1}]),  # noqa: E501
+    ({'type': 'object', 'dependencies': {'a': ['b'], 'c': {'required': ['d']}}},  # noqa: E501
+     [{'a': 1, 'b': 2}, {'a': 1}, {'c': 1, 'd': 1}, {'c': 1}]),
+    ({'allOf': [{'type': 'integer'}, {'minimum': 2}], 'maximum': 5},
+     [3, 1, 6, 'a']),
+    ({'anyOf': [{'type': 'string', 'maxLength': 1}, {'type': 'integer'}, {'type': 'array', 'items': {'anyOf': [{'type': 'null'}, {'type': 'boolean'}]}}]},  # noqa: E501
+     ['a', 'ab', 1, [None, True], [None, 1], 1.5]),
+    ({'oneOf': [{'type': 'integer'}, {'minimum': 2}, {'type': 'array', 'contains': {'oneOf': [{'const': 1}, {'const': 2}]}}]},  # noqa: E501
+     [1, 3, 2.5, 1.5, [3, 1], [3, 4], 'a']),
+    ({'type': 'object', 'properties': {'a': {'type': 'string'}},
+      'oneOf': [{'required': ['a']}, {'required': ['b']}],
+      'anyOf': [{'maxProperties': 1}, {'properties': {'a': {'const': 'x'}}}]},  # noqa: E501
+     [{'a': 'x'}, {'b': 1}, {'a': 'x', 'b': 1}, {'a': 'y', 'c': 1}, {'a': 1}, {}]),  # noqa: E501
+    ({'oneOf': [
+        {'type': 'object', 'properties': {'kind': {'const': 'a'}, 'a': {'type': 'integer'}}},  # noqa: E501
+        {'type': 'object', 'properties': {'kind': {'const': 'b'}, 'b': {'type': 'integer'}}}]},  # noqa: E501
+     [{'kind': 'a', 'a': 1}, {'kind': 'b', 'b': 'x'}, {'kind': 'c'}]),
+    ({'definitions': {'tree': {'type': 'object', 'required': ['value'], 'properties': {  # noqa: E501
+        'value': {'type': 'integer'},
+        'children': {'type': 'array', 'items': {'$ref': '#/definitions/tree'}}}}},  # noqa: E501
+      '$ref': '#/definitions/tree'},
+     [{'value': 1, 'children': [{'value': 2, 'children': []}, {'value': 3}]},
+      {'value': 1, 'children': [{'value': 2}, {'children': []}]},
+      {'value': 1, 'children': [{'value': 2, 'children': [{'value': 'x'}]}]}]),  # noqa: E501
+]
+
+
+def error(component, visitor, instance, **options):
+    try:
+        component.accept(visitor(instance, **options))
+    except AssertionError as e:
+        return e.args[0]
+
+
+def nest(depth, leaf):
+    # An instance of the "tree" schema nested ``depth`` times.
+    instance = {'value': leaf}
+    for value in range(depth):
+        instance = {'value': value, 'children': [instance]}
+    return instance
+
+
+class ValidationTestCase(unittest.TestCase):
+
+    def runTest(self):
+        for schema, instances in CASES:
+            component = SchemaParser.parse(schema)
+            for instance in instances:
+                # The same instances are valid, with the same violations.
+                self.assertEqual(
+                    error(component, IterativeValidationVisitor, instance),
+                    error(component, ValidationVisitor, instance),
+                    (schema, instance))
+
+        validator = Validator(
+            SchemaParser.parse(CASES[-1][0]),
+            visitor=IterativeValidationVisitor)
+        self.assertTrue(validator.is_valid(CASES[-1][1][0]))
+        self.assertFalse(validator.is_valid(CASES[-1][1][1]))
+
+
+class DepthTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = SchemaParser.parse(CASES[-1][0])
+        with self.assertRaises(RecursionError):
+            error(component, ValidationVisitor, nest(10000, 0))
+        self.assertIsNone(
+            error(component, IterativeValidationVisitor, nest(10000, 0)))
+        self.assertEqual(
+            error(component, IterativeValidationVisitor, nest(10000, 'x')),
+            "instance 'x' is not in any of the sets listed 'integer'")
+        with self.assertRaises(BudgetExceededError):
+            error(component, IterativeValidationVisitor, nest(10000, 0),
+                  budget=Budget(depth=100))
+
+
+class OptionsTestCase(unittest.TestCase):
+
+    def runTest(self):
+        schema, instances = CASES[12]
+        # Members are tried in the same order, and move up in the same way.
+        recursive = SchemaParser.parse(schema)
+        iterative = SchemaParser.parse(schema)
+        for instance in instances * 3:
+            self.assertEqual(
+                error(iterative, IterativeValidationVisitor, instance, adaptive=True),  # noqa: E501
+                error(recursive, ValidationVisitor, instance, adaptive=True))  # noqa: E501
+        self.assertEqual(
+            iterative.oneOf.statistics.hits, recursive.oneOf.statistics.hits)
+        self.assertEqual(
+            iterative.oneOf.statistics.order, recursive.oneOf.statistics.order)  # noqa: E501
+
+        component = SchemaParser.parse(CASES[-1][0])
+        statistics = []
+        for visitor in (ValidationVisitor, IterativeValidationVisitor):
+            cache = ValidationCache()
+            for instance in CASES[-1][1] * 2:
+                error(component, visitor, instance, cache=cache)
+            statistics.append(cache.statistics())
+        self.assertEqual(statistics[0], statistics[1])
+        self.assertGreater(statistics[0]['hits'], 0)
+
+        component = SchemaParser.parse({'type': 'array', 'items': {'type': 'number'}})  # noqa: E501
+        instance = [0.5] * 1000
+        reports = []
+        for visitor in (ValidationVisitor, IterativeValidationVisitor):
+            policy = SamplingPolicy(rate=0.01, minimum=100, seed=0)
+            validator = Validator(component, visitor=visitor, sampling=policy)  # noqa: E501
+            reports.append(vars(validator.validate(instance)))
+            with self.assertRaises(BudgetExceededError):
+                error(component, visitor, instance, budget=Budget(nodes=100))  # noqa: E501
+        self.assertEqual(reports[0], reports[1])
+        self.assertLess(reports[0]['validated'], 1000)
+
+
+class ResolutionTestCase(unittest.TestCase):
+
+    def runTest(self):
+        for name in ('product', 'address', 'avro', 'inventory'):
+            with open(os.path.join(BASE_DIR, 'schema', name)) as fp:
+                schema = json.load(fp)
+            recursive = Creator.create(schema.get('type')).unmarshal(schema)
+            recursive.accept(ResolveVisitor(schema))
+            iterative = Creator.create(schema.get('type')).unmarshal(schema)
+            IterativeResolveVisitor(schema).resolve(iterative)
+            self.assertEqual(
+                SchemaStatistics(recursive).report(),
+                SchemaStatistics(iterative).report())
+
+        # A chain of references, each referring to the next one.
+        schema = {'definitions': {}, '$ref': '#/definitions/d0'}
+        for i in range(1000):
+            schema['definitions']['d%d' % i] = {
+                'type': 'object',
+                'properties': {'next': {'$ref': '#/definitions/d%d' % (i + 1)}},  # noqa: E501
+            }
+        schema['definitions']['d1000'] = {'type': 'integer'}
+        component = Creator.create(None).unmarshal(schema)
+        with self.assertRaises(RecursionError):
+            component.accept(ResolveVisitor(schema))
+        component = SchemaParser.parse(schema)
+        instance = 1
+        for i in range(1000):
+            instance = {'next': instance}
+        self.assertIsNone(error(component, IterativeValidationVisitor, instance))  # noqa: E501
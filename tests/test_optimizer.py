@@ -0,0 +1,112 @@
+import json
+import unittest
+
+from aptos import primitive
+from aptos.optimizer import OptimizeVisitor
+from aptos.parser import SchemaParser
+from aptos.visitor import ValidationVisitor
+
+
+def valid(component, instance):
+    try:
+        component.accept(ValidationVisitor(instance))
+    except AssertionError:
+        return False
+    return True
+
+
+class AllOfTestCase(unittest.TestCase):
+
+    def runTest(self):
+        schema = json.loads('''
+            {
+                "allOf": [
+                    {
+                        "allOf": [
+                            {"type": "string", "minLength": 2},
+                            {"type": "string", "maxLength": 4}
+                        ]
+                    },
+                    {},
+                    {"allOf": [{"type": "string", "pattern": "^a"}]}
+                ]
+            }
+        ''')
+        optimizer = OptimizeVisitor()
+        component = optimizer.optimize(
+            SchemaParser.parse(schema, freeze=False))
+        self.assertIsInstance(component, primitive.Enumeration)
+        self.assertEqual(component.type, 'string')
+        self.assertEqual(len(component.allOf), 3)
+        for member in component.allOf:
+            self.assertIsNone(member.type)
+        self.assertEqual(sum(optimizer.before.values()), 7)
+        self.assertEqual(sum(optimizer.after.values()), 4)
+        self.assertIn('total', optimizer.explain())
+
+        for instance in ('abc', 'a', 'abcde', 'bcd', 1, None):
+            self.assertEqual(
+                valid(component, instance),
+                valid(SchemaParser.parse(schema), instance))
+
+        # A single-member "allOf" replaces its parent.
+        component = SchemaParser.parse(
+            {'allOf': [{'type': 'integer', 'minimum': 1}]}, optimize=True)
+        self.assertIsInstance(component, primitive.Integer)
+
+
+class EmptySchemaTestCase(unittest.TestCase):
+
+    def runTest(self):
+        schema = json.loads('''
+            {
+                "type": "array",
+                "items": {"allOf": [{}, {"title": "anything"}]},
+                "contains": {"anyOf": [{"type": "null"}, {"allOf": [{}]}]}
+            }
+        ''')
+        array = SchemaParser.parse(schema, optimize=True)
+        self.assertIsInstance(array.items, primitive.EmptySchema)
+        self.assertFalse(array.contains.anyOf)
+        array.accept(ValidationVisitor([1, 'a', None]))
+
+
+class ReferenceTestCase(unittest.TestCase):
+
+    def runTest(self):
+        schema = json.loads('''
+            {
+                "definitions": {
+                    "node": {
+                        "type": "object",
+                        "properties": {
+                            "value": {"type": "integer"},
+                            "children": {
+                                "type": "array",
+                                "items": {"$ref": "#/definitions/positive"}
+                            }
+                        }
+                    },
+                    "positive": {"type": "integer", "minimum": 1}
+                },
+                "type": "object",
+                "properties": {
+                    "root": {"$ref": "#/definitions/node"},
+                    "count": {"allOf": [{"$ref": "#/definitions/positive"}]}
+                }
+            }
+        ''')
+        component = SchemaParser.parse(schema, optimize=True)
+        self.assertFalse(component.definitions)
+        self.assertIsInstance(component.properties['root'], primitive.Object)
+        self.assertIsInstance(component.properties['count'], primitive.Integer)
+
+        instances = [
+            {'root': {'value': 1, 'children': [1, 2]}, 'count': 3},
+            {'root': {'value': 1, 'children': [0]}},
+            {'count': 0},
+        ]
+        for instance in instances:
+            self.assertEqual(
+                valid(component, instance),
+                valid(SchemaParser.parse(schema), instance))
@@ -0,0 +1,207 @@
+import copy
+import random
+import unittest
+
+from aptos.parser import SchemaParser
+from aptos.patch import IncrementalValidator, Patch
+from aptos.visitor import ValidationVisitor
+
+
+class PatchTestCase(unittest.TestCase):
+
+    def runTest(self):
+        # https://tools.ietf.org/html/rfc6902#appendix-A
+        document = {'foo': ['bar', 'baz'], 'a~b': {'c/d': 1}}
+        edit = Patch([
+            {'op': 'add', 'path': '/foo/1', 'value': 'qux'},
+            {'op': 'add', 'path': '/foo/-', 'value': 'quux'},
+            {'op': 'remove', 'path': '/foo/0'},
+            {'op': 'replace', 'path': '/a~0b/c~1d', 'value': 2},
+            {'op': 'move', 'from': '/a~0b/c~1d', 'path': '/e'},
+            {'op': 'copy', 'from': '/foo', 'path': '/f'},
+            {'op': 'test', 'path': '/f/2', 'value': 'quux'},
+        ]).apply(document)
+        self.assertIs(edit.document, document)
+        self.assertEqual(document, {
+            'foo': ['qux', 'baz', 'quux'], 'a~b': {}, 'e': 2,
+            'f': ['qux', 'baz', 'quux']})
+        # Indices are updated as elements are inserted and removed.
+        self.assertEqual(edit.modified, [
+            (['foo', 0], True), (['foo', 2], True), (['foo'], False),
+            (['a~b', 'c/d'], True), (['a~b'], False), (['e'], True),
+            (['f'], True)])
+        self.assertEqual(edit.revert(), {
+            'foo': ['bar', 'baz'], 'a~b': {'c/d': 1}})
+
+        # A failed operation undoes the whole patch.
+        for operations in (
+                [{'op': 'remove', 'path': '/foo/1'},
+                 {'op': 'test', 'path': '/foo/0', 'value': 'baz'}],
+                [{'op': 'add', 'path': '/x', 'value': 1},
+                 {'op': 'remove', 'path': '/missing'}],
+                [{'op': 'replace', 'path': '/foo/2', 'value': 1}],
+                [{'op': 'add', 'path': '/foo/01', 'value': 1}],
+                [{'op': 'move', 'from': '/foo', 'path': '/foo/0'}],
+                [{'op': 'remove', 'path': ''}],
+                [{'op': 'copy', 'path': '/x'}],
+                [{'op': 'rename', 'path': '/x'}]):
+            with self.assertRaises(ValueError):
+                Patch(operations).apply(document)
+            self.assertEqual(document, {
+                'foo': ['bar', 'baz'], 'a~b': {'c/d': 1}})
+
+        edit = Patch([{'op': 'replace', 'path': '', 'value': [1]}]).apply(document)  # noqa: E501
+        self.assertEqual(edit.document, [1])
+
+
+class IncrementalValidatorTestCase(unittest.TestCase):
+
+    schema = {
+        'definitions': {
+            'item': {
+                'type': 'object',
+                'properties': {
+                    'sku': {'type': 'string', 'minLength': 3},
+                    'quantity': {'type': 'integer', 'minimum': 1},
+                },
+                'required': ['sku'],
+                'additionalProperties': {'type': 'string'},
+            },
+        },
+        'type': 'object',
+        'properties': {
+            'id': {'type': 'integer'},
+            'items': {
+                'type': 'array',
+                'items': {'$ref': '#/definitions/item'},
+                'maxItems': 4,
+                'minItems': 1,
+            },
+            'status': {'enum': ['open', 'closed']},
+            'tags': {'type': 'array', 'uniqueItems': True},
+            'note': {'anyOf': [{'type': 'string'}, {'type': 'null'}]},
+        },
+        'required': ['id', 'items'],
+        'maxProperties': 5,
+    }
+
+    document = {
+        'id': 1,
+        'items': [{'sku': 'abc', 'quantity': 1}, {'sku': 'def'}],
+        'tags': ['a', 'b'],
+    }
+
+    def runTest(self):
+        component = SchemaParser.parse(self.schema)
+        validator = IncrementalValidator(component, copy.deepcopy(self.document))  # noqa: E501
+
+        validator.apply([{'op': 'add', 'path': '/items/-', 'value': {'sku': 'ghi'}}])  # noqa: E501
+        self.assertEqual(len(validator.document['items']), 3)
+        for operations in (
+                [{'op': 'replace', 'path': '/items/0/quantity', 'value': 0}],
+                [{'op': 'remove', 'path': '/items/1/sku'}],
+                [{'op': 'add', 'path': '/items/0/color', 'value': 1}],
+                [{'op': 'remove', 'path': '/id'}],
+                [{'op': 'add', 'path': '/tags/-', 'value': 'a'}],
+                [{'op': 'add', 'path': '/status', 'value': 'pending'}],
+                [{'op': 'add', 'path': '/note', 'value': 1}],
+                [{'op': 'add', 'path': '/items/-', 'value': {'sku': 'jkl'}},
+                 {'op': 'add', 'path': '/items/-', 'value': {'sku': 'mno'}}],
+                [{'op': 'add', 'path': '/status', 'value': 'open'},
+                 {'op': 'add', 'path': '/note', 'value': None},
+                 {'op': 'add', 'path': '/extra', 'value': None}],
+                # The element modified first is moved by the insertion.
+                [{'op': 'replace', 'path': '/items/0/sku', 'value': 'x'},
+                 {'op': 'add', 'path': '/items/0', 'value': {'sku': 'xyz'}}],
+                [{'op': 'replace', 'path': '', 'value': {'id': 1}}]):
+            before = copy.deepcopy(validator.document)
+            with self.assertRaises(AssertionError):
+                validator.apply(operations)
+            self.assertEqual(validator.document, before)
+            self.assertTrue(validator.valid)
+
+        validator.apply([{'op': 'remove', 'path': '/items/2'}])
+        with self.assertRaises(AssertionError):
+            validator.apply([{'op': 'remove', 'path': '/items/0'},
+                             {'op': 'remove', 'path': '/items/0'}])
+        validator.apply([{'op': 'move', 'from': '/items/1', 'path': '/items/0'}])  # noqa: E501
+        self.assertEqual(validator.document['items'][0], {'sku': 'def'})
+
+        with self.assertRaises(AssertionError):
+            validator.apply([{'op': 'remove', 'path': '/items'}], rollback=False)  # noqa: E501
+        self.assertFalse(validator.valid)
+        validator.apply([{'op': 'add', 'path': '/items', 'value': [{'sku': 'abc'}]}])  # noqa: E501
+        self.assertTrue(validator.valid)
+
+
+class IncrementalEquivalenceTestCase(unittest.TestCase):
+
+    schema = IncrementalValidatorTestCase.schema
+    document = IncrementalValidatorTestCase.document
+    values = [
+        None, 0, 5, 'ab', 'abcd', 'open', [], ['a'], ['a', 'a'],
+        {'sku': 'abc'}, {'sku': 'ab'}, {'quantity': 2}]
+    paths = [
+        '/id', '/items/0', '/items/1', '/items/-', '/items/0/sku',
+        '/items/0/quantity', '/items/1/size', '/tags/0', '/tags/-',
+        '/status', '/note', '/extra']
+
+    def runTest(self):
+        # Incremental revalidation agrees with validating the whole
+        # document.
+        component = SchemaParser.parse(self.schema)
+        values = self.values
+        paths = self.paths
+        generator = random.Random(0)
+        for _ in range(500):
+            validator = IncrementalValidator(
+                component, copy.deepcopy(self.document), True)
+            operations = [{
+                'op': generator.choice(['add', 'replace', 'remove']),
+                'path': generator.choice(paths),
+                'value': copy.deepcopy(generator.choice(values)),
+            } for _ in range(generator.randint(1, 3))]
+            try:
+                expected = Patch(operations).apply(copy.deepcopy(validator.document)).document  # noqa: E501
+            except ValueError:
+                continue
+            try:
+                component.accept(ValidationVisitor(expected))
+            except (AssertionError, TypeError):
+                valid = False
+            else:
+                valid = True
+            try:
+                validator.apply(operations)
+            except (AssertionError, TypeError):
+                self.assertFalse(valid, operations)
+            else:
+                self.assertTrue(valid, operations)
+
+
+class ObjectKeywordsEquivalenceTestCase(IncrementalEquivalenceTestCase):
+
+    schema = {
+        'type': 'object',
+        'properties': {
+            'meta': {
+                'type': 'object',
+                'patternProperties': {'^x-': {'type': 'integer'}},
+                'propertyNames': {'type': 'string', 'maxLength': 4},
+                'dependencies': {'card': ['zip']},
+            },
+            'shipping': {
+                'type': 'object',
+                'dependencies': {
+                    'rush': {'type': 'object', 'required': ['fee']}},
+            },
+        },
+    }
+    document = {
+        'meta': {'x-a': 1, 'card': 'a', 'zip': 'b'},
+        'shipping': {'rush': True, 'fee': 2},
+    }
+    values = [None, 0, 'ab', {}, {'x-b': 1}, {'card': 1}]
+    paths = [
+        '/meta/x-a', '/meta/x-bb', '/meta/card', '/meta/zip', '/meta/long',
+        '/shipping/rush', '/shipping/fee', '/meta', '/shipping']
@@ -0,0 +1,117 @@
+import pickle
+import re
+import types
+import unittest
+import warnings
+
+from aptos.budget import BudgetExceededError
+from aptos.codegen import CodeGenerationVisitor
+from aptos.parser import SchemaParser
+from aptos.regex import BacktrackingWarning, PatternPolicy, Program, analyze
+from aptos.visitor import ValidationVisitor
+
+
+class AnalysisTestCase(unittest.TestCase):
+
+    def runTest(self):
+        for pattern in (
+                '(a+)+$', '(\\w+\\s?)*$', '(x+x+)+y', '(ab|\\wc)+$',
+                '\\d+\\d+x', '^\\d+\\s*\\d+$', '.*.*=.*',
+                # The parser factors out the common prefix of alternatives.
+                '^(a|a)*$', '^(a|aa)+$', '(a|ab)*',
+                # Consecutive iterations of a counted repetition.
+                '^(.*a){12}$'):
+            self.assertTrue(analyze(pattern), pattern)
+        for pattern in (
+                '^[0-9]{5}$', '^wo+f$', 'gray|grey', '(ab+)+',
+                '([a-z]+\\.)+$', '^\\d+-\\d+$', '^[^@]+@[^@]+\\.[a-z]+$',
+                '\\d+\\d{2}', 'a{2,5}b{1,3}', '^(\\d+(px|em) ?)+$',
+                '^(\\d{3}-){2}\\d{4}$', '^([0-9]+\\.){3}[0-9]+$'):
+            self.assertEqual(analyze(pattern), [], pattern)
+        with self.assertRaises(ValueError):
+            analyze('(')
+
+
+class ProgramTestCase(unittest.TestCase):
+
+    def runTest(self):
+        cases = {
+            '(a+)+$': ['', 'a', 'aaaa', 'aaa!', 'aa\n', 'b'],
+            '^(?:ab|a)*c?\\Z': ['', 'ababc', 'aab', 'abac', 'c\n'],
+            '(?s)a.b': ['a\nb', 'axb', 'ab'],
+            'a.b': ['a\nb', 'axb'],
+            '\\bfoo\\B': ['foo', 'foobar', ' foo'],
+            '[^\\d\\s]{2,3}[a-c]?': ['ab', 'a1', 'abcd', 'éè', '١a'],
+            '(?a)\\w+$': ['abc', 'abé'],
+            '(\\d{3})-(\\d{2})|x': ['123-45', '12-345', 'x'],
+            '^(a|a)*$': ['', 'aaa', 'aa!'],
+            '^(a|aa)+$': ['a', 'aaa', 'aab'],
+            '^(.*a){3}$': ['aaa', 'xaxaxa', 'aaab'],
+        }
+        for pattern, strings in cases.items():
+            program = Program(pattern)
+            for string in strings:
+                self.assertEqual(
+                    program.match(string) is not None,
+                    re.match(pattern, string) is not None, (pattern, string))
+
+        # The match takes linear time.
+        self.assertIsNone(Program('(a+)+$').match('a' * 5000 + '!'))
+        self.assertIsNone(Program('^(a|a)*$').match('a' * 5000 + '!'))
+        self.assertIsNone(Program('^(.*a){12}$').match('a' * 500 + '!'))
+        with self.assertRaises(BudgetExceededError) as context:
+            Program('(a+)+$', steps=1000).match('a' * 5000 + '!')
+        self.assertEqual(context.exception.limit, 'steps')
+
+        for pattern in ('(a)\\1', '(?=a)', '(?i)a', '(?m)^a', 'a{100000}'):
+            with self.assertRaises(ValueError):
+                Program(pattern)
+
+        program = pickle.loads(pickle.dumps(Program('(a+)+$', steps=10)))
+        self.assertTrue(program.match('aaa'))
+        self.assertEqual(program.steps, 10)
+
+
+class PatternPolicyTestCase(unittest.TestCase):
+
+    schema = {
+        'type': 'object',
+        'properties': {
+            'name': {'type': 'string', 'pattern': '^(\\w+\\s?)*$'},
+            'zip': {'type': 'string', 'pattern': '^[0-9]{5}$'},
+        },
+    }
+
+    def runTest(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            component = SchemaParser.parse(self.schema)
+        self.assertEqual([w.category for w in caught], [BacktrackingWarning])
+        self.assertIsInstance(component.properties['name'].matcher, re.Pattern)  # noqa: E501
+
+        with self.assertRaises(ValueError):
+            SchemaParser.parse(self.schema, patterns='reject')
+        with self.assertRaises(ValueError):
+            PatternPolicy('ignore')
+
+        component = SchemaParser.parse(self.schema, patterns=PatternPolicy('linear', steps=100000))  # noqa: E501
+        self.assertIsInstance(component.properties['name'].matcher, Program)
+        # The analysis misses some risky patterns, so every pattern the
+        # linear matcher supports is evaluated with it.
+        self.assertIsInstance(component.properties['zip'].matcher, Program)  # noqa: E501
+        component.accept(ValidationVisitor({'name': 'John Doe', 'zip': '19104'}))  # noqa: E501
+        for instance in ({'name': 'a' * 10000 + '!'}, {'zip': '1910'}):
+            with self.assertRaises(AssertionError):
+                component.accept(ValidationVisitor(instance))
+
+        policy = PatternPolicy('linear')
+        self.assertIsInstance(policy.compile('(a)\\1'), re.Pattern)
+        with self.assertRaises(ValueError):
+            policy.compile('(a+)+\\1')
+
+        # Generated modules evaluate the pattern with the linear matcher.
+        module = types.ModuleType('validator')
+        exec(CodeGenerationVisitor().generate(component), module.__dict__)
+        self.assertIsInstance(module.PATTERN_0, Program)
+        with self.assertRaises(AssertionError):
+            module.validate({'name': 'a' * 10000 + '!'})
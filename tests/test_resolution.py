@@ -1,9 +1,14 @@
 import json
 import os
+import pathlib
+import tempfile
 import unittest
 
-from aptos.primitive import Object, Primitive
-from aptos.visitor import ResolveVisitor
+from aptos.parser import SchemaParser
+from aptos.primitive import Integer, Object, Primitive, String
+from aptos.store import (
+    Document, DocumentStore, FileSystemLoader, MemoryLoader)
+from aptos.visitor import ResolveVisitor, ValidationVisitor
 
 BASE_DIR = os.path.dirname(__file__)
 
@@ -37,3 +42,221 @@ class ResolutionTestCase(unittest.TestCase):
         component.accept(ResolveVisitor(schema))
         for member in component.properties['units'].items:
             self.assertTrue(member.resolved)
+
+
+class CountingLoader(MemoryLoader):
+
+    def __init__(self, documents):
+        super().__init__(documents)
+        self.loaded = []
+
+    def __call__(self, uri):
+        self.loaded.append(uri)
+        return super().__call__(uri)
+
+
+class ExternalReferenceTestCase(unittest.TestCase):
+
+    def runTest(self):
+        loader = CountingLoader({
+            'http://example.com/schemas/address.json': {
+                'type': 'object',
+                'properties': {
+                    'city': {'$ref': 'definitions.json#/definitions/name'},
+                    'zip': {'$ref': '#/definitions/zip'},
+                },
+                'definitions': {
+                    'zip': {'type': 'string', 'pattern': '^[0-9]{5}$'},
+                },
+            },
+            'http://example.com/schemas/definitions.json': {
+                'definitions': {
+                    'name': {'type': 'string', 'maxLength': 8},
+                    'a/b~c': {'type': 'integer'},
+                    'list': [{'type': 'null'}, {'type': 'boolean'}],
+                },
+            },
+        })
+        store = DocumentStore(loader)
+        schema = {
+            'type': 'object',
+            'properties': {
+                'address': {'$ref': 'schemas/address.json'},
+                'escaped': {'$ref': 'schemas/definitions.json#/definitions/a~1b~0c'},  # noqa: E501
+                'item': {'$ref': 'schemas/definitions.json#/definitions/list/1'},  # noqa: E501
+                'local': {
+                    '$id': 'schemas/',
+                    'type': 'object',
+                    'properties': {
+                        'name': {'$ref': 'definitions.json#/definitions/name'},  # noqa: E501
+                    },
+                },
+            },
+        }
+        for _ in range(2):
+            component = SchemaParser.parse(
+                schema, uri='http://example.com/root.json', store=store)
+        # Each document is loaded once and shared by both parses.
+        self.assertEqual(sorted(loader.loaded), [
+            'http://example.com/schemas/address.json',
+            'http://example.com/schemas/definitions.json',
+        ])
+
+        address = component.properties['address'].value
+        self.assertIsInstance(address.properties['zip'].value, String)
+        local = component.properties['local'].properties['name']
+        self.assertIs(
+            local.value, address.properties['city'].value)
+
+        component.accept(ValidationVisitor({
+            'address': {'city': 'Paris', 'zip': '75001'},
+            'escaped': 1,
+            'item': True,
+        }))
+        for instance in ({'address': {'zip': '7500'}}, {'escaped': 'a'},
+                         {'item': None}, {'local': {'name': 'Philadelphia'}}):
+            with self.assertRaises(AssertionError):
+                component.accept(ValidationVisitor(instance))
+
+        with self.assertRaises(ValueError):
+            SchemaParser.parse(
+                {'$ref': 'schemas/missing.json'},
+                uri='http://example.com/root.json', store=store)
+        with self.assertRaises(ValueError):
+            SchemaParser.parse(
+                {'$ref': 'schemas/definitions.json#/definitions/missing'},
+                uri='http://example.com/root.json', store=store)
+
+
+class IdentifierTestCase(unittest.TestCase):
+
+    def runTest(self):
+        schema = {
+            '$id': 'http://example.com/root.json',
+            'type': 'object',
+            'properties': {
+                'a': {'$ref': '#item'},
+                'b': {'$ref': 'other.json'},
+                'c': {'$ref': 'other.json#/properties/value'},
+            },
+            'definitions': {
+                'item': {'$anchor': 'item', 'type': 'integer'},
+                'other': {
+                    '$id': 'other.json',
+                    'type': 'object',
+                    'properties': {'value': {'type': 'string'}},
+                },
+            },
+        }
+        # Embedded resources are never loaded.
+        component = SchemaParser.parse(
+            schema, store=DocumentStore(MemoryLoader({})))
+        self.assertIsInstance(component.properties['a'].value, Integer)
+        self.assertIsInstance(component.properties['b'].value, Object)
+        self.assertIsInstance(component.properties['c'].value, String)
+
+
+class RecursiveReferenceTestCase(unittest.TestCase):
+
+    def runTest(self):
+        schema = {
+            'definitions': {
+                'node': {
+                    'type': 'object',
+                    'properties': {
+                        'value': {'type': 'integer'},
+                        'children': {
+                            'type': 'array',
+                            'items': {'$ref': '#/definitions/node'},
+                        },
+                    },
+                },
+            },
+            '$ref': '#/definitions/node',
+        }
+        component = SchemaParser.parse(schema)
+        node = component.value
+        self.assertIs(node.properties['children'].items.value, node)
+        component.accept(ValidationVisitor(
+            {'value': 1, 'children': [{'value': 2, 'children': []}]}))
+        with self.assertRaises(AssertionError):
+            component.accept(ValidationVisitor(
+                {'value': 1, 'children': [{'children': [{'value': 'a'}]}]}))
+
+
+class FileSystemLoaderTestCase(unittest.TestCase):
+
+    def runTest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            os.mkdir(os.path.join(directory, 'common'))
+            with open(os.path.join(directory, 'common', 'id.json'), 'w') as fp:  # noqa: E501
+                json.dump({'type': 'integer', 'minimum': 1}, fp)
+            path = os.path.join(directory, 'product.json')
+            schema = {
+                'type': 'object',
+                'properties': {'id': {'$ref': 'common/id.json'}},
+            }
+            component = SchemaParser.parse(
+                schema, uri=pathlib.Path(path).as_uri(),
+                store=DocumentStore(FileSystemLoader()))
+            component.accept(ValidationVisitor({'id': 1}))
+            with self.assertRaises(AssertionError):
+                component.accept(ValidationVisitor({'id': 0}))
+
+            # Relative paths are relative to the root of the loader.
+            component = SchemaParser.parse(
+                schema, store=DocumentStore(FileSystemLoader(directory)))
+            with self.assertRaises(AssertionError):
+                component.accept(ValidationVisitor({'id': 0}))
+
+
+class DocumentIndexTestCase(unittest.TestCase):
+
+    def runTest(self):
+        schema = {
+            '$id': 'http://example.com/root.json',
+            'definitions': {
+                'a': {
+                    '$id': 'a/',
+                    'properties': {
+                        'b': {
+                            'type': 'array',
+                            'items': [
+                                {'$id': 'item.json', 'type': 'integer'},
+                                {'$ref': 'item.json'},
+                            ],
+                        },
+                        'c/d': {'enum': [{'$id': 'not-a-schema'}]},
+                    },
+                },
+            },
+        }
+        document = Document(schema, 'http://example.com/schemas/root.json')
+        node, base = document.locate('/definitions/a/properties/b/items/0')
+        self.assertEqual(node['type'], 'integer')
+        self.assertEqual(base, 'http://example.com/a/')
+        self.assertIs(
+            document.locate('/definitions/a/properties/c~1d/enum/0')[0],
+            schema['definitions']['a']['properties']['c/d']['enum'][0])
+        self.assertEqual(document.identifiers, {
+            'http://example.com/root.json': '',
+            'http://example.com/a/': '/definitions/a',
+            'http://example.com/a/item.json': '/definitions/a/properties/b/items/0',  # noqa: E501
+        })
+        self.assertEqual(
+            document.pointer(schema['definitions']['a']), '/definitions/a')
+        self.assertIs(
+            document.resolve('http://example.com/a/#/properties/b')[0],
+            schema['definitions']['a']['properties']['b'])
+        with self.assertRaises(ValueError):
+            document.locate('/definitions/b')
+        with self.assertRaises(ValueError):
+            document.locate('missing')
+
+        # Extract a validator of a single subschema.
+        component = SchemaParser.extract(
+            schema, '/definitions/a/properties/b')
+        self.assertIs(component.items[1].value.__class__, Integer)
+        component.accept(ValidationVisitor([1, 2]))
+        with self.assertRaises(AssertionError):
+            component.accept(ValidationVisitor([1, 'a']))
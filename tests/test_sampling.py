@@ -0,0 +1,104 @@
+import unittest
+
+from aptos.cache import ValidationCache
+from aptos.iterative import IterativeValidationVisitor
+from aptos.parser import SchemaParser
+from aptos.sampling import SamplingPolicy
+from aptos.validator import Validator
+from aptos.visitor import ValidationVisitor
+
+
+class SamplingTestCase(unittest.TestCase):
+
+    schema = {
+        'type': 'object',
+        'properties': {
+            'heartRate': {
+                'type': 'array',
+                'items': {'type': 'integer', 'minimum': 0},
+                'maxItems': 100000,
+            },
+        },
+    }
+
+    def runTest(self):
+        component = SchemaParser.parse(self.schema)
+        policy = SamplingPolicy(rate=0.01, minimum=50)
+        self.assertEqual(policy.size(10), 10)
+        self.assertEqual(policy.size(1000), 50)
+        self.assertEqual(policy.size(10000), 100)
+
+        instance = {'heartRate': list(range(10000))}
+        visitor = ValidationVisitor(instance, sampling=policy)
+        component.accept(visitor)
+        report = visitor.report
+        self.assertEqual((report.arrays, report.elements, report.validated), (1, 10000, 100))  # noqa: E501
+        self.assertFalse(report.exhaustive)
+        # 1 - (9900 choose 100) / (10000 choose 100)
+        self.assertAlmostEqual(report.confidence, 0.6358, places=3)
+
+        # The first and the last elements are always validated.
+        for index in (0, 9999):
+            instance['heartRate'][index] = -1
+            with self.assertRaises(AssertionError):
+                component.accept(ValidationVisitor(instance, sampling=policy))  # noqa: E501
+            instance['heartRate'][index] = index
+        # An element outside of the sample is not.
+        instance['heartRate'][5000] = -1
+        component.accept(ValidationVisitor(instance, sampling=policy))
+        with self.assertRaises(AssertionError):
+            component.accept(ValidationVisitor(instance))
+
+        # Cardinality is always validated.
+        with self.assertRaises(AssertionError):
+            component.accept(ValidationVisitor(
+                {'heartRate': [0] * 100001}, sampling=policy))
+
+        # Small arrays are validated entirely.
+        report = Validator(component, sampling=policy).validate({'heartRate': [1, 2]})  # noqa: E501
+        self.assertTrue(report.exhaustive)
+        self.assertEqual(report.confidence, 1.0)
+
+
+class RandomizedSamplingTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = SchemaParser.parse(SamplingTestCase.schema)
+        instance = {'heartRate': [0] * 5000 + [-1] * 5000}
+        policy = SamplingPolicy(rate=0.001, minimum=20, randomized=True, seed=0)  # noqa: E501
+        with self.assertRaises(AssertionError):
+            component.accept(ValidationVisitor(instance, sampling=policy))
+
+        instance = {'heartRate': [0] * 10000}
+        visitor = ValidationVisitor(instance, sampling=SamplingPolicy(rate=0.05, randomized=True))  # noqa: E501
+        component.accept(visitor)
+        self.assertEqual(visitor.report.validated, 500)
+        self.assertGreater(visitor.report.confidence, 0.99)
+
+        with self.assertRaises(ValueError):
+            SamplingPolicy(rate=0)
+        with self.assertRaises(ValueError):
+            SamplingPolicy(minimum=0)
+
+
+class SampledCacheTestCase(unittest.TestCase):
+
+    schema = {
+        'definitions': {
+            's': {'type': 'array', 'items': {'type': 'integer'}},
+        },
+        'type': 'object',
+        'additionalProperties': {'$ref': '#/definitions/s'},
+    }
+
+    def runTest(self):
+        component = SchemaParser.parse(self.schema)
+        instance = {'a': [1] * 500 + ['bad'] + [1] * 499}
+        for visitor in (ValidationVisitor, IterativeValidationVisitor):
+            cache = ValidationCache()
+            policy = SamplingPolicy(rate=0.01, minimum=10)
+            component.accept(visitor(instance, cache=cache, sampling=policy))  # noqa: E501
+            # Sampled validations do not memoize their results, so a full
+            # validation with the same cache validates every element.
+            with self.assertRaises(AssertionError):
+                component.accept(visitor(instance, cache=cache))
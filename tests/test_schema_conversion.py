@@ -3,7 +3,8 @@ import os
 import unittest
 
 from aptos.parser import SchemaParser
-from aptos.schema.visitor import AvroSchemaVisitor
+from aptos.schema import protobuf
+from aptos.schema.visitor import AvroSchemaVisitor, ProtobufSchemaVisitor
 
 BASE_DIR = os.path.dirname(__file__)
 
@@ -22,3 +23,65 @@ class AvroSchemaTestCase(unittest.TestCase):
         component = SchemaParser.parse(schema)
         schema = component.accept(AvroSchemaVisitor())
         self.assertEqual(len(schema['fields']), 5)
+
+
+class ProtobufSchemaTestCase(unittest.TestCase):
+
+    def runTest(self):
+        with open(os.path.join(BASE_DIR, 'schema', 'product')) as fp:
+            schema = json.load(fp)
+        component = SchemaParser.parse(schema)
+        visitor = ProtobufSchemaVisitor()
+        name = component.accept(visitor)['type']
+        self.assertEqual(name, 'Product')
+        messages = {
+            definition['name']: definition
+            for definition in visitor.definitions}
+        self.assertEqual(len(messages['Product']['fields']), 6)
+        self.assertIn('message Geographical {', protobuf.dumps(visitor.definitions))  # noqa: E501
+        self.assertIn('repeated string tags', protobuf.dumps(visitor.definitions))  # noqa: E501
+
+        # Field numbers of existing fields are stable and the numbers of
+        # removed fields are reserved.
+        numbers = {
+            field['key']: field['number']
+            for field in messages['Product']['fields']}
+        del schema['properties']['name']
+        schema['properties']['sku'] = {'type': 'string'}
+        component = SchemaParser.parse(schema)
+        visitor = ProtobufSchemaVisitor(visitor.mapping)
+        component.accept(visitor)
+        message = visitor.definitions[-1]
+        for field in message['fields']:
+            if field['key'] != 'sku':
+                self.assertEqual(field['number'], numbers[field['key']])
+        self.assertEqual(message['reserved'], [numbers['name']])
+        self.assertNotIn(
+            [field['number'] for field in message['fields'] if field['key'] == 'sku'][0],  # noqa: E501
+            numbers.values())
+
+
+class ProtobufEncodingTestCase(unittest.TestCase):
+
+    def runTest(self):
+        with open(os.path.join(BASE_DIR, 'schema', 'inventory')) as fp:
+            schema = json.load(fp)
+        component = SchemaParser.parse(schema)
+        visitor = ProtobufSchemaVisitor()
+        name = component.accept(visitor)['type']
+        encoder = protobuf.MessageEncoder(visitor.definitions, name)
+        decoder = protobuf.MessageDecoder(visitor.definitions, name)
+        instance = {
+            'required': True, 'id': -150, 'country': 'GB',
+            'units': [1.5, 2.25], 'comments': ''}
+        self.assertEqual(decoder.decode(encoder.encode(instance)), instance)
+        # Default values of fields without explicit presence are omitted.
+        self.assertEqual(encoder.encode({'id': 0, 'required': False}), b'')
+        # https://developers.google.com/protocol-buffers/docs/encoding#simple
+        number = [
+            field['number'] for field in visitor.definitions[-1]['fields']
+            if field['key'] == 'id'][0]
+        self.assertEqual(
+            encoder.encode({'id': 150}), bytes([number << 3, 0x96, 0x01]))
+        with self.assertRaises(ValueError):
+            encoder.encode({'country': 'FR'})
@@ -0,0 +1,242 @@
+import json
+import os
+import struct
+import tempfile
+import unittest
+
+from aptos import shred
+from aptos.parser import SchemaParser
+from aptos.shred import ColumnWriter, load
+
+# The document of the Dremel paper, whose "Name" and "Language" are
+# optional arrays, i.e. with one more definition level than repeated
+# fields of Protocol Buffers.
+DOCUMENT = {
+    'type': 'object',
+    'required': ['DocId'],
+    'properties': {
+        'DocId': {'type': 'integer'},
+        'Links': {
+            'type': 'object',
+            'properties': {
+                'Backward': {'type': 'array', 'items': {'type': 'integer'}},
+                'Forward': {'type': 'array', 'items': {'type': 'integer'}},
+            },
+        },
+        'Name': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'Language': {
+                        'type': 'array',
+                        'items': {
+                            'type': 'object',
+                            'required': ['Code'],
+                            'properties': {
+                                'Code': {'type': 'string'},
+                                'Country': {'type': 'string'},
+                            },
+                        },
+                    },
+                    'Url': {'type': 'string'},
+                },
+            },
+        },
+    },
+}
+
+RECORDS = [
+    {
+        'DocId': 10,
+        'Links': {'Forward': [20, 40, 60]},
+        'Name': [
+            {'Language': [{'Code': 'en-us', 'Country': 'us'}, {'Code': 'en'}], 'Url': 'http://A'},  # noqa: E501
+            {'Url': 'http://B'},
+            {'Language': [{'Code': 'en-gb', 'Country': 'gb'}]},
+        ],
+    },
+    {
+        'DocId': 20,
+        'Links': {'Backward': [10, 30], 'Forward': [80]},
+        'Name': [{'Url': 'http://C'}],
+    },
+]
+
+
+def columns(directory):
+    # The levels and the values of every column, as lists.
+    with open(os.path.join(directory, 'manifest.json')) as fp:
+        manifest = json.load(fp)
+    result = {}
+    for column in manifest['columns']:
+        arrays = load(directory, column['name'])
+        values = arrays.get('values')
+        if column['type'] in ('string', 'json'):
+            data = bytes(values)
+            offsets = list(arrays['offsets'])
+            values = [
+                data[start:end].decode('utf-8')
+                for start, end in zip(offsets, offsets[1:])]
+        elif values is not None:
+            values = [value.item() if hasattr(value, 'item') else value for value in values]  # noqa: E501
+        result[column['name']] = (
+            [int(level) for level in arrays.get('repetition', ())],
+            [int(level) for level in arrays.get('definition', ())],
+            values)
+    return manifest, result
+
+
+class ShreddingTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = SchemaParser.parse(DOCUMENT)
+        with tempfile.TemporaryDirectory() as directory:
+            with ColumnWriter(component, directory) as writer:
+                for record in RECORDS:
+                    writer.append(record)
+            manifest, result = columns(directory)
+        self.assertEqual(manifest['records'], 2)
+        self.assertEqual(result, {
+            'DocId': ([], [], [10, 20]),
+            'Links.Backward': ([0, 0, 1], [1, 3, 3], [10, 30]),
+            'Links.Forward': ([0, 1, 1, 0], [3, 3, 3, 3], [20, 40, 60, 80]),
+            'Name.Language.Code': ([0, 2, 1, 1, 0], [4, 4, 2, 4, 2], ['en-us', 'en', 'en-gb']),  # noqa: E501
+            'Name.Language.Country': ([0, 2, 1, 1, 0], [5, 4, 2, 5, 2], ['us', 'gb']),  # noqa: E501
+            'Name.Url': ([0, 1, 1, 0], [3, 3, 2, 3], ['http://A', 'http://B', 'http://C']),  # noqa: E501
+        })
+        column = manifest['columns'][3]
+        self.assertEqual(column['path'], ['Name', 'Language', 'Code'])
+        self.assertEqual((column['repetition'], column['definition']), (2, 4))
+
+
+class KindsTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = SchemaParser.parse({
+            'type': 'object',
+            'required': ['flag', 'none', 'score', 'nested'],
+            'properties': {
+                'flag': {'type': 'boolean'},
+                'none': {'type': 'null'},
+                'score': {'type': ['number', 'null']},
+                'color': {'enum': ['red', 'green']},
+                'any': {'anyOf': [{'type': 'integer'}, {'type': 'string'}]},
+                'pairs': {'type': 'array', 'items': [{'type': 'integer'}]},
+                'nested': {'type': 'array', 'items': {'type': 'array', 'items': {'type': 'number'}}},  # noqa: E501
+                'tree': {'$ref': '#/definitions/tree'},
+            },
+            'definitions': {
+                'tree': {
+                    'type': 'object',
+                    'properties': {
+                        'value': {'type': 'integer'},
+                        'children': {'type': 'array', 'items': {'$ref': '#/definitions/tree'}},  # noqa: E501
+                    },
+                },
+            },
+        })
+        records = [
+            {'flag': True, 'none': None, 'score': 1.5, 'color': 'red', 'any': 1, 'nested': [[1.0, 2.0], []], 'tree': {'value': 1, 'children': [{'value': 2}]}},  # noqa: E501
+            {'flag': False, 'none': None, 'score': None, 'any': 'a', 'pairs': [1], 'nested': []},  # noqa: E501
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            # Buffers are flushed after every record.
+            with ColumnWriter(component, directory, buffer_size=1) as writer:
+                for record in records:
+                    writer.append(record)
+            manifest, result = columns(directory)
+        self.assertEqual(
+            [(column['name'], column['type']) for column in manifest['columns']],  # noqa: E501
+            [('flag', 'boolean'), ('none', 'null'), ('score', 'number'),
+             ('color', 'string'), ('any', 'json'), ('pairs', 'json'),
+             ('nested', 'number'), ('tree.value', 'integer'),
+             ('tree.children', 'json')])
+        self.assertEqual(result['flag'], ([], [], [True, False]))
+        self.assertEqual(result['none'], ([], [1, 1], None))
+        self.assertEqual(result['score'], ([], [1, 0], [1.5]))
+        self.assertEqual(result['color'], ([], [1, 0], ['red']))
+        self.assertEqual(result['any'], ([], [1, 1], ['1', '"a"']))
+        self.assertEqual(result['pairs'], ([], [0, 1], ['[1]']))
+        self.assertEqual(result['nested'], ([0, 2, 1, 0], [2, 2, 1, 0], [1.0, 2.0]))  # noqa: E501
+        self.assertEqual(result['tree.children'], ([0, 0], [3, 0], ['{"value":2}']))  # noqa: E501
+
+
+class InvalidRecordTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = SchemaParser.parse(DOCUMENT)
+        with tempfile.TemporaryDirectory() as directory:
+            with ColumnWriter(component, directory) as writer:
+                with self.assertRaises(AssertionError):
+                    writer.append({'DocId': 'a'})
+            with ColumnWriter(component, directory, visitor=None) as writer:
+                writer.append(RECORDS[0])
+                # The partially shredded record is discarded.
+                with self.assertRaises(ValueError):
+                    writer.append({'DocId': 1, 'Name': [{'Url': 'a'}, {'Url': 2}]})  # noqa: E501
+                with self.assertRaises(ValueError):
+                    writer.append({'DocId': 2 ** 64})
+                writer.append(RECORDS[1])
+            manifest, result = columns(directory)
+        self.assertEqual(manifest['records'], 2)
+        self.assertEqual(result['Name.Url'][2], ['http://A', 'http://B', 'http://C'])  # noqa: E501
+        self.assertEqual(result['DocId'][2], [10, 20])
+
+        with self.assertRaises(ValueError):
+            ColumnWriter(SchemaParser.parse({'type': 'array'}), directory)
+
+
+class MemoryViewTestCase(unittest.TestCase):
+
+    def runTest(self):
+        # Without NumPy, columns are mapped as memoryviews.
+        component = SchemaParser.parse(DOCUMENT)
+        numpy, shred.numpy = shred.numpy, None
+        try:
+            for format in ColumnWriter.formats:
+                with tempfile.TemporaryDirectory() as directory:
+                    with ColumnWriter(component, directory, format=format) as writer:  # noqa: E501
+                        for record in RECORDS:
+                            writer.append(record)
+                    arrays = load(directory, 'Links.Forward')
+                    self.assertIsInstance(arrays['values'], memoryview)
+                    self.assertEqual(arrays['values'].tolist(), [20, 40, 60, 80])  # noqa: E501
+                    self.assertEqual(arrays['repetition'].tolist(), [0, 1, 1, 0])  # noqa: E501
+                    arrays['values'].release()
+                    arrays['repetition'].release()
+                    arrays['definition'].release()
+                    with self.assertRaises(KeyError):
+                        load(directory, 'Links')
+        finally:
+            shred.numpy = numpy
+
+
+class ByteOrderTestCase(unittest.TestCase):
+
+    def runTest(self):
+        # Numbers are little-endian whatever the byte order of the machine.
+        component = SchemaParser.parse(DOCUMENT)
+        for swap in (False, True):
+            numpy, shred.numpy = shred.numpy, None
+            swapped, shred.SWAP = shred.SWAP, swap
+            try:
+                with tempfile.TemporaryDirectory() as directory:
+                    with ColumnWriter(component, directory, format='raw') as writer:  # noqa: E501
+                        for record in RECORDS:
+                            writer.append(record)
+                    arrays = load(directory, 'Links.Forward')
+                    self.assertEqual(arrays['values'].tolist(), [20, 40, 60, 80])  # noqa: E501
+                    for array in arrays.values():
+                        array.release()
+                    manifest, result = columns(directory)
+                    files = manifest['columns'][2]['files']
+                    self.assertEqual(files['values']['dtype'], '<i8')
+                    with open(os.path.join(directory, files['values']['path']), 'rb') as fp:  # noqa: E501
+                        data = fp.read()
+            finally:
+                shred.numpy = numpy
+                shred.SWAP = swapped
+            # Simulating a big-endian machine, numbers are swapped when
+            # written and swapped back when loaded.
+            self.assertEqual(data, struct.pack('>4q' if swap else '<4q', 20, 40, 60, 80))  # noqa: E501
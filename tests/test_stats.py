@@ -0,0 +1,73 @@
+import json
+import unittest
+
+from aptos.parser import SchemaParser
+from aptos.stats import SchemaStatistics
+
+SCHEMA = {
+    'type': 'object',
+    'definitions': {
+        'node': {
+            'type': 'object',
+            'properties': {
+                'label': {'type': 'string', 'pattern': '^(a+)+$'},
+                'next': {'$ref': '#/definitions/node'},
+            },
+        },
+        'color': {'enum': ['red', 'green', 'blue']},
+    },
+    'properties': {
+        'head': {'$ref': '#/definitions/node'},
+        'tail': {'$ref': '#/definitions/node'},
+        'colors': {'type': 'array', 'items': {'$ref': '#/definitions/color'}},
+        'first': {'type': 'string', 'maxLength': 8, 'title': 'First'},
+        'last': {'type': 'string', 'maxLength': 8, 'title': 'Last'},
+        'code': {'type': 'string', 'maxLength': 4},
+    },
+    'patternProperties': {'^x-': {}},
+}
+
+
+class StatisticsTestCase(unittest.TestCase):
+
+    def runTest(self):
+        statistics = SchemaStatistics(SchemaParser.parse(SCHEMA, patterns='linear'))  # noqa: E501
+        # The definitions are counted, but only the references of the
+        # values referred to are followed.
+        self.assertEqual(statistics.counts['Reference'], 5)
+        self.assertEqual(statistics.references, 4)
+        self.assertEqual(statistics.depth, 4)
+        self.assertEqual(statistics.fanIn, {
+            '#/definitions/node': 3, '#/definitions/color': 1})
+        self.assertEqual(statistics.fanOut, {'#': 3, '#/definitions/node': 1})  # noqa: E501
+        self.assertEqual(statistics.recursive, ['#/definitions/node'])
+        # "first" and "last" only differ by their titles.
+        self.assertEqual(statistics.duplicates, 1)
+        self.assertEqual(statistics.enums, [3])
+        self.assertEqual((statistics.patterns, statistics.risky), (2, 1))
+        self.assertIsNone(statistics.memory)
+        # The object, "head" and "tail" (a reference, the node, its label
+        # and a reference back to it), "colors" (the array, a reference
+        # and the enumeration), the three strings and the schema of the
+        # members matching "^x-".
+        self.assertEqual(statistics.cost, 1 + 4 + 4 + 3 + 3 + 1)
+        self.assertIn('worst-case cost', statistics.explain())
+
+
+class MemoryTestCase(unittest.TestCase):
+
+    def runTest(self):
+        small = SchemaStatistics.measure({'type': 'string'})
+        large = SchemaStatistics.measure({
+            'type': 'object',
+            'properties': {
+                'p%d' % i: {'type': 'integer', 'enum': list(range(i))}
+                for i in range(1, 100)},
+        })
+        self.assertGreater(small.memory, 0)
+        self.assertGreater(large.memory, small.memory)
+        report = json.loads(json.dumps(large.report()))
+        self.assertEqual(report['counts']['Integer'], 99)
+        self.assertEqual(report['enums'][0], 99)
+        self.assertEqual(report['cost'], 100)
+        self.assertEqual(report['memory'], large.memory)
@@ -0,0 +1,139 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from aptos.parser import SchemaParser
+from aptos.stream import JSONTokenizer, StreamingValidator
+
+
+class Reader(io.RawIOBase):
+
+    """Serve a document in small chunks and fail once it has been read past
+    ``limit``.
+    """
+
+    def __init__(self, data, size, limit=None):
+        self.data = data
+        self.size = size
+        self.offset = 0
+        self.limit = len(data) if limit is None else limit
+
+    def read(self, size=-1):
+        if self.offset > self.limit:
+            raise RuntimeError('document read past %d' % (self.limit,))
+        chunk = self.data[self.offset:self.offset + self.size]
+        self.offset += len(chunk)
+        return chunk
+
+
+class JSONTokenizerTestCase(unittest.TestCase):
+
+    def runTest(self):
+        document = '[12345, "gréen door", true, {"a": [1.5e3, null]}, -7]'
+        tokenizer = JSONTokenizer(
+            Reader(document.encode('utf-8'), 3), size=3)
+        values = []
+        tokenizer.expect('[')
+        while tokenizer.peek() != ']':
+            if values:
+                tokenizer.expect(',')
+            values.append(tokenizer.value())
+        tokenizer.expect(']')
+        self.assertEqual(values, json.loads(document))
+        self.assertEqual(tokenizer.peek(), '')
+
+        tokenizer = JSONTokenizer(io.StringIO('[1, }'), size=2)
+        tokenizer.expect('[')
+        tokenizer.value()
+        tokenizer.expect(',')
+        with self.assertRaises(ValueError):
+            tokenizer.value()
+
+
+class ChunkBoundaryTestCase(unittest.TestCase):
+
+    def runTest(self):
+        # Numbers split after their sign, point or exponent are decoded
+        # whole, whatever the size of the chunks.
+        records = [i + 0.25 for i in range(200)] + [-1.5e-3, 2E+10, 12e5, -0.0]  # noqa: E501
+        data = json.dumps(records).encode('utf-8')
+        typed = StreamingValidator(SchemaParser.parse({'type': 'array', 'items': {'type': 'number'}}))  # noqa: E501
+        untyped = StreamingValidator(SchemaParser.parse({'type': 'array'}))
+        for size in list(range(1, 17)) + [64 * 1024]:
+            typed.validate(Reader(data, size))
+            untyped.validate(Reader(data, size))
+            tokenizer = JSONTokenizer(Reader(data, size), size=size)
+            self.assertEqual(tokenizer.value(), records, size)
+
+
+class StreamingValidationTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = SchemaParser.parse({
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'id': {'type': 'integer', 'minimum': 0},
+                    'name': {'type': 'string'},
+                },
+                'required': ['id'],
+            },
+            'maxItems': 100,
+        })
+        validator = StreamingValidator(component)
+        records = [{'id': i, 'name': 'record %d' % i} for i in range(50)]
+        validator.validate(io.StringIO(json.dumps(records)))
+
+        with self.assertRaises(AssertionError):
+            validator.validate(io.StringIO(json.dumps(records * 3)))
+        with self.assertRaises(AssertionError):
+            validator.validate(io.StringIO('{"id": 1}'))
+
+        # Validation stops at the first invalid element without reading the
+        # remainder of the document.
+        data = (json.dumps(records[:10])[:-1] + ', {"name": "missing"}, ').encode('utf-8')  # noqa: E501
+        with self.assertRaises(AssertionError):
+            validator.validate(Reader(data + b'x' * 10 ** 6, 64, len(data) + 64))  # noqa: E501
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'records.json')
+            with open(path, 'w') as fp:
+                json.dump(records, fp)
+            validator.validate_path(path)
+
+        component = SchemaParser.parse({
+            'type': 'object',
+            'properties': {'id': {'type': 'integer'}},
+            'additionalProperties': {'type': 'string'},
+            'required': ['id'],
+        })
+        validator = StreamingValidator(component)
+        validator.validate(io.StringIO('{"id": 1, "name": "door"}'))
+        for document in ('{"name": "door"}', '{"id": 1, "size": 2}', '[]'):
+            with self.assertRaises(AssertionError):
+                validator.validate(io.StringIO(document))
+        with self.assertRaises(ValueError):
+            validator.validate(io.StringIO('{"id": 1} {}'))
+
+        component = SchemaParser.parse({
+            'type': 'object',
+            'patternProperties': {'^x-': {'type': 'integer'}},
+            'propertyNames': {'type': 'string', 'maxLength': 4},
+            'dependencies': {'card': ['zip']},
+        })
+        validator = StreamingValidator(component)
+        self.assertTrue(validator.streamable())
+        validator.validate(io.StringIO('{"x-a": 1, "card": 2, "zip": 3}'))
+        for document in ('{"x-a": "1"}', '{"long-name": 1}', '{"card": 2}'):  # noqa: E501
+            with self.assertRaises(AssertionError):
+                validator.validate(io.StringIO(document))
+
+        # Elements are compared as by the ValidationVisitor.
+        validator = StreamingValidator(SchemaParser.parse({'type': 'array', 'uniqueItems': True}))  # noqa: E501
+        validator.validate(io.StringIO('[1, 2, [1], {"a": 1}, {"a": 2}]'))
+        for document in ('[1, 1.0]', '[[1], [1.0]]', '[{"a": 1, "b": 2}, {"b": 2, "a": 1}]'):  # noqa: E501
+            with self.assertRaises(AssertionError):
+                validator.validate(io.StringIO(document))
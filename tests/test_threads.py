@@ -0,0 +1,70 @@
+import pickle
+import threading
+import unittest
+
+from aptos.parser import SchemaParser
+from aptos.validator import Validator
+
+
+class FrozenTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = SchemaParser.parse({
+            'definitions': {'id': {'type': 'integer', 'minimum': 1}},
+            'type': 'object',
+            'properties': {
+                'id': {'$ref': '#/definitions/id'},
+                'tags': {'type': 'array', 'items': {'type': 'string'}},
+            },
+            'anyOf': [{'required': ['id']}, {'required': ['tags']}],
+        })
+        self.assertTrue(component.frozen)
+        with self.assertRaises(AttributeError):
+            component.required = ['id']
+        with self.assertRaises(TypeError):
+            component.properties['name'] = component
+        with self.assertRaises(TypeError):
+            component.anyOf.append(component)
+        with self.assertRaises(AttributeError):
+            component.properties['id'].value.minimum = 0
+        with self.assertRaises(AttributeError):
+            component.properties['tags'].items.maxLength = 1
+
+        # Frozen trees can be cached.
+        component = pickle.loads(pickle.dumps(component))
+        self.assertTrue(component.anyOf.frozen)
+        with self.assertRaises(TypeError):
+            component.anyOf.append(component)
+
+        with self.assertRaises(ValueError):
+            Validator(SchemaParser.parse({}, freeze=False))
+
+
+class ThreadTestCase(unittest.TestCase):
+
+    def runTest(self):
+        validator = Validator(SchemaParser.parse({
+            'type': 'object',
+            'properties': {
+                'id': {'type': 'integer', 'minimum': 1},
+                'name': {'type': 'string', 'maxLength': 8},
+            },
+            'required': ['id'],
+        }))
+        results = {}
+
+        def validate(thread):
+            # Every other instance is invalid.
+            results[thread] = [
+                validator.is_valid({'id': i % 2, 'name': 'thread %d' % thread})  # noqa: E501
+                for i in range(500)]
+
+        threads = [
+            threading.Thread(target=validate, args=(thread,))
+            for thread in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for thread in range(8):
+            self.assertEqual(results[thread], [False, True] * 250)
@@ -2,7 +2,9 @@ import json
 import unittest
 
 from aptos import primitive
-from aptos.visitor import ValidationVisitor
+from aptos.budget import Budget, BudgetExceededError
+from aptos.parser import SchemaParser
+from aptos.visitor import JSONEncodingVisitor, ValidationVisitor
 
 
 class StringTestCase(unittest.TestCase):
@@ -116,6 +118,19 @@ class ArrayTestCase(unittest.TestCase):
         with self.assertRaises(AssertionError):
             array.accept(ValidationVisitor([1, 2, 3]))
 
+        schema = json.loads('''
+            {
+                "type": "array",
+                "items": {
+                    "type": "string"
+                }
+            }
+        ''')
+        array = primitive.Array.unmarshal(schema)
+        array.accept(ValidationVisitor(['home', 'green']))
+        with self.assertRaises(AssertionError):
+            array.accept(ValidationVisitor(['home', 1]))
+
 
 class NumericTestCase(unittest.TestCase):
 
@@ -129,6 +144,7 @@ class NumericTestCase(unittest.TestCase):
             }
         ''')
         number = primitive.Number.unmarshal(schema)
+        number.accept(ValidationVisitor(99.5))
         with self.assertRaises(AssertionError):
             number.accept(ValidationVisitor(100.0))
 
@@ -243,6 +259,68 @@ class ObjectTestCase(unittest.TestCase):
                 'firstName': 'John', 'lastName': 'Doe'}))
 
 
+class ObjectKeywordsTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = SchemaParser.parse({
+            'type': 'object',
+            'properties': {'id': {'type': 'integer'}},
+            'patternProperties': {'^x-': {'type': 'string'}},
+            'additionalProperties': {'type': 'integer'},
+            'propertyNames': {'type': 'string', 'maxLength': 8},
+            'dependencies': {
+                'card': ['billing'],
+                'shipping': {'type': 'object', 'required': ['address']},
+            },
+            'required': ['id', 'name'],
+        })
+        for instance in (
+                {'id': 1, 'name': 0},
+                {'id': 1, 'name': 2, 'x-a': 'b'},
+                {'id': 1, 'name': 2, 'card': 3, 'billing': 4},
+                {'id': 1, 'name': 2, 'shipping': 3, 'address': 4}):
+            component.accept(ValidationVisitor(instance))
+            visitor = JSONEncodingVisitor(instance)
+            component.accept(visitor)
+            self.assertEqual(json.loads(visitor.getvalue()), instance)
+
+        for instance, message in (
+                ({'id': 1}, "missing required property 'name'"),
+                ({'id': 1, 'name': 'a'}, "'a' is not in any of the sets"),
+                ({'id': 1, 'name': 2, 'x-a': 3}, '3 is not in any of the sets'),  # noqa: E501
+                ({'id': 1, 'name': 2, 'birthdate': 3}, "'birthdate' is not less"),  # noqa: E501
+                ({'id': 1, 'name': 2, 'card': 3}, "property 'card' depends on missing property 'billing'"),  # noqa: E501
+                ({'id': 1, 'name': 2, 'shipping': 3}, "missing required property 'address'")):  # noqa: E501
+            for visitor in (ValidationVisitor, JSONEncodingVisitor):
+                with self.assertRaisesRegex(AssertionError, message):
+                    component.accept(visitor(instance))
+
+
+class ContainsTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = SchemaParser.parse({
+            'type': 'array',
+            'contains': {'type': 'integer', 'minimum': 10},
+        })
+        component.accept(ValidationVisitor([1, 'a', 10]))
+        for instance in ([], [1, 2, 3], ['a', 10.5]):
+            with self.assertRaisesRegex(AssertionError, 'does not contain'):
+                component.accept(ValidationVisitor(instance))
+
+        # Validation stops at the first element valid against "contains".
+        instance = [10] + [{'a': list(range(10))}] * 1000
+        component.accept(ValidationVisitor(
+            instance, budget=Budget(nodes=300)))
+        with self.assertRaises(BudgetExceededError):
+            component.accept(ValidationVisitor(
+                instance[::-1], budget=Budget(nodes=300)))
+
+        visitor = JSONEncodingVisitor([1, 10])
+        component.accept(visitor)
+        self.assertEqual(visitor.getvalue(), '[1,10]')
+
+
 class ConstantTestCase(unittest.TestCase):
 
     def runTest(self):
@@ -305,6 +383,25 @@ class AnyOfTestCase(unittest.TestCase):
         with self.assertRaises(AssertionError):
             component.accept(ValidationVisitor(-5.0))
 
+        schema = json.loads('''
+            {
+                "anyOf": [
+                    {"type": "string"},
+                    {"type": "integer"},
+                    {"type": "number"},
+                    {"type": "boolean"}
+                ]
+            }
+        ''')
+        component = primitive.Primitive.unmarshal(schema)
+        for instance in (1, 2.0, 3.0, True, 4.0, 5.0):
+            component.accept(ValidationVisitor(instance, adaptive=True))
+        # The most successful member is tried first.
+        self.assertEqual(component.anyOf.statistics.order[0], 2)
+        self.assertEqual(component.anyOf.statistics.hits, [0, 1, 4, 1])
+        with self.assertRaises(AssertionError):
+            component.accept(ValidationVisitor(None, adaptive=True))
+
 
 class OneOfTestCase(unittest.TestCase):
 
@@ -327,6 +424,26 @@ class OneOfTestCase(unittest.TestCase):
         with self.assertRaises(AssertionError):
             component.accept(ValidationVisitor(2.0))
 
+        with self.assertRaises(AssertionError):
+            # Valid against both members.
+            component.accept(ValidationVisitor(15.0))
+
+        schema = json.loads('''
+            {
+                "oneOf": [
+                    {"type": "number", "multipleOf": 5},
+                    {"type": "number", "multipleOf": 3},
+                    {"type": "number", "multipleOf": 2}
+                ]
+            }
+        ''')
+        component = primitive.Primitive.unmarshal(schema)
+        for instance in (9.0, 4.0, 25.0):
+            component.accept(ValidationVisitor(instance, adaptive=True))
+        for instance in (7.0, 6.0, 30.0):
+            with self.assertRaises(AssertionError):
+                component.accept(ValidationVisitor(instance, adaptive=True))
+
 
 class MultipleTypeTestCase(unittest.TestCase):
 
@@ -353,3 +470,158 @@ class EnumerationTestCase(unittest.TestCase):
         enumeration = primitive.Enumeration.unmarshal(schema)
         with self.assertRaises(AssertionError):
             enumeration.accept(ValidationVisitor('blue'))
+
+
+class JSONEncodingTestCase(unittest.TestCase):
+
+    def runTest(self):
+        schema = json.loads('''
+            {
+                "type": "object",
+                "properties": {
+                    "name": {
+                        "type": "string"
+                    },
+                    "tags": {
+                        "type": "array",
+                        "items": {
+                            "type": "string"
+                        }
+                    },
+                    "location": {
+                        "$ref": "#/definitions/location"
+                    }
+                },
+                "allOf": [
+                    {
+                        "type": "object",
+                        "required": ["name"]
+                    }
+                ],
+                "definitions": {
+                    "location": {
+                        "type": "object",
+                        "properties": {
+                            "latitude": {"type": "number"},
+                            "longitude": {"type": "number"}
+                        }
+                    }
+                }
+            }
+        ''')
+        component = SchemaParser.parse(schema)
+        for instance in (
+                {'name': 'door', 'tags': ['green', 'A "door"'], 'extra': None},
+                {'name': 'door', 'tags': [], 'location': {
+                    'latitude': 39.95, 'longitude': -75.19}},
+                {'name': 'door', 'location': {}}):
+            visitor = JSONEncodingVisitor(instance)
+            component.accept(visitor)
+            self.assertEqual(visitor.getvalue(), json.dumps(
+                instance, separators=(',', ':')))
+
+        with self.assertRaises(AssertionError):
+            component.accept(JSONEncodingVisitor({'tags': ['green']}))
+        with self.assertRaises(AssertionError):
+            component.accept(JSONEncodingVisitor({
+                'name': 'door', 'location': {'latitude': '39.95'}}))
+
+
+class DiscriminatorTestCase(unittest.TestCase):
+
+    def runTest(self):
+        schema = json.loads('''
+            {
+                "oneOf": [
+                    {"$ref": "#/definitions/cat"},
+                    {"$ref": "#/definitions/dog"},
+                    {
+                        "type": "object",
+                        "properties": {
+                            "petType": {"enum": ["bird", "fish"]}
+                        }
+                    }
+                ],
+                "definitions": {
+                    "cat": {
+                        "type": "object",
+                        "properties": {
+                            "petType": {"const": "cat"},
+                            "lives": {"type": "integer"}
+                        }
+                    },
+                    "dog": {
+                        "type": "object",
+                        "properties": {
+                            "petType": {"type": "string", "enum": ["dog"]},
+                            "bark": {"type": "string"}
+                        }
+                    }
+                }
+            }
+        ''')
+        component = SchemaParser.parse(schema)
+        discriminator = component.oneOf.discriminator
+        self.assertEqual(discriminator.propertyName, 'petType')
+        self.assertEqual(discriminator.mapping, {
+            'cat': (0,), 'dog': (1,), 'bird': (2,), 'fish': (2,)})
+        self.assertEqual(discriminator.candidates({'petType': 'dog'}), (1,))
+        self.assertIsNone(discriminator.candidates({'lives': 9}))
+
+        component.accept(ValidationVisitor({'petType': 'cat', 'lives': 9}))
+        component.accept(ValidationVisitor({'petType': 'fish'}))
+        for instance in (
+                {'petType': 'dog', 'bark': 1}, {'petType': 'cow'},
+                {'petType': 1}):
+            with self.assertRaises(AssertionError):
+                component.accept(ValidationVisitor(instance))
+
+        # https://swagger.io/specification/#discriminatorObject
+        schema = json.loads('''
+            {
+                "oneOf": [
+                    {"$ref": "#/definitions/Cat"},
+                    {"$ref": "#/definitions/Dog"}
+                ],
+                "discriminator": {
+                    "propertyName": "petType",
+                    "mapping": {"hound": "#/definitions/Dog"}
+                },
+                "definitions": {
+                    "Cat": {
+                        "type": "object",
+                        "properties": {"name": {"type": "string"}}
+                    },
+                    "Dog": {
+                        "type": "object",
+                        "properties": {"name": {"type": "string"}}
+                    }
+                }
+            }
+        ''')
+        component = SchemaParser.parse(schema)
+        self.assertEqual(component.oneOf.discriminator.mapping, {
+            'Cat': (0,), 'Dog': (1,), 'hound': (1,)})
+        # Only the member selected by the discriminator is evaluated.
+        component.accept(ValidationVisitor({'petType': 'hound', 'name': 'Rex'}))  # noqa: E501
+        with self.assertRaises(AssertionError):
+            component.accept(ValidationVisitor({'name': 'Rex'}))
+
+        # Mapping values may be schema names, references relative to the
+        # base URI, or refer to no member at all.
+        schema['$id'] = 'http://example.com/pets.json'
+        schema['discriminator']['mapping'] = {
+            'dog': 'Dog', 'cat': 'pets.json#/definitions/Cat',
+            'cow': 'Cow'}
+        schema['definitions']['Dog']['properties']['bark'] = {'const': True}  # noqa: E501
+        component = SchemaParser.parse(schema)
+        self.assertEqual(component.oneOf.discriminator.mapping, {
+            'Cat': (0,), 'Dog': (1,), 'dog': (1,), 'cat': (0,),
+            'cow': (0, 1)})
+        component.accept(ValidationVisitor({'petType': 'dog', 'bark': True}))  # noqa: E501
+        component.accept(ValidationVisitor({'petType': 'cat', 'name': 'Tom'}))  # noqa: E501
+        with self.assertRaises(AssertionError):
+            component.accept(ValidationVisitor({'petType': 'dog', 'bark': False}))  # noqa: E501
+        with self.assertRaises(AssertionError):
+            # Valid against both members.
+            component.accept(ValidationVisitor({'petType': 'cow'}))
@@ -0,0 +1,162 @@
+import array
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from aptos import vectorized
+from aptos.budget import Budget, BudgetExceededError
+from aptos.codegen import CodeGenerationVisitor
+from aptos.parser import SchemaParser
+from aptos.visitor import JSONEncodingVisitor, ValidationVisitor
+
+
+def error(component, instance, **kwargs):
+    visitor = ValidationVisitor(instance, **kwargs)
+    try:
+        component.accept(visitor)
+    except AssertionError as e:
+        return e.args[0]
+
+
+class ScalarValidationVisitor(ValidationVisitor):
+
+    vectorize = None
+
+
+def scalar(component, instance):
+    try:
+        component.accept(ScalarValidationVisitor(instance))
+    except AssertionError as e:
+        return e.args[0]
+
+
+class VectorizedEquivalenceTestCase(unittest.TestCase):
+
+    schemas = [
+        {'type': 'array', 'items': {'type': 'integer', 'minimum': 0, 'maximum': 100}},  # noqa: E501
+        {'type': 'array', 'items': {'type': 'integer', 'multipleOf': 3, 'exclusiveMaximum': 2 ** 70}},  # noqa: E501
+        {'type': 'array', 'items': {'type': 'number', 'exclusiveMinimum': -1.5, 'multipleOf': 0.5}},  # noqa: E501
+        {'type': 'array', 'items': {'type': 'number', 'maximum': 1e300}, 'uniqueItems': True},  # noqa: E501
+    ]
+
+    instances = [
+        list(range(100)),
+        list(range(100)) + [101] + list(range(100)),
+        list(range(0, 300, 3)) + [2 ** 60, -1],
+        [2 ** 80] * 100,
+        [0.5 * i for i in range(100)],
+        [0.5 * i for i in range(100)] + [float('nan'), 1.25, float('inf')],
+        [1.0] * 99 + [1],
+        [True] * 100,
+    ]
+
+    def runTest(self):
+        for schema in self.schemas:
+            component = SchemaParser.parse(schema)
+            for instance in self.instances:
+                self.assertEqual(
+                    error(component, instance), scalar(component, instance),
+                    (schema, instance))
+
+
+class ArrayModuleTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = SchemaParser.parse({
+            'type': 'array',
+            'items': {'type': 'integer', 'minimum': 0},
+            'maxItems': 1000,
+        })
+        component.accept(ValidationVisitor(array.array('l', range(1000))))
+        message = error(component, array.array('l', [1, 2, -3, 4]))
+        self.assertEqual(message, 'instance -3 is not greater than or exactly equal to 0')  # noqa: E501
+        # Floats are not integers.
+        message = error(component, array.array('d', [1.0]))
+        self.assertEqual(message, "instance 1.0 is not in any of the sets listed 'integer'")  # noqa: E501
+
+        visitor = JSONEncodingVisitor(array.array('b', [1, 2, 3]))
+        component.accept(visitor)
+        self.assertEqual(visitor.getvalue(), '[1,2,3]')
+
+
+class BudgetTestCase(unittest.TestCase):
+
+    def runTest(self):
+        items = {'type': 'number', 'minimum': 0}
+        component = SchemaParser.parse({'type': 'array', 'items': items})
+        instance = [float(i) for i in range(1000)]
+        component.accept(ValidationVisitor(instance, budget=Budget(nodes=1001)))  # noqa: E501
+        with self.assertRaises(BudgetExceededError):
+            component.accept(ValidationVisitor(
+                instance, budget=Budget(nodes=1000)))
+        component = SchemaParser.parse({
+            'type': 'array', 'items': {'type': 'array', 'items': items}})
+        component.accept(ValidationVisitor([instance], budget=Budget(depth=2)))  # noqa: E501
+        with self.assertRaises(BudgetExceededError):
+            component.accept(ValidationVisitor(
+                [instance], budget=Budget(depth=1)))
+
+
+class CodeGenerationTestCase(unittest.TestCase):
+
+    def runTest(self):
+        component = SchemaParser.parse({
+            'type': 'array', 'items': {'type': 'number', 'maximum': 1}})
+        source = CodeGenerationVisitor().generate(component)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'validator.py')
+            with open(path, 'w') as fp:
+                fp.write(source)
+            specification = importlib.util.spec_from_file_location(
+                'validator', path)
+            module = importlib.util.module_from_spec(specification)
+            specification.loader.exec_module(module)
+        module.validate(array.array('d', [0.5, 1.0]))
+        with self.assertRaises(AssertionError):
+            module.validate(array.array('d', [0.5, 1.5]))
+
+
+@unittest.skipIf(vectorized.load() is None, 'NumPy is not installed')
+class NumPyTestCase(unittest.TestCase):
+
+    def runTest(self):
+        numpy = vectorized.load()
+        component = SchemaParser.parse({
+            'type': 'array', 'items': {'type': 'integer', 'multipleOf': 2}})
+        component.accept(ValidationVisitor(numpy.arange(0, 2000, 2)))
+        component.accept(ValidationVisitor(numpy.arange(0, 2000, 2, dtype=numpy.uint16)))  # noqa: E501
+        message = error(component, numpy.array([2, 4, 7, 9]))
+        self.assertEqual(message, 'instance 7 division by 2 is not an integer')
+        message = error(component, numpy.zeros(10))
+        self.assertEqual(message, "instance 0.0 is not in any of the sets listed 'integer'")  # noqa: E501
+        message = error(component, numpy.zeros((2, 2), dtype=int))
+        self.assertEqual(message, "instance [0, 0] is not in any of the sets listed 'integer'")  # noqa: E501
+
+        # Single-precision floats are compared as doubles, like Python.
+        component = SchemaParser.parse({
+            'type': 'array', 'items': {'type': 'number', 'maximum': 0.1}})
+        instance = numpy.array([0.1], dtype=numpy.float32)
+        self.assertEqual(
+            error(component, instance), scalar(component, instance.tolist()))
+
+
+class LazyImportTestCase(unittest.TestCase):
+
+    def runTest(self):
+        # NumPy is only imported once an array may be checked at once.
+        script = """
+import sys
+from aptos.__main__ import main
+from aptos.parser import SchemaParser
+from aptos.visitor import ValidationVisitor
+component = SchemaParser.parse({'type': 'array', 'items': {'type': 'integer'}})
+component.accept(ValidationVisitor([1, 2, 3]))
+print('numpy' in sys.modules)
+"""
+        output = subprocess.check_output(
+            [sys.executable, '-c', script],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(output.strip(), b'False')